@@ -0,0 +1,104 @@
+"""
+Throughput of utils.async_storage against wrapping the blocking storage calls
+in threads (asyncio.to_thread), with hundreds of concurrent coroutines.
+
+    python benchmarks/bench_async_storage.py --coroutines 300 --projects 500
+
+Each coroutine issues --ops operations: mostly load_projects(), with one in
+--write-every being a patch_projects() of a single project. Runs against a
+throwaway data directory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from models.project import Project  # noqa: E402
+from models.task import Task  # noqa: E402
+from utils import storage  # noqa: E402
+from utils.async_storage import AsyncStorage  # noqa: E402
+
+
+def seed(n_projects: int, tasks_per_project: int) -> list:
+    projects = []
+    for i in range(n_projects):
+        p = Project(title=f"Project {i}", user_id="bench")
+        for j in range(tasks_per_project):
+            p.add_task(Task(title=f"Task {j}"))
+        projects.append(p)
+    storage.save_projects(projects)
+    return projects
+
+
+async def run_threads(coroutines: int, ops: int, write_every: int, seeded) -> dict:
+    write_lock = threading.Lock()  # storage writes must not overlap
+
+    def patch(p):
+        with write_lock:
+            storage.patch_projects([p])
+
+    async def worker(n: int) -> None:
+        for i in range(ops):
+            if (n + i) % write_every == 0:
+                p = seeded[(n + i) % len(seeded)]
+                p.title = f"Project {n}-{i}"
+                await asyncio.to_thread(patch, p)
+            else:
+                await asyncio.to_thread(storage.load_projects)
+
+    await asyncio.gather(*(worker(n) for n in range(coroutines)))
+    return {}
+
+
+async def run_async(coroutines: int, ops: int, write_every: int, seeded) -> dict:
+    async with AsyncStorage() as db:
+
+        async def worker(n: int) -> None:
+            for i in range(ops):
+                if (n + i) % write_every == 0:
+                    p = seeded[(n + i) % len(seeded)]
+                    p.title = f"Project {n}-{i}"
+                    await db.patch_projects([p])
+                else:
+                    await db.load_projects()
+
+        await asyncio.gather(*(worker(n) for n in range(coroutines)))
+    return {"loads": db.loads, "coalesced": db.coalesced, "commits": db.batches}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--coroutines", type=int, default=300)
+    ap.add_argument("--ops", type=int, default=4, help="Operations per coroutine")
+    ap.add_argument("--write-every", type=int, default=5)
+    ap.add_argument("--projects", type=int, default=500)
+    ap.add_argument("--tasks", type=int, default=5, help="Tasks per project")
+    args = ap.parse_args()
+
+    total = args.coroutines * args.ops
+    for name, runner in (("to_thread", run_threads), ("AsyncStorage", run_async)):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage.use_data_dir(Path(tmp))
+            seeded = seed(args.projects, args.tasks)
+            start = time.perf_counter()
+            stats = asyncio.run(
+                runner(args.coroutines, args.ops, args.write_every, seeded)
+            )
+            elapsed = time.perf_counter() - start
+        extra = ", ".join(f"{k} {v}" for k, v in stats.items())
+        print(
+            f"{name:<13} {total} ops in {elapsed:6.2f}s "
+            f"({total / elapsed:8,.0f} ops/s){'  ' + extra if extra else ''}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,76 @@
 from __future__ import annotations
 
 import argparse
-from typing import Optional, List, Tuple
+import heapq
+import sys
+import time
+from datetime import date, datetime, timedelta
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, Optional, List, Tuple
 
-from models.user import User
 from models.project import Project
 from models.task import Task
+from models.ids import lower_bound, sort_key
 
+from utils import (
+    completion,
+    fsck,
+    history,
+    migrations,
+    outbox,
+    replication,
+    sorting,
+    storage,
+    transitions,
+)
 from utils.storage import (
     load_users,
-    save_users,
     load_projects,
-    save_projects,
-    get_user_by_name,
     get_project_by_title,
     index_by_id,
+    load_projects_by_ids,
+    project_index,
+)
+from utils.indexes import (
+    DEPENDENCIES,
+    DUE_DATES,
+    TASKS_BY_CREATED,
+)
+
+from utils.archive import (
+    CODECS,
+    DEFAULT_CODEC,
+    iter_archived,
+    load_policy,
+    save_policy,
+)
+
+from utils.session import Session, SessionError
+from utils.export import (
+    DEFAULT_CHUNK_ROWS,
+    FIELDS,
+    FORMATS,
+    export,
+    iter_flat_tasks,
+    iter_projects,
 )
 
 from utils.formatting import (
+    PROJECT_HEADERS,
+    TASK_HEADERS,
+    echo,
     print_users,
     print_projects,
     print_tasks,
+    print_table,
+    project_row,
+    stream_tasks,
+    task_row,
     console,
 )
+from utils.indexes import fingerprint
+from utils.watch import ProjectSnapshot, watch
 
 # ------------- Helpers ------------- #
 
@@ -68,17 +116,23 @@ def _flatten_tasks_with_project_id(projects: List[Project]) -> List[Tuple[Task,
     return flat
 
 
-def _find_task_by_id(
-    projects: List[Project], task_id: str
-) -> tuple[Optional[Task], Optional[Project]]:
+def _load_task_refs(
+    refs: Iterable[Tuple[str, str]],
+) -> Tuple[List[Tuple[Task, str]], dict]:
     """
-    Locate a task by UUID across all projects. Returns (task, parent_project) or (None, None).
+    Resolve (project_id, task_id) refs from an index into (task, project_id)
+    rows, reading only the projects involved. Returns (rows, projects_by_id).
     """
-    for p in projects:
-        for t in getattr(p, "tasks", []) or []:
-            if getattr(t, "id", None) == task_id:
-                return t, p
-    return None, None
+    refs = list(refs)
+    project_ids = list(dict.fromkeys(pid for pid, _tid in refs))
+    projects_by_id = index_by_id(load_projects_by_ids(project_ids))
+    rows = []
+    for pid, tid in refs:
+        proj = projects_by_id.get(pid)
+        task = proj.get_task(tid) if proj else None
+        if task:
+            rows.append((task, pid))
+    return rows, projects_by_id
 
 
 # ------------- Command Handlers ------------- #
@@ -88,29 +142,44 @@ def cmd_add_user(args: argparse.Namespace) -> None:
     """
     Add a new user.
     """
-    users = load_users()
-    name = args.name.strip()
-    email = (args.email or "").strip().lower()
-
-    # Guard against duplicates by name; if email provided, also check duplicates by email
-    for u in users:
-        if u.name.lower() == name.lower():
-            _warn(f"User with name '{name}' already exists.")
+    with Session("add-user") as s:
+        try:
+            user = s.add_user(args.name, args.email)
+        except SessionError as e:
+            _warn(str(e))
             return
-        if email and (getattr(u, "email", "") or "").lower() == email:
-            _warn(f"User with email '{email}' already exists.")
-            return
-
-    user = User(name=name, email=(email or None))
-    users.append(user)
-    save_users(users)
     _info(f"User created: {user}")
-    print_users(users)
+    print_users(s.users)
+
+
+def cmd_delete_user(args: argparse.Namespace) -> None:
+    """
+    Delete a user. Their projects and task assignments are either handed to
+    --reassign-to, or cascade (projects deleted, assignments cleared).
+    Affected projects are found via the owner/assignee indexes, and both
+    files are written in one atomic commit.
+    """
+    with Session("delete-user") as s:
+        try:
+            summary = s.delete_user(args.name, args.reassign_to)
+        except SessionError as e:
+            _error(str(e))
+            return
+    if args.reassign_to:
+        _info(
+            f"User deleted: {args.name}; {summary.owned} project(s) and "
+            f"{summary.assigned} task(s) reassigned to '{args.reassign_to}'."
+        )
+    else:
+        _info(
+            f"User deleted: {args.name}; {summary.deleted} project(s) deleted and "
+            f"{summary.assigned} task assignment(s) cleared."
+        )
 
 
 def cmd_list_users(_args: argparse.Namespace) -> None:
     """List all users."""
-    users = load_users()
+    users = Session().users
     if not users:
         _warn("No users found.")
         return
@@ -121,63 +190,103 @@ def cmd_add_project(args: argparse.Namespace) -> None:
     """
     Create a project for a user.
     """
-    users = load_users()
-    projects = load_projects()
-
-    owner = get_user_by_name(users, args.user)
-    if not owner:
-        _error(f"No such user: {args.user}")
-        return
-
-    title = args.title.strip()
-    # Optional: warn if project title exists for this owner
-    for p in projects:
-        if p.title.strip().lower() == title.lower() and p.user_id == owner.id:
-            _warn(f"Project '{title}' already exists for user '{owner.name}'.")
-            break
-
-    proj = Project(title=title, user_id=owner.id)
-    projects.append(proj)
-    save_projects(projects)
+    with Session("add-project") as s:
+        try:
+            # Only the owner's projects are read (via the owner index)
+            owned = s.projects_of(args.user)
+            title = args.title.strip()
+            # Optional: warn if project title exists for this owner
+            if any(p.title.strip().lower() == title.lower() for p in owned):
+                _warn(f"Project '{title}' already exists for user '{args.user}'.")
+            proj = s.add_project(args.user, title, args.due)
+        except SessionError as e:
+            _error(str(e))
+            return
     _info(f"Project created: {proj}")
-    print_projects(projects, users_by_id=index_by_id(users))
+    print_projects(owned + [proj], users_by_id=index_by_id(s.users))
 
 
 def cmd_list_projects(args: argparse.Namespace) -> None:
     """
     List projects, optionally filtered by user.
     """
-    users = load_users()
-    projects = load_projects()
-
+    s = Session()
+    owner = None
     if args.user:
-        owner = get_user_by_name(users, args.user)
+        owner = s.user(args.user)
         if not owner:
             _error(f"No such user: {args.user}")
             return
-        projects = [p for p in projects if p.user_id == owner.id]
+    if getattr(args, "watch", False):
+        _watch_projects(owner.id if owner else None, args.interval)
+        return
+    projects = s.projects_of(args.user) if owner else s.projects
 
     if not projects:
         _warn("No projects found.")
         return
 
-    print_projects(projects, users_by_id=index_by_id(users))
+    print_projects(projects, users_by_id=index_by_id(s.users))
 
 
-def cmd_add_task(args: argparse.Namespace) -> None:
+def _watch_projects(owner_id: Optional[str], interval: float) -> None:
+    users_cache: dict = {"fp": None, "by_id": {}}
+
+    def build_rows(snapshot: ProjectSnapshot) -> List[tuple]:
+        fp = fingerprint(storage.USERS_PATH)
+        if fp != users_cache["fp"]:  # owner names only change with users.json
+            users_cache["fp"], users_cache["by_id"] = fp, index_by_id(load_users())
+        return [
+            project_row(p, users_cache["by_id"])
+            for p in snapshot.projects.values()
+            if owner_id is None or p.user_id == owner_id
+        ]
+
+    watch("Projects", PROJECT_HEADERS, build_rows, [storage.USERS_PATH], interval)
+
+
+def cmd_due(args: argparse.Namespace) -> None:
     """
-    Add a task to a project.
+    List projects due within the next N days (today inclusive), soonest first.
     """
-    projects = load_projects()
-    proj = get_project_by_title(projects, args.project)
-    if not proj:
-        _error(f"No such project: {args.project}")
+    if args.days < 0:
+        _error("--days must be 0 (due today) or more")
+        return
+    today = date.today()
+    hi = (today + timedelta(days=args.days)).isoformat()
+    entries = project_index(DUE_DATES).range(today.isoformat(), hi)
+    projects = load_projects_by_ids([pid for _due, pid in entries])
+    if not projects:
+        _warn(f"No projects due in the next {args.days} day(s).")
+        return
+    print_projects(projects, users_by_id=index_by_id(load_users()))
+
+
+def cmd_overdue(_args: argparse.Namespace) -> None:
+    """
+    List projects past their due date, most overdue first.
+    """
+    entries = project_index(DUE_DATES).before(date.today().isoformat())
+    projects = load_projects_by_ids([pid for _due, pid in entries])
+    if not projects:
+        _warn("No overdue projects.")
         return
+    print_projects(projects, users_by_id=index_by_id(load_users()))
+
 
-    title = args.title.strip()
-    task = Task(title=title)
-    proj.add_task(task)
-    save_projects(projects)
+def cmd_add_task(args: argparse.Namespace) -> None:
+    """
+    Add a task to a project.
+    """
+    with Session("add-task") as s:
+        try:
+            task = s.add_task(
+                args.project, args.title, getattr(args, "depends_on", None) or []
+            )
+        except SessionError as e:
+            _error(str(e))
+            return
+        proj = s.project(args.project)
     _info(f"Task created: {task} in project '{proj.title}'")
 
     # Show tasks for this project only
@@ -186,48 +295,244 @@ def cmd_add_task(args: argparse.Namespace) -> None:
 
 def cmd_list_tasks(args: argparse.Namespace) -> None:
     """
-    List tasks, optionally filtered by project.
+    List tasks, optionally filtered by project and optionally including
+    tasks streamed from the archive.
     """
-    projects = load_projects()
+    include_archived = getattr(args, "include_archived", False)
+    created_after = getattr(args, "created_after", None)
+    newest = getattr(args, "newest", None)
+    if newest is not None and newest < 1:
+        _error("--newest must be at least 1")
+        return
+    lo_key = None
+    if created_after:
+        try:
+            lo_key = lower_bound(datetime.fromisoformat(created_after))
+        except ValueError:
+            _error(f"Invalid --created-after: {created_after} (use ISO date/time)")
+            return
 
+    if getattr(args, "desc", False) and not getattr(args, "sort", None):
+        _error("--desc requires --sort")
+        return
+    if _sort_requested(args):
+        if getattr(args, "watch", False) or lo_key or newest:
+            _error(
+                "--sort/--limit/--memory-budget cannot be combined with "
+                "--watch, --newest or --created-after"
+            )
+            return
+        _list_sorted_tasks(args, include_archived)
+        return
+
+    if getattr(args, "watch", False):
+        if include_archived or lo_key or newest:
+            _error("--watch cannot be combined with archive or recency filters")
+            return
+        _watch_tasks(args.project, args.interval)
+        return
+
+    if (lo_key or newest) and not args.project:
+        _list_recent_tasks(lo_key, newest, include_archived)
+        return
+
+    projects = load_projects()
     if args.project:
         proj = get_project_by_title(projects, args.project)
         if not proj:
             _error(f"No such project: {args.project}")
             return
-        if not proj.tasks:
+        rows = [(t, proj.id) for t in proj.tasks]
+        if include_archived:
+            rows.extend(iter_archived(proj.id))
+        if lo_key or newest:
+            rows = _recent(rows, lo_key, newest)
+        if not rows:
             _warn(f"No tasks found for project '{proj.title}'.")
             return
-        print_tasks([(t, proj.id) for t in proj.tasks], projects_by_id={proj.id: proj})
+        print_tasks(rows, projects_by_id={proj.id: proj})
         return
 
     # All tasks across all projects
     flat = _flatten_tasks_with_project_id(projects)
+    projects_by_id = {p.id: p for p in projects}
+    if include_archived:
+        stream = chain(flat, iter_archived())
+        first = next(stream, None)  # the archive is streamed: peek for emptiness
+        if first is None:
+            _warn("No tasks found.")
+            return
+        print_tasks(chain([first], stream), projects_by_id=projects_by_id)
+        return
     if not flat:
         _warn("No tasks found.")
         return
-    projects_by_id = {p.id: p for p in projects}
     print_tasks(flat, projects_by_id=projects_by_id)
 
 
+def _sort_requested(args: argparse.Namespace) -> bool:
+    return bool(
+        getattr(args, "sort", None)
+        or getattr(args, "limit", None) is not None
+        or getattr(args, "memory_budget", None)
+    )
+
+
+def _list_sorted_tasks(args: argparse.Namespace, include_archived: bool) -> None:
+    """
+    list-tasks with --sort / --limit / --memory-budget. Without a limit or
+    budget everything is sorted in memory. Otherwise tasks stream from disk
+    one project at a time: --limit keeps a bounded top-N heap (then reads
+    just the projects it needs), and --memory-budget external-merge-sorts
+    within the budget and streams rows straight into the output.
+    """
+    sort = getattr(args, "sort", None)
+    limit = getattr(args, "limit", None)
+    desc = getattr(args, "desc", False)
+    if limit is not None and limit < 1:
+        _error("--limit must be at least 1.")
+        return
+    budget = None
+    if getattr(args, "memory_budget", None):
+        try:
+            budget = sorting.parse_budget(args.memory_budget)
+        except ValueError as e:
+            _error(str(e))
+            return
+
+    if budget is None and limit is None:
+        projects = load_projects()
+        if args.project:
+            proj = get_project_by_title(projects, args.project)
+            if not proj:
+                _error(f"No such project: {args.project}")
+                return
+            rows: Iterable[Tuple[Task, str]] = [(t, proj.id) for t in proj.tasks]
+            if include_archived:
+                rows = chain(rows, iter_archived(proj.id))
+        else:
+            rows = _flatten_tasks_with_project_id(projects)
+            if include_archived:
+                rows = chain(rows, iter_archived())
+        titles = {p.id: p.title for p in projects}
+        ordered = sorting.sorted_rows(rows, sort, titles, reverse=desc)
+        if not ordered:
+            _warn("No tasks found.")
+            return
+        print_tasks(ordered, projects_by_id=index_by_id(projects))
+        return
+
+    titles: Dict[str, str] = {}
+    if args.project or budget is not None or sort == "project":
+        titles = {p["id"]: p["title"] for p in iter_projects()}
+    if args.project:
+        wanted = args.project.strip().lower()
+        if not any(t.strip().lower() == wanted for t in titles.values()):
+            _error(f"No such project: {args.project}")
+            return
+    rows = iter_flat_tasks(args.project, include_archived)
+    ordered = sorting.sorted_rows(rows, sort, titles, limit, budget, desc)
+    if limit is not None:
+        top = list(ordered)
+        if not top:
+            _warn("No tasks found.")
+            return
+        pids = list(dict.fromkeys(pid for _task, pid in top))
+        print_tasks(top, projects_by_id=index_by_id(load_projects_by_ids(pids)))
+        return
+    stream = iter(ordered)
+    first = next(stream, None)
+    if first is None:
+        _warn("No tasks found.")
+        return
+    stream_tasks(chain([first], stream), titles)
+
+
+def _watch_tasks(project_title: Optional[str], interval: float) -> None:
+    wanted = (project_title or "").strip().lower()
+
+    def build_rows(snapshot: ProjectSnapshot) -> List[tuple]:
+        projects = [
+            p
+            for p in snapshot.projects.values()
+            if not wanted or p.title.strip().lower() == wanted
+        ]
+        by_id = {p.id: p for p in projects}
+        return [task_row((t, p.id), by_id) for p in projects for t in p.tasks]
+
+    watch("Tasks", TASK_HEADERS, build_rows, interval=interval)
+
+
+def _task_sort_key(row: Tuple[Task, str]) -> str:
+    task = row[0]
+    return sort_key(task.id, task.created_at) or ""
+
+
+def _recent(
+    rows: Iterable[Tuple[Task, str]], lo_key: Optional[str], newest: Optional[int]
+) -> List[Tuple[Task, str]]:
+    """
+    In-memory fallback: keep rows created at/after lo_key, oldest first,
+    or the `newest` most recent, newest first.
+    """
+    if lo_key:
+        rows = (r for r in rows if _task_sort_key(r) >= lo_key)
+    if newest:
+        return heapq.nlargest(newest, rows, key=_task_sort_key)
+    return sorted(rows, key=_task_sort_key)
+
+
+def _list_recent_tasks(
+    lo_key: Optional[str], newest: Optional[int], include_archived: bool
+) -> None:
+    """
+    Range-scan the creation-time task index instead of sorting every task;
+    only the projects holding matching tasks are read.
+    """
+    idx = project_index(TASKS_BY_CREATED)
+    entries = idx.latest(newest, lo_key) if newest else idx.range(lo_key)
+    project_ids = list(dict.fromkeys(pid for _key, pid, _tid in entries))
+    projects_by_id = index_by_id(load_projects_by_ids(project_ids))
+    tasks_by_id = {t.id: t for p in projects_by_id.values() for t in p.tasks}
+    rows = [(tasks_by_id[tid], pid) for _k, pid, tid in entries if tid in tasks_by_id]
+    if include_archived:
+        rows = _recent(chain(rows, iter_archived()), lo_key, newest)
+    if not rows:
+        _warn("No matching tasks found.")
+        return
+    print_tasks(rows, projects_by_id=projects_by_id)
+
+
 def cmd_complete_task(args: argparse.Namespace) -> None:
     """
     Mark a task as completed by its UUID.
     """
-    projects = load_projects()
     tid = args.id.strip()
-    task, parent = _find_task_by_id(projects, tid)
-    if not task or not parent:
-        _error(f"No such task id: {tid}")
-        return
-    if getattr(task, "completed", False):
+    archived = 0
+    with Session("complete-task") as s:
+        found = s.task(tid)
+        if not found:
+            _error(f"No such task id: {tid}")
+            return
+        task, parent = found
+        already = task.completed
+        if not already:
+            s.complete(tid)
+            days = load_policy()
+            if days is not None:
+                archived = s.archive(older_than_days=days)
+
+    if already:
         _warn(f"Task '{task.title}' is already completed.")
     else:
-        task.mark_complete()
-        save_projects(projects)
         _info(
             f"Task completed: {task.title} (id={task.id}) in project '{parent.title}'"
         )
+        if archived:
+            _info(f"Auto-archived {archived} completed task(s).")
+        unblocked = project_index(DEPENDENCIES).unblocked_by(task.id)
+        if unblocked:
+            _info(f"Now ready: {len(unblocked)} dependent task(s).")
 
     # Show that project’s tasks after update
     print_tasks(
@@ -235,6 +540,488 @@ def cmd_complete_task(args: argparse.Namespace) -> None:
     )
 
 
+def cmd_set_status(args: argparse.Namespace) -> None:
+    """
+    Start a task (in_progress) or move it back to todo; complete-task
+    finishes it.
+    """
+    tid = args.id.strip()
+    try:
+        with Session("set-status") as s:
+            found = s.task(tid)
+            if not found:
+                _error(f"No such task id: {tid}")
+                return
+            before = found[0].status
+            task, parent = s.set_status(tid, args.status)
+    except SessionError as e:
+        _error(str(e))
+        return
+    if before == task.status:
+        _warn(f"Task '{task.title}' is already {task.status}.")
+    else:
+        _info(f"Task '{task.title}' moved from {before} to {task.status}.")
+
+
+def cmd_assign(args: argparse.Namespace) -> None:
+    """
+    Assign a task (by UUID) to a user (by name).
+    """
+    tid = args.id.strip()
+    with Session("assign") as s:
+        user = s.user(args.user)
+        if not user:
+            _error(f"No such user: {args.user}")
+            return
+        found = s.task(tid)
+        if not found:
+            _error(f"No such task id: {tid}")
+            return
+        task = found[0]
+        if task.assigned_to == user.id:
+            _warn(f"Task '{task.title}' is already assigned to '{user.name}'.")
+            return
+        s.assign(tid, user.name)
+    _info(f"Task assigned: {task.title} (id={task.id}) -> {user.name}")
+
+
+def cmd_unassign(args: argparse.Namespace) -> None:
+    """
+    Clear a task's assignee.
+    """
+    tid = args.id.strip()
+    with Session("unassign") as s:
+        found = s.task(tid)
+        if not found:
+            _error(f"No such task id: {tid}")
+            return
+        task = found[0]
+        if not task.assigned_to:
+            _warn(f"Task '{task.title}' is not assigned.")
+            return
+        s.unassign(tid)
+    _info(f"Task unassigned: {task.title} (id={task.id})")
+
+
+def cmd_my_tasks(args: argparse.Namespace) -> None:
+    """
+    List tasks assigned to a user, via the assignee index
+    (only the projects holding those tasks are read).
+    """
+    s = Session()
+    try:
+        rows = s.tasks_assigned_to(args.user)
+    except SessionError as e:
+        _error(str(e))
+        return
+    if not rows:
+        _warn(f"No tasks assigned to '{args.user}'.")
+        return
+    projects_by_id = {pid: s.task(t.id)[1] for t, pid in rows}
+    print_tasks(rows, projects_by_id=projects_by_id)
+
+
+def _resolve_project_id(title: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """
+    (ok, project_id) for an optional --project filter; reports unknown titles.
+    """
+    if not title:
+        return True, None
+    proj = get_project_by_title(load_projects(), title)
+    if not proj:
+        _error(f"No such project: {title}")
+        return False, None
+    return True, proj.id
+
+
+def cmd_depend(args: argparse.Namespace) -> None:
+    """
+    Make a task depend on one or more others (across projects), rejecting
+    any edge that would create a cycle.
+    """
+    with Session("depend") as s:
+        try:
+            task, added = s.depend(args.id.strip(), args.on)
+        except SessionError as e:
+            _error(str(e))
+            return
+    if not added:
+        _warn(f"Task '{task.title}' already depends on the given task(s).")
+        return
+    _info(f"Task '{task.title}' now depends on {len(added)} more task(s).")
+
+
+def cmd_undepend(args: argparse.Namespace) -> None:
+    """
+    Remove dependencies from a task.
+    """
+    with Session("undepend") as s:
+        try:
+            task, removed = s.undepend(args.id.strip(), args.on)
+        except SessionError as e:
+            _error(str(e))
+            return
+    if not removed:
+        _warn(f"Task '{task.title}' does not depend on the given task(s).")
+        return
+    _info(f"Removed {len(removed)} dependency(ies) from '{task.title}'.")
+
+
+def cmd_ready(args: argparse.Namespace) -> None:
+    """
+    List open tasks whose dependencies are all done.
+    """
+    ok, project_id = _resolve_project_id(args.project)
+    if not ok:
+        return
+    refs = project_index(DEPENDENCIES).ready(project_id)
+    rows, projects_by_id = _load_task_refs(refs)
+    if not rows:
+        _warn("No ready tasks.")
+        return
+    print_tasks(rows, projects_by_id=projects_by_id)
+
+
+def cmd_blocked(args: argparse.Namespace) -> None:
+    """
+    List open tasks waiting on unfinished dependencies.
+    """
+    ok, project_id = _resolve_project_id(args.project)
+    if not ok:
+        return
+    entries = project_index(DEPENDENCIES).blocked(project_id)
+    rows, projects_by_id = _load_task_refs((pid, tid) for pid, tid, _w in entries)
+    if not rows:
+        _warn("No blocked tasks.")
+        return
+    print_tasks(rows, projects_by_id=projects_by_id)
+    for _pid, tid, waiting in entries:
+        _info(f"{tid} waits on: {', '.join(waiting)}")
+
+
+def cmd_critical_path(args: argparse.Namespace) -> None:
+    """
+    Show the longest chain of open tasks gating a project's completion.
+    """
+    ok, project_id = _resolve_project_id(args.project)
+    if not ok:
+        return
+    graph = project_index(DEPENDENCIES)
+    path = graph.critical_path(project_id)
+    if not path:
+        _warn(f"No open tasks in project '{args.project}'.")
+        return
+    rows, projects_by_id = _load_task_refs((graph.nodes[t][0], t) for t in path)
+    _info(f"Critical path: {len(path)} task(s), first to last.")
+    print_tasks(rows, projects_by_id=projects_by_id)
+
+
+def cmd_archive(args: argparse.Namespace) -> None:
+    """
+    Move completed tasks into compressed monthly archive segments,
+    or set/clear the auto-archive policy.
+    """
+    if args.auto is not None:
+        days = args.auto if args.auto > 0 else None
+        save_policy(days)
+        if days is None:
+            _info("Auto-archive disabled.")
+        else:
+            _info(f"Auto-archive enabled for completed tasks older than {days} day(s).")
+        return
+
+    with Session("archive") as s:
+        moved = s.archive(older_than_days=args.older_than, codec=args.codec)
+    if not moved:
+        _warn("No completed tasks to archive.")
+        return
+    _info(f"Archived {moved} completed task(s).")
+
+
+def _duration(seconds: float) -> str:
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 2 * 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+
+def cmd_cycle_time(args: argparse.Namespace) -> None:
+    """
+    Lead/cycle time percentiles per project from the status-transition log
+    (live and archived tasks).
+    """
+    try:
+        percentiles = [float(p) for p in args.percentiles.split(",") if p.strip()]
+    except ValueError:
+        percentiles = []
+    if not percentiles or not all(0 < p <= 100 for p in percentiles):
+        _error("--percentiles takes comma-separated values in (0, 100].")
+        return
+    ok, pid = _resolve_project_id(args.project)
+    if not ok:
+        return
+    projects = load_projects()
+    titles = {p.id: p.title for p in projects}
+    live = ((t, p.id) for p in projects if pid is None or p.id == pid for t in p.tasks)
+    rows = transitions.cycle_times(
+        storage.DATA_DIR, chain(live, iter_archived(pid)), percentiles
+    )
+    if not rows:
+        _warn("No completed tasks with recorded transitions.")
+        return
+
+    labels = [f"p{p:g}" for p in percentiles]
+    headers = ["Project", "Done"]
+    headers += [f"Lead {x}" for x in labels] + [f"Cycle {x}" for x in labels]
+    table = []
+    for row in rows:
+        line = [titles.get(row["project_id"], row["project_id"]), row["done"]]
+        for key in ("lead", "cycle"):
+            line += [
+                _duration(row[key][p]) if p in row[key] else "-" for p in percentiles
+            ]
+        table.append(line)
+    print_table("Cycle time", headers, table)
+
+
+def cmd_export(args: argparse.Namespace) -> None:
+    """
+    Stream users, projects or flattened tasks to CSV, JSONL or chunked
+    columnar output (stdout unless --out is given).
+    """
+    out_path = Path(args.out) if args.out and args.out != "-" else None
+    try:
+        n = export(
+            args.entity,
+            args.format,
+            out_path=out_path,
+            project_title=args.project,
+            include_archived=args.include_archived,
+            chunk_rows=args.chunk_rows,
+        )
+    except ValueError as e:
+        _error(str(e))
+        sys.exit(1)
+    if out_path is not None:
+        _info(f"Exported {n} {args.entity} row(s) to {out_path}")
+    else:
+        print(f"Exported {n} {args.entity} row(s)", file=sys.stderr)
+
+
+def cmd_history(args: argparse.Namespace) -> None:
+    """
+    List recorded transactions, newest first.
+    """
+    if args.limit < 0:
+        _error("--limit must be 0 (all) or more")
+        return
+    txns = history.transactions(storage.DATA_DIR)
+    if not txns:
+        _warn("No history recorded.")
+        return
+    rows = (
+        (t["txn"], t["ts"], t["label"], "+".join(t["files"]), t["records"])
+        for t in reversed(txns[-args.limit :] if args.limit else txns)
+    )
+    print_table("History", ["Txn", "When", "Command", "Files", "Records"], rows)
+
+
+def cmd_undo(args: argparse.Namespace) -> None:
+    """
+    Undo the last N transactions, or rewind to just after transaction --to.
+    """
+    try:
+        if args.to is not None:
+            undone = history.rewind(storage.DATA_DIR, args.to)
+        else:
+            undone = history.undo(storage.DATA_DIR, args.steps)
+    except history.HistoryError as e:
+        _error(str(e))
+        return
+    if not undone:
+        _warn("Nothing to undo.")
+        return
+    storage.refresh_names()
+    for t in undone:
+        _info(f"Undid #{t['txn']} {t['label']} ({t['ts']})")
+
+
+def cmd_migrate(args: argparse.Namespace) -> None:
+    """
+    Upgrade the data files to a newer schema in one streaming pass each.
+    """
+    try:
+        reports = migrations.migrate(target=args.to, dry_run=args.dry_run)
+    except (ValueError, migrations.MigrationError) as e:
+        _error(str(e))
+        return
+    if not reports:
+        _info(f"Data files are already at schema v{args.to}.")
+        return
+    for r in reports:
+        rate = r["records"] / r["seconds"] if r["seconds"] else 0.0
+        verb = "Would migrate" if args.dry_run else "Migrated"
+        _info(
+            f"{verb} {r['file']}: v{r['from']} -> v{r['to']}, "
+            f"{r['records']} record(s) in {r['seconds']:.2f}s ({rate:,.0f}/s)"
+        )
+        for field, n in sorted(r["defaults"].items()):
+            _warn(f"  {n} record(s) had no {field}; filled with a default")
+    if not args.dry_run:
+        storage.refresh_names()
+        history.reset(storage.DATA_DIR)
+        _warn("Undo history was cleared (it cannot span a schema migration).")
+
+
+def _print_replication_status(report: dict) -> None:
+    _info(
+        f"lsn {report['lsn']}/{report['head']} "
+        f"({report['behind']} behind, lag {report['lag_seconds']:.1f}s)"
+    )
+
+
+def cmd_replicate(args: argparse.Namespace) -> None:
+    """
+    Make this data directory a read-only replica of --from and apply its
+    change log (once, or continuously with --follow), reporting lag.
+    """
+    data_dir = storage.DATA_DIR
+    if args.resync:
+        replication.resync(data_dir)
+    while True:
+        try:
+            report = replication.replicate(data_dir, args.source, batch=args.batch)
+        except (OSError, replication.ReplicationError) as e:
+            _error(str(e))
+            return
+        if report["applied"]:
+            storage.refresh_names()
+        if report["applied"] or not args.follow:
+            _info(f"Applied {report['applied']} change(s) from {args.source}.")
+            _print_replication_status(report)
+        if not args.follow:
+            return
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return
+
+
+def cmd_enable_replication(_args: argparse.Namespace) -> None:
+    """
+    Start logging this primary's writes so replicas can follow it.
+    """
+    try:
+        base = replication.enable(storage.DATA_DIR)
+    except OSError as e:
+        _error(str(e))
+        return
+    _info(f"Logging changes of {storage.DATA_DIR} for replicas from lsn {base}.")
+
+
+def cmd_promote(_args: argparse.Namespace) -> None:
+    """
+    Promote a replica to a writable primary (failover).
+    """
+    try:
+        lsn = replication.promote(storage.DATA_DIR)
+    except replication.ReplicationError as e:
+        _error(str(e))
+        return
+    _info(f"Promoted {storage.DATA_DIR} to primary at lsn {lsn}.")
+
+
+def cmd_ship_log(args: argparse.Namespace) -> None:
+    """
+    Serve this node's change log to replicas on a unix socket.
+    """
+    _info(f"Serving change log of {storage.DATA_DIR} on {args.socket}")
+    try:
+        replication.serve(storage.DATA_DIR, Path(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+def cmd_dispatch(args: argparse.Namespace) -> None:
+    """
+    Deliver pending outbox events to --sink in batches (once, or
+    continuously with --follow).
+    """
+    try:
+        sink = outbox.make_sink(args.sink)
+    except ValueError as e:
+        _error(str(e))
+        return
+    while True:
+        try:
+            sent = outbox.dispatch(
+                storage.DATA_DIR, sink, batch=args.batch, retries=args.retries
+            )
+        except outbox.DispatchError as e:
+            _error(str(e))
+            return
+        if sent or not args.follow:
+            _info(f"Delivered {sent} event(s) to {args.sink}.")
+        if not args.follow:
+            return
+        try:
+            time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return
+
+
+def cmd_fsck(args: argparse.Namespace) -> None:
+    """
+    Validate the data files in parallel, optionally salvaging valid records
+    into <name>.repaired.json. Exits with status 1 if problems were found.
+    """
+    try:
+        report = fsck.fsck(
+            storage.DATA_DIR,
+            workers=args.workers,
+            repair=args.repair,
+            reassign_to=args.reassign_orphans_to,
+        )
+    except ValueError as e:
+        _error(str(e))
+        return
+    found = 0
+    for f in report["files"]:
+        problems = f["problems"]
+        found += len(problems)
+        line = f"{f['file']}: {f['records']} record(s), {len(problems)} problem(s)"
+        if problems:
+            _warn(f"{line}, {f['kept']} salvageable")
+        else:
+            _info(line)
+        shown = problems if args.verbose else problems[: args.max_problems]
+        for msg in shown:
+            echo(f"  {msg}")
+        if len(shown) < len(problems):
+            echo(f"  ... {len(problems) - len(shown)} more (use --verbose)", "dim")
+        if "repaired" in f:
+            _info(f"  Salvaged {f['kept']} record(s) into {f['repaired']}")
+
+    secs = report["seconds"] or 1e-9
+    _info(
+        f"Checked {report['records']:,} record(s), "
+        f"{report['bytes'] / 1e6:.1f} MB in {report['seconds']:.2f}s "
+        f"({report['records'] / secs:,.0f} records/s, "
+        f"{report['bytes'] / 1e6 / secs:.1f} MB/s, {report['workers']} worker(s))"
+    )
+    if found:
+        sys.exit(1)
+
+
+def cmd_completion(args: argparse.Namespace) -> None:
+    """
+    Print a shell completion script (load it with `source <(...)`).
+    """
+    storage.refresh_names()  # seed the name lists on first use
+    print(completion.script(build_parser(), args.shell, args.prog, storage.DATA_DIR))
+
+
 # ------------- Parser Setup ------------- #
 
 
@@ -245,6 +1032,9 @@ def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="project-tracker", description="Command-line Project Management Tool"
     )
+    parser.add_argument(
+        "--data-dir", type=Path, help="Data directory to use (default: ./data)"
+    )
     sub = parser.add_subparsers(dest="command", required=True)
 
     # add-user
@@ -257,10 +1047,20 @@ def build_parser() -> argparse.ArgumentParser:
     p = sub.add_parser("list-users", help="List users")
     p.set_defaults(func=cmd_list_users)
 
+    # delete-user
+    p = sub.add_parser("delete-user", help="Delete a user and cascade or reassign")
+    p.add_argument("--name", required=True, help="User's name")
+    p.add_argument(
+        "--reassign-to",
+        help="Hand the user's projects and tasks to this user instead of deleting",
+    )
+    p.set_defaults(func=cmd_delete_user)
+
     # add-project
     p = sub.add_parser("add-project", help="Create a project for a user")
     p.add_argument("--user", required=True, help="Owner user's name")
     p.add_argument("--title", required=True, help="Project title")
+    p.add_argument("--due", help="Due date (YYYY-MM-DD)")
     p.set_defaults(func=cmd_add_project)
 
     # list-projects
@@ -268,17 +1068,79 @@ def build_parser() -> argparse.ArgumentParser:
         "list-projects", help="List projects (optionally filter by user)"
     )
     p.add_argument("--user", help="Filter by owner user's name")
+    p.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep the table open and redraw rows as the data changes",
+    )
+    p.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Watch poll interval in seconds (default: 1.0)",
+    )
     p.set_defaults(func=cmd_list_projects)
 
+    # due
+    p = sub.add_parser("due", help="List projects due in the next N days")
+    p.add_argument("--days", type=int, default=7, help="Look-ahead window (default: 7)")
+    p.set_defaults(func=cmd_due)
+
+    # overdue
+    p = sub.add_parser("overdue", help="List overdue projects, most overdue first")
+    p.set_defaults(func=cmd_overdue)
+
     # add-task
     p = sub.add_parser("add-task", help="Add a task to a project")
     p.add_argument("--project", required=True, help="Project title")
     p.add_argument("--title", required=True, help="Task title")
+    p.add_argument(
+        "--depends-on", nargs="+", metavar="TASK_ID", help="Prerequisite task ids"
+    )
     p.set_defaults(func=cmd_add_task)
 
     # list-tasks
     p = sub.add_parser("list-tasks", help="List tasks (optionally filter by project)")
     p.add_argument("--project", help="Filter by project title")
+    p.add_argument(
+        "--include-archived",
+        action="store_true",
+        help="Also stream tasks from the archive",
+    )
+    p.add_argument(
+        "--created-after",
+        metavar="DATE",
+        help="Only tasks created at/after this ISO date or datetime",
+    )
+    p.add_argument(
+        "--newest", type=int, metavar="N", help="Only the N most recent tasks"
+    )
+    p.add_argument(
+        "--sort", choices=sorting.SORT_FIELDS, help="Order tasks by this field"
+    )
+    p.add_argument("--desc", action="store_true", help="Reverse the --sort order")
+    p.add_argument(
+        "--limit",
+        type=int,
+        metavar="N",
+        help="Only the first N tasks (with --sort: a bounded top-N heap)",
+    )
+    p.add_argument(
+        "--memory-budget",
+        metavar="SIZE",
+        help="Stream tasks and sort on disk within SIZE (e.g. 256M)",
+    )
+    p.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep the table open and redraw rows as the data changes",
+    )
+    p.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Watch poll interval in seconds (default: 1.0)",
+    )
     p.set_defaults(func=cmd_list_tasks)
 
     # complete-task
@@ -286,13 +1148,250 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--id", required=True, help="Task UUID")
     p.set_defaults(func=cmd_complete_task)
 
+    # set-status
+    p = sub.add_parser("set-status", help="Start a task or move it back to todo")
+    p.add_argument("--id", required=True, help="Task ID")
+    p.add_argument(
+        "--status", required=True, choices=["in_progress", "todo"], help="New status"
+    )
+    p.set_defaults(func=cmd_set_status)
+
+    # assign
+    p = sub.add_parser("assign", help="Assign a task to a user")
+    p.add_argument("--id", required=True, help="Task UUID")
+    p.add_argument("--user", required=True, help="Assignee user's name")
+    p.set_defaults(func=cmd_assign)
+
+    # unassign
+    p = sub.add_parser("unassign", help="Clear a task's assignee")
+    p.add_argument("--id", required=True, help="Task UUID")
+    p.set_defaults(func=cmd_unassign)
+
+    # my-tasks
+    p = sub.add_parser("my-tasks", help="List tasks assigned to a user")
+    p.add_argument("--user", required=True, help="Assignee user's name")
+    p.set_defaults(func=cmd_my_tasks)
+
+    # depend / undepend
+    p = sub.add_parser("depend", help="Make a task depend on other tasks")
+    p.add_argument("--id", required=True, help="Dependent task UUID")
+    p.add_argument(
+        "--on", required=True, nargs="+", metavar="TASK_ID", help="Prerequisites"
+    )
+    p.set_defaults(func=cmd_depend)
+
+    p = sub.add_parser("undepend", help="Remove task dependencies")
+    p.add_argument("--id", required=True, help="Dependent task UUID")
+    p.add_argument("--on", required=True, nargs="+", metavar="TASK_ID")
+    p.set_defaults(func=cmd_undepend)
+
+    # ready / blocked / critical-path
+    p = sub.add_parser("ready", help="List open tasks with all dependencies done")
+    p.add_argument("--project", help="Filter by project title")
+    p.set_defaults(func=cmd_ready)
+
+    p = sub.add_parser("blocked", help="List tasks waiting on open dependencies")
+    p.add_argument("--project", help="Filter by project title")
+    p.set_defaults(func=cmd_blocked)
+
+    p = sub.add_parser(
+        "critical-path", help="Longest dependency chain gating a project"
+    )
+    p.add_argument("--project", required=True, help="Project title")
+    p.set_defaults(func=cmd_critical_path)
+
+    # archive
+    p = sub.add_parser(
+        "archive", help="Archive completed tasks into compressed segments"
+    )
+    p.add_argument(
+        "--older-than",
+        type=int,
+        metavar="DAYS",
+        help="Only archive tasks created at least DAYS ago",
+    )
+    p.add_argument(
+        "--codec",
+        choices=sorted(CODECS),
+        default=DEFAULT_CODEC,
+        help="Segment compression (default: gzip)",
+    )
+    p.add_argument(
+        "--auto",
+        type=int,
+        metavar="DAYS",
+        help="Auto-archive on complete-task once tasks are DAYS old (0 disables)",
+    )
+    p.set_defaults(func=cmd_archive)
+
+    # cycle-time
+    p = sub.add_parser(
+        "cycle-time", help="Lead/cycle time percentiles from status transitions"
+    )
+    p.add_argument("--project", help="Only this project")
+    p.add_argument(
+        "--percentiles",
+        default="50,85,95",
+        help="Comma-separated percentiles (default: 50,85,95)",
+    )
+    p.set_defaults(func=cmd_cycle_time)
+
+    # export
+    p = sub.add_parser("export", help="Stream data to CSV, JSONL or columnar files")
+    p.add_argument("entity", choices=sorted(FIELDS), help="What to export")
+    p.add_argument("--format", choices=FORMATS, default="csv", help="Output format")
+    p.add_argument("--out", help="Output file (default: stdout)")
+    p.add_argument("--project", help="Only this project (by title)")
+    p.add_argument(
+        "--include-archived",
+        action="store_true",
+        help="Also export archived tasks (tasks only)",
+    )
+    p.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help=f"Rows per write chunk (default: {DEFAULT_CHUNK_ROWS})",
+    )
+    p.set_defaults(func=cmd_export)
+
+    # history
+    p = sub.add_parser("history", help="List undoable changes, newest first")
+    p.add_argument("--limit", type=int, default=20, help="Show at most N (0 = all)")
+    p.set_defaults(func=cmd_history)
+
+    # undo
+    p = sub.add_parser("undo", help="Undo recent changes")
+    p.add_argument(
+        "steps", nargs="?", type=int, default=1, help="How many changes to undo"
+    )
+    p.add_argument(
+        "--to", type=int, metavar="TXN", help="Rewind to just after this change"
+    )
+    p.set_defaults(func=cmd_undo)
+
+    # migrate
+    p = sub.add_parser("migrate", help="Upgrade data files to a newer schema")
+    p.add_argument(
+        "--to",
+        type=int,
+        default=storage.CURRENT_SCHEMA,
+        help=f"Target schema version (default: {storage.CURRENT_SCHEMA})",
+    )
+    p.add_argument(
+        "--dry-run", action="store_true", help="Report what would change only"
+    )
+    p.set_defaults(func=cmd_migrate)
+
+    # replication
+    p = sub.add_parser(
+        "replicate", help="Follow a primary's change log as a read-only replica"
+    )
+    p.add_argument(
+        "--from",
+        dest="source",
+        required=True,
+        help="Primary data directory or ship-log socket path",
+    )
+    p.add_argument("--follow", action="store_true", help="Keep tailing the log")
+    p.add_argument(
+        "--interval", type=float, default=1.0, help="Follow poll interval (s)"
+    )
+    p.add_argument(
+        "--batch",
+        type=int,
+        default=replication.DEFAULT_BATCH,
+        help="Entries applied per batch",
+    )
+    p.add_argument(
+        "--resync",
+        action="store_true",
+        help="Discard local data and replay the primary from the start",
+    )
+    p.set_defaults(func=cmd_replicate)
+
+    p = sub.add_parser(
+        "enable-replication", help="Log this primary's writes for replicas"
+    )
+    p.set_defaults(func=cmd_enable_replication)
+
+    p = sub.add_parser("promote", help="Promote this replica to primary")
+    p.set_defaults(func=cmd_promote)
+
+    p = sub.add_parser("ship-log", help="Serve the change log on a unix socket")
+    p.add_argument("--socket", required=True, help="Socket path to listen on")
+    p.set_defaults(func=cmd_ship_log)
+
+    # dispatch
+    p = sub.add_parser("dispatch", help="Deliver outbox events to a sink")
+    p.add_argument(
+        "--sink", required=True, help="file:PATH, unix:PATH or an http:// URL"
+    )
+    p.add_argument(
+        "--batch",
+        type=int,
+        default=outbox.DEFAULT_BATCH,
+        help=f"Events per delivery (default: {outbox.DEFAULT_BATCH})",
+    )
+    p.add_argument(
+        "--retries",
+        type=int,
+        default=outbox.DEFAULT_RETRIES,
+        help=f"Retries per batch (default: {outbox.DEFAULT_RETRIES})",
+    )
+    p.add_argument("--follow", action="store_true", help="Keep delivering")
+    p.add_argument(
+        "--interval", type=float, default=1.0, help="Follow poll interval (s)"
+    )
+    p.set_defaults(func=cmd_dispatch)
+
+    # fsck
+    p = sub.add_parser("fsck", help="Check the data files for corruption")
+    p.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    p.add_argument(
+        "--repair",
+        action="store_true",
+        help="Write valid records to <name>.repaired.json",
+    )
+    p.add_argument(
+        "--reassign-orphans-to",
+        metavar="USER_ID",
+        help="Keep projects whose owner is missing, owned by this user",
+    )
+    p.add_argument(
+        "--max-problems",
+        type=int,
+        default=20,
+        help="Problems listed per file (default: 20)",
+    )
+    p.add_argument("--verbose", action="store_true", help="List every problem")
+    p.set_defaults(func=cmd_fsck)
+
+    # completion
+    p = sub.add_parser("completion", help="Print a bash/zsh completion script")
+    p.add_argument("shell", choices=completion.SHELLS, help="Target shell")
+    p.add_argument(
+        "--prog",
+        default=parser.prog,
+        help=f"Command name to complete (default: {parser.prog})",
+    )
+    p.set_defaults(func=cmd_completion)
+
     return parser
 
 
 def main(argv: Optional[list[str]] = None) -> None:
     parser = build_parser()
     args = parser.parse_args(argv)
-    args.func(args)
+    if args.data_dir:
+        storage.use_data_dir(args.data_dir)
+    # All writes made by one command undo as a single step
+    with history.transaction(storage.DATA_DIR, args.command):
+        try:
+            args.func(args)
+        except (replication.ReadOnlyError, storage.SchemaError) as e:
+            _error(str(e))
+            sys.exit(1)
 
 
 if __name__ == "__main__":
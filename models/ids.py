@@ -0,0 +1,99 @@
+import os
+import secrets
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+# Record id schemes. "uuid4" (default) is random; "uuid7" is RFC 9562's
+# time-ordered layout (48-bit Unix ms timestamp first), so ids sort by
+# creation time as plain strings and range scans replace full sorts.
+# Opt in with PPM_ID_SCHEME=uuid7; both kinds coexist in the same files.
+ID_SCHEME_ENV = "PPM_ID_SCHEME"
+SCHEMES = ("uuid4", "uuid7")
+
+_lock = threading.Lock()
+_last_ms = -1
+_counter = 0
+
+
+def uuid7(ms: Optional[int] = None) -> str:
+    """
+    Return a UUIDv7 string (for instant `ms` if given). Ids minted in the
+    same millisecond by this process stay strictly increasing via a 12-bit
+    counter in rand_a.
+    """
+    global _last_ms, _counter
+    if ms is not None:  # explicit instant: no monotonic bookkeeping
+        now, counter = ms, secrets.randbits(12)
+    else:
+        with _lock:
+            now = int(time.time() * 1000)
+            if now <= _last_ms:
+                now = _last_ms
+                _counter += 1
+                if _counter > 0xFFF:  # counter exhausted: borrow the next ms
+                    now += 1
+                    _counter = 0
+            else:
+                _counter = secrets.randbits(8)  # leave headroom for increments
+            _last_ms = now
+            counter = _counter
+    value = (now & 0xFFFFFFFFFFFF) << 80
+    value |= 0x7 << 76
+    value |= counter << 64
+    value |= 0b10 << 62
+    value |= secrets.randbits(62)
+    return str(uuid.UUID(int=value))
+
+
+def new_id() -> str:
+    """
+    Mint an id using the scheme selected by PPM_ID_SCHEME (default uuid4).
+    """
+    scheme = os.environ.get(ID_SCHEME_ENV, "uuid4").strip().lower()
+    if scheme == "uuid7":
+        return uuid7()
+    return str(uuid.uuid4())
+
+
+def is_time_ordered(record_id: str) -> bool:
+    """True for UUIDv7 ids (version nibble 7)."""
+    return len(record_id) == 36 and record_id[14] == "7"
+
+
+def _ms_of(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def lower_bound(dt: datetime) -> str:
+    """
+    The smallest UUIDv7-shaped key for instant `dt`: every id minted at or
+    after `dt` sorts >= this string.
+    """
+    ms = _ms_of(dt) & 0xFFFFFFFFFFFF
+    return str(uuid.UUID(int=(ms << 80) | (0x7 << 76) | (0b10 << 62)))
+
+
+def sort_key(record_id: str, created_at: Optional[str]) -> Optional[str]:
+    """
+    Creation-time sort key comparable across schemes: a UUIDv7 id is its own
+    key; legacy ids map to lower_bound(created_at). None if neither works.
+    """
+    if is_time_ordered(record_id):
+        return record_id
+    try:
+        return lower_bound(datetime.fromisoformat(created_at or ""))
+    except ValueError:
+        return None
+
+
+def id_timestamp(record_id: str) -> Optional[datetime]:
+    """Creation instant embedded in a UUIDv7 id, else None."""
+    if not is_time_ordered(record_id):
+        return None
+    ms = int(record_id[:8] + record_id[9:13], 16)
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
@@ -1,10 +1,11 @@
 from datetime import datetime, timezone
 from typing import List, Optional
-import uuid
 from models.task import Task
+from models.ids import new_id
+from models.tracking import DirtyTracking
 
 
-class Project:
+class Project(DirtyTracking):
     """
     Represents a project in the system.
     Attributes:
@@ -26,13 +27,14 @@ class Project:
         due_date: Optional[str] = None,
     ):
         self.title = title
-        self.id = project_id if project_id else str(uuid.uuid4())
+        self.id = project_id if project_id else new_id()
         self.user_id = user_id
         self.description = description or ""
         self._due_date = None
         if due_date:
             self.due_date = due_date  # property setter parses/normalizes
         self.tasks: List[Task] = []
+        self._clean_task_count = 0
         self.created_at = datetime.now(tz=timezone.utc).isoformat()
 
     @property
@@ -44,6 +46,25 @@ class Project:
         if not isinstance(value, str) or not value.strip():
             raise ValueError("Project title must be a non-empty string.")
         self._title = value.strip()
+        self._touch()
+
+    @property
+    def user_id(self) -> str:
+        return self._user_id
+
+    @user_id.setter
+    def user_id(self, value: str):
+        self._user_id = value
+        self._touch()
+
+    @property
+    def description(self) -> str:
+        return self._description
+
+    @description.setter
+    def description(self, value: str):
+        self._description = value or ""
+        self._touch()
 
     @property
     def due_date(self) -> Optional[str]:
@@ -62,6 +83,7 @@ class Project:
             self._due_date = dt.date().isoformat()
         except Exception:
             raise ValueError("due_date must be ISO (YYYY-MM-DD) or ISO datetime")
+        self._touch()
 
     def to_dict(self) -> dict:
         return {
@@ -75,7 +97,22 @@ class Project:
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Project":
+    def from_dict(cls, data: dict, trusted: bool = False) -> "Project":
+        """
+        Build a clean project (and its tasks) from `data`. `trusted` skips
+        validation and dirty tracking, as in Task.from_dict().
+        """
+        if trusted:
+            project = cls.__new__(cls)
+            project.id = data["id"]
+            project._title = data["title"]
+            project._user_id = data["user_id"]
+            project._description = data["description"]
+            project._due_date = data["due_date"]
+            project.created_at = data["created_at"]
+            project.tasks = [Task.from_dict(td, True) for td in data["tasks"]]
+            project.mark_clean()
+            return project
         project = cls(
             data["title"],
             data["user_id"],
@@ -85,17 +122,36 @@ class Project:
         )
         project.created_at = data.get("created_at", project.created_at)
         project.tasks = [Task.from_dict(td) for td in data.get("tasks", [])]
+        project.mark_clean()
         return project
 
+    @property
+    def is_dirty(self) -> bool:
+        # Also catch tasks appended to / popped from `tasks` directly.
+        if self._dirty or len(self.tasks) != self._clean_task_count:
+            return True
+        return any(t._parent is not self for t in self.tasks)
+
+    def mark_clean(self) -> None:
+        """Mark this project and its tasks clean, adopting any tasks appended directly."""
+        super().mark_clean()
+        for t in self.tasks:
+            t._parent = self
+            t.mark_clean()
+        self._clean_task_count = len(self.tasks)
+
     def add_task(self, task: Task) -> None:
         """Add a task to this project."""
+        task._parent = self
         self.tasks.append(task)
+        self._touch()
 
     def remove_task(self, task_id: str) -> bool:
         """Remove a task by id. Returns True if removed, False if not found."""
         for i, t in enumerate(self.tasks):
             if getattr(t, "id", None) == task_id:
-                self.tasks.pop(i)
+                self.tasks.pop(i)._parent = None
+                self._touch()
                 return True
         return False
 
@@ -1,11 +1,21 @@
-import uuid
+import warnings
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Callable, Iterable, List, Optional
+
+from models.ids import new_id
+from models.tracking import DirtyTracking
 
 VALID_STATUSES = {"todo", "in_progress", "done"}
 
+# Called as listener(task, old_status, new_status) whenever an existing
+# task's status actually changes (not when a task is created or loaded).
+# utils.transitions registers one to log transitions for cycle-time reports.
+# Listeners observe a change that has already happened: one that raises is
+# reported as a RuntimeWarning and never fails the assignment.
+STATUS_LISTENERS: List[Callable[["Task", str, str], None]] = []
+
 
-class Task:
+class Task(DirtyTracking):
     """
     Represents a task within a project.
     Attributes:
@@ -13,6 +23,7 @@ class Task:
         title (str): Title of the task.
         status (str): Status of the task; one of "todo", "in_progress", "done".
         assigned_to (Optional[str]): User ID of the assignee, or None.
+        depends_on (List[str]): IDs of tasks (in any project) this one waits on.
         created_at (str): ISO formatted creation timestamp.
     """
 
@@ -23,11 +34,13 @@ class Task:
         status: str = "todo",
         assigned_to: Optional[str] = None,
         created_at: Optional[str] = None,
+        depends_on: Optional[Iterable[str]] = None,
     ):
         self.title = title
-        self.id = task_id if task_id else str(uuid.uuid4())
+        self.id = task_id if task_id else new_id()
         self.status = status  # setter validates
         self.assigned_to = assigned_to  # user.id or None
+        self.depends_on = depends_on or []
         self.created_at = created_at or datetime.now(tz=timezone.utc).isoformat()
 
     @property
@@ -39,6 +52,7 @@ class Task:
         if not isinstance(value, str) or not value.strip():
             raise ValueError("Task title must be a non-empty string.")
         self._title = value.strip()
+        self._touch()
 
     @property
     def status(self) -> str:
@@ -49,7 +63,54 @@ class Task:
         v = (value or "").strip().lower()
         if v not in VALID_STATUSES:
             raise ValueError(f"Status must be one of {sorted(VALID_STATUSES)}.")
+        old = getattr(self, "_status", None)
         self._status = v
+        self._touch()
+        if old is not None and old != v:
+            for listener in STATUS_LISTENERS:
+                try:
+                    listener(self, old, v)
+                except Exception as e:
+                    warnings.warn(
+                        f"status listener {listener!r} failed: {e}",
+                        RuntimeWarning,
+                        stacklevel=2,
+                    )
+
+    @property
+    def assigned_to(self) -> Optional[str]:
+        return self._assigned_to
+
+    @assigned_to.setter
+    def assigned_to(self, value: Optional[str]):
+        self._assigned_to = value or None
+        self._touch()
+
+    @property
+    def depends_on(self) -> List[str]:
+        return list(self._depends_on)
+
+    @depends_on.setter
+    def depends_on(self, value: Iterable[str]):
+        deps = list(dict.fromkeys(str(v).strip() for v in value if str(v).strip()))
+        if self.id in deps:
+            raise ValueError("A task cannot depend on itself.")
+        self._depends_on = deps
+        self._touch()
+
+    def add_dependency(self, task_id: str) -> bool:
+        """Depend on `task_id`. Returns False if already present."""
+        if task_id in self._depends_on:
+            return False
+        self.depends_on = self._depends_on + [task_id]
+        return True
+
+    def remove_dependency(self, task_id: str) -> bool:
+        """Drop the dependency on `task_id`. Returns False if absent."""
+        if task_id not in self._depends_on:
+            return False
+        self.depends_on = [d for d in self._depends_on if d != task_id]
+        return True
 
     @property
     def completed(self) -> bool:
@@ -67,18 +128,37 @@ class Task:
             "title": self.title,
             "status": self.status,
             "assigned_to": self.assigned_to,
+            "depends_on": self.depends_on,
             "created_at": self.created_at,
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> "Task":
-        return cls(
+    def from_dict(cls, data: dict, trusted: bool = False) -> "Task":
+        """
+        Build a clean task from `data`. With `trusted` (a record storage wrote
+        from to_dict() itself) the fields are taken as-is, skipping the
+        setters' validation and dirty tracking.
+        """
+        if trusted:
+            task = cls.__new__(cls)
+            task.id = data["id"]
+            task._title = data["title"]
+            task._status = data["status"]
+            task._assigned_to = data["assigned_to"]
+            task._depends_on = data["depends_on"]
+            task.created_at = data["created_at"]
+            task._dirty = False
+            return task
+        task = cls(
             title=data["title"],
             task_id=data["id"],
             status=data.get("status", "todo"),
             assigned_to=data.get("assigned_to"),
             created_at=data.get("created_at"),
+            depends_on=data.get("depends_on"),
         )
+        task.mark_clean()
+        return task
 
     def __repr__(self):
         badge = "✓" if self.completed else "○"
@@ -0,0 +1,26 @@
+from typing import Optional
+
+
+class DirtyTracking:
+    """
+    Mixin that records whether a model has been mutated since it was last
+    loaded or saved. Property setters call `_touch()`; storage calls
+    `mark_clean()` once the object's serialized form is up to date.
+    A touched object also touches its `_parent` (e.g. a Task's Project).
+    """
+
+    _dirty: bool = True
+    _parent: Optional["DirtyTracking"] = None
+
+    def _touch(self) -> None:
+        self._dirty = True
+        parent = self._parent
+        if parent is not None:
+            parent._touch()
+
+    @property
+    def is_dirty(self) -> bool:
+        return self._dirty
+
+    def mark_clean(self) -> None:
+        self._dirty = False
@@ -1,12 +1,14 @@
 import re
-import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
+from models.ids import new_id
+from models.tracking import DirtyTracking
+
 EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 
-class User:
+class User(DirtyTracking):
     """
     Represents a user in the system.
     Attributes:
@@ -21,7 +23,7 @@ class User:
     ):
         self.name = name
         self.email = email  # will trigger setter below
-        self.id = user_id if user_id else str(uuid.uuid4())
+        self.id = user_id if user_id else new_id()
         self.created_at = datetime.now(tz=timezone.utc).isoformat()
 
     @property
@@ -33,6 +35,7 @@ class User:
         if not isinstance(value, str) or not value.strip():
             raise ValueError("User name must be a non-empty string.")
         self._name = value.strip()
+        self._touch()
 
     @property
     def email(self) -> Optional[str]:
@@ -42,11 +45,13 @@ class User:
     def email(self, value: Optional[str]):
         if value is None or value == "":
             self._email = None
+            self._touch()
             return
         v = value.strip().lower()
         if not EMAIL_RE.match(v):
             raise ValueError("Invalid email address.")
         self._email = v
+        self._touch()
 
     def to_dict(self) -> dict:
         return {
@@ -57,9 +62,22 @@ class User:
         }
 
     @classmethod
-    def from_dict(cls, data: dict) -> "User":
+    def from_dict(cls, data: dict, trusted: bool = False) -> "User":
+        """
+        Build a clean user from `data`. `trusted` skips validation and dirty
+        tracking, as in Task.from_dict().
+        """
+        if trusted:
+            user = cls.__new__(cls)
+            user.id = data["id"]
+            user._name = data["name"]
+            user._email = data["email"]
+            user.created_at = data["created_at"]
+            user._dirty = False
+            return user
         user = cls(data["name"], data.get("email"), data.get("id"))
         user.created_at = data.get("created_at", user.created_at)
+        user.mark_clean()
         return user
 
     def __repr__(self):
@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+
+from utils import archive, storage
+
+
+def _archive(projects, codec=archive.DEFAULT_CODEC, **select):
+    moved = archive.select_completed(projects, **select)
+    archive.append_segments([(p.id, t) for p, t in moved], codec)
+    for p, t in moved:
+        p.remove_task(t.id)
+    return len(moved)
+
+
+def test_archive_moves_completed_tasks_to_monthly_segments(make_project):
+    p = make_project(with_tasks=True)
+    done = p.tasks[0]
+    done.created_at = "2024-03-05T10:00:00+00:00"
+    done.mark_complete()
+
+    assert _archive([p], codec="xz") == 1
+    assert [t.title for t in p.tasks] == ["Write tests"]
+
+    segments = archive.segment_paths()
+    assert [s.name for s in segments] == ["tasks-2024-03.jsonl.xz"]
+
+    streamed = list(archive.iter_archived())
+    assert [(t.id, pid) for t, pid in streamed] == [(done.id, p.id)]
+    assert streamed[0][0].status == "done"
+
+
+def test_archive_respects_age_cutoff_and_appends(make_project):
+    p = make_project(with_tasks=True)
+    old, recent = p.tasks
+    old.created_at = "2024-01-01T00:00:00+00:00"
+    old.mark_complete()
+    recent.mark_complete()
+    now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+    assert _archive([p], older_than_days=30, now=now) == 1
+    assert p.tasks == [recent]
+
+    # A second run appends to the existing gzip segment
+    recent.created_at = "2024-01-20T00:00:00+00:00"
+    assert _archive([p], older_than_days=30, now=now) == 1
+    assert len(list(archive.iter_archived(p.id))) == 2
+
+
+def test_cli_archive_and_list_including_archived(capsys):
+    from main import main
+
+    main(["list-tasks", "--include-archived"])
+    assert "No tasks found." in capsys.readouterr().out
+
+    main(["add-user", "--name", "Alex"])
+    main(["add-project", "--user", "Alex", "--title", "CLI Tool"])
+    main(["add-task", "--project", "CLI Tool", "--title", "Ship it"])
+    task_id = storage.load_projects()[0].tasks[0].id
+    main(["complete-task", "--id", task_id])
+
+    main(["archive"])
+    assert storage.load_projects()[0].tasks == []
+
+    capsys.readouterr()
+    main(["list-tasks", "--project", "CLI Tool", "--include-archived"])
+    assert "Ship it" in capsys.readouterr().out
+
+
+def test_auto_policy_archives_on_complete():
+    from main import main
+
+    main(["add-user", "--name", "Alex"])
+    main(["add-project", "--user", "Alex", "--title", "CLI Tool"])
+    main(["add-task", "--project", "CLI Tool", "--title", "Ship it"])
+    main(["archive", "--auto", "0"])
+    assert archive.load_policy() is None
+
+    archive.save_policy(0)
+    task_id = storage.load_projects()[0].tasks[0].id
+    main(["complete-task", "--id", task_id])
+    assert storage.load_projects()[0].tasks == []
+    assert len(list(archive.iter_archived())) == 1
+
+
+def test_undo_cuts_archive_appends(capsys):
+    from main import main
+
+    main(["add-user", "--name", "Alex"])
+    main(["add-project", "--user", "Alex", "--title", "CLI Tool"])
+    for title in ("First", "Second"):
+        main(["add-task", "--project", "CLI Tool", "--title", title])
+    first, second = storage.load_projects()[0].tasks
+    main(["complete-task", "--id", first.id])
+    main(["archive"])
+    [segment] = archive.segment_paths()
+    size = segment.stat().st_size
+
+    main(["complete-task", "--id", second.id])
+    main(["archive"])  # appends a second member to the same segment
+    assert segment.stat().st_size > size
+    main(["undo"])
+    assert segment.stat().st_size == size
+    assert [t.title for t in storage.load_projects()[0].tasks] == ["Second"]
+
+    main(["undo", "2"])
+    assert archive.segment_paths() == []
+    capsys.readouterr()
+    main(["list-tasks", "--include-archived"])
+    out = capsys.readouterr().out
+    assert out.count("First") == 1 and out.count("Second") == 1
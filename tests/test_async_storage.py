@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from utils import history, storage
+from utils.async_storage import AsyncStorage, _Batch
+
+
+def test_concurrent_loads_are_coalesced(monkeypatch, make_project):
+    storage.save_projects([make_project("CLI Tool"), make_project("Web App")])
+    calls = []
+    real = storage.load_projects
+    monkeypatch.setattr(storage, "load_projects", lambda: calls.append(1) or real())
+
+    async def run():
+        async with AsyncStorage() as db:
+            results = await asyncio.gather(*(db.load_projects() for _ in range(100)))
+            return db, results
+
+    db, results = asyncio.run(run())
+    assert calls == [1] and db.loads == 1 and db.coalesced == 99
+    assert all(r is results[0] for r in results)
+    assert [p.title for p in results[0]] == ["CLI Tool", "Web App"]
+
+
+def test_concurrent_saves_are_batched(make_project):
+    projects = [make_project(f"P{i}") for i in range(50)]
+
+    async def run():
+        async with AsyncStorage() as db:
+            await asyncio.gather(*(db.patch_projects([p]) for p in projects))
+            return db, await db.load_projects()
+
+    db, loaded = asyncio.run(run())
+    assert sorted(p.title for p in loaded) == sorted(p.title for p in projects)
+    assert db.saves == 50 and db.batches < 50
+    assert len(history.transactions(storage.DATA_DIR)) == db.batches
+
+
+def test_load_after_save_sees_it(make_project):
+    p = make_project("CLI Tool")
+    storage.save_projects([p])
+
+    async def run():
+        async with AsyncStorage() as db:
+            stale = db.load_projects()  # in flight across the save
+            p.title = "Renamed"
+            await asyncio.gather(stale, db.save_projects([p]))
+            return [x.title for x in await db.load_projects()]
+
+    assert asyncio.run(run()) == ["Renamed"]
+
+
+def test_failed_batch_fails_every_caller(monkeypatch, make_project):
+    real = storage.commit
+    failing = [True]
+
+    def flaky(**kwargs):
+        if failing[0]:
+            raise OSError("disk full")
+        return real(**kwargs)
+
+    monkeypatch.setattr(storage, "commit", flaky)
+
+    async def run():
+        async with AsyncStorage() as db:
+            results = await asyncio.gather(
+                db.patch_projects([make_project("A")]),
+                db.patch_projects([make_project("B")]),
+                return_exceptions=True,
+            )
+            failing[0] = False
+            await db.patch_projects([make_project("C")])
+            return results, await db.load_projects()
+
+    results, loaded = asyncio.run(run())
+    assert all(isinstance(r, OSError) for r in results)
+    assert [p.title for p in loaded] == ["C"]
+
+
+def test_batch_merges_patches_in_arrival_order(make_project):
+    a, b, c = make_project("A"), make_project("B"), make_project("C")
+    batch = _Batch()
+    batch.add("patch", ([a, b], []))
+    batch.add("patch", ([], [a.id]))
+    assert list(batch.upserts) == [b.id] and batch.removed == {a.id}
+
+    batch.add("projects", [a])  # a full save supersedes earlier patches
+    batch.add("patch", ([c], [a.id]))
+    assert batch.projects == [c] and not batch.upserts and not batch.removed
+
+
+@pytest.mark.parametrize("n", [300])
+def test_hundreds_of_mixed_coroutines(n, make_project):
+    seeded = [make_project(f"P{i}") for i in range(20)]
+    storage.save_projects(seeded)
+
+    async def worker(db, i):
+        if i % 5 == 0:
+            p = seeded[i % len(seeded)]
+            p.title = f"P{i % len(seeded)}-{i}"
+            await db.patch_projects([p])
+        else:
+            assert len(await db.load_projects()) == len(seeded)
+
+    async def run():
+        async with AsyncStorage(max_workers=4) as db:
+            await asyncio.gather(*(worker(db, i) for i in range(n)))
+            return db
+
+    db = asyncio.run(run())
+    assert db.loads + db.coalesced == n - n // 5
+    assert db.loads < n // 2 and db.batches < n // 5
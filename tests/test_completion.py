@@ -0,0 +1,84 @@
+import shutil
+import subprocess
+
+import pytest
+
+from utils import indexes, storage
+from utils.session import Session
+
+
+def _names(kind):
+    return [name for name, _id in indexes.read_names(storage.DATA_DIR, kind)]
+
+
+def _seed():
+    with Session() as s:
+        s.add_user("Alex Kim")
+        s.add_user("Bri")
+        s.add_project("Bri", "CLI Tool")
+        s.add_project("Bri", "Web App")
+        return s.add_task("Web App", "Ship").id
+
+
+def test_name_lists_follow_saves(monkeypatch):
+    tid = _seed()
+    assert _names("users") == ["Alex Kim", "Bri"]
+    assert _names("projects") == ["CLI Tool", "Web App"]
+    assert _names("tasks") == [tid]
+
+    # Saves that change no names leave the lists alone
+    writes = []
+    real = indexes.write_names
+    monkeypatch.setattr(
+        indexes,
+        "write_names",
+        lambda d, kind, pairs: writes.append(kind) or real(d, kind, pairs),
+    )
+    with Session() as s:
+        s.complete(tid)
+    assert writes == []
+
+    with Session() as s:
+        s.project("CLI Tool").title = "CLI"
+    assert _names("projects") == ["CLI", "Web App"]
+
+    with Session() as s:
+        s.delete_user("Bri")
+    assert _names("users") == ["Alex Kim"]
+    assert _names("projects") == [] and _names("tasks") == []
+
+
+def test_undo_refreshes_name_lists():
+    from main import main
+
+    _seed()
+    main(["add-project", "--user", "Bri", "--title", "Docs"])
+    assert "Docs" in _names("projects")
+    main(["undo"])
+    assert "Docs" not in _names("projects")
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="needs bash")
+def test_bash_script_completes_from_name_lists(capsys):
+    from main import main
+
+    tid = _seed()
+    main(["completion", "bash"])
+    script = capsys.readouterr().out
+
+    def complete(*words):
+        cmd = (
+            f"COMP_WORDS=(project-tracker {' '.join(words)}); "
+            "COMP_CWORD=$(( ${#COMP_WORDS[@]} - 1 )); "
+            '_project_tracker_complete; printf "%s\\n" "${COMPREPLY[@]}"'
+        )
+        out = subprocess.run(
+            ["bash", "-c", script + cmd], capture_output=True, text=True, check=True
+        ).stdout
+        return [line for line in out.splitlines() if line]
+
+    assert complete("add-") == ["add-user", "add-project", "add-task"]
+    assert complete("assign", "--user", "''") == ["Alex Kim", "Bri"]
+    assert complete("add-task", "--project", "W") == ["Web App"]
+    assert complete("complete-task", "--id", tid[:6]) == [tid]
+    assert complete("export", "--format", "j") == ["jsonl"]
@@ -0,0 +1,106 @@
+import json
+
+import pytest
+
+from utils import indexes, storage
+
+
+def _graph():
+    return storage.project_index(indexes.DEPENDENCIES)
+
+
+def _seed(make_project, make_task):
+    """a <- b <- c in one project, d (other project) depends on b."""
+    p1 = make_project("Alpha", "u1")
+    p2 = make_project("Bravo", "u1")
+    a, b, c = make_task("a"), make_task("b"), make_task("c")
+    b.depends_on = [a.id]
+    c.depends_on = [b.id]
+    for t in (a, b, c):
+        p1.add_task(t)
+    d = make_task("d")
+    d.depends_on = [b.id]
+    p2.add_task(d)
+    storage.save_projects([p1, p2])
+    return p1, p2, (a, b, c, d)
+
+
+def test_task_depends_on_round_trips_and_rejects_self(make_task):
+    from models.task import Task
+
+    t = make_task("t")
+    t.depends_on = ["x", "x", " y "]
+    assert t.depends_on == ["x", "y"]
+    assert Task.from_dict(t.to_dict()).depends_on == ["x", "y"]
+    with pytest.raises(ValueError):
+        t.add_dependency(t.id)
+
+
+def test_ready_and_blocked_follow_completion(make_project, make_task):
+    p1, p2, (a, b, c, d) = _seed(make_project, make_task)
+    g = _graph()
+    assert g.ready() == [[p1.id, a.id]]
+    assert g.unmet == {b.id: 1, c.id: 1, d.id: 1}
+    assert sorted(x[1] for x in g.blocked()) == sorted([b.id, c.id, d.id])
+
+    a.mark_complete()
+    storage.save_projects([p1, p2])
+    g = _graph()
+    assert g.unblocked_by(a.id) == [b.id]
+    assert g.ready(p1.id) == [[p1.id, b.id]]
+
+    b.mark_complete()
+    storage.save_projects([p1, p2])
+    assert sorted(_graph().unblocked_by(b.id)) == sorted([c.id, d.id])
+    assert _graph().blocked() == []
+
+
+def test_removed_tasks_no_longer_block(make_project, make_task):
+    p1, p2, (a, b, c, d) = _seed(make_project, make_task)
+    p1.remove_task(a.id)
+    storage.save_projects([p1, p2])
+    g = _graph()
+    assert a.id not in g.nodes
+    assert [p1.id, b.id] in g.ready()
+
+
+def test_incremental_graph_matches_rebuild(make_project, make_task):
+    p1, p2, (a, b, c, d) = _seed(make_project, make_task)
+    a.mark_complete()
+    d.depends_on = [c.id, a.id]
+    storage.save_projects([p1, p2])
+    storage.save_projects([p1])  # drop Bravo
+    g = _graph()
+
+    fresh = indexes.DependencyIndex("fresh")
+    fresh.rebuild(storage.load_projects())
+    assert (g.nodes, g.deps, g.unmet) == (fresh.nodes, fresh.deps, fresh.unmet)
+    assert {k: sorted(v) for k, v in g.dependents.items()} == {
+        k: sorted(v) for k, v in fresh.dependents.items()
+    }
+
+
+def test_cycle_detection_and_critical_path(make_project, make_task):
+    p1, p2, (a, b, c, d) = _seed(make_project, make_task)
+    g = _graph()
+    assert g.would_cycle(a.id, c.id) == [a.id, c.id, b.id, a.id]
+    assert g.would_cycle(d.id, a.id) is None
+    assert g.critical_path(p1.id) == [a.id, b.id, c.id]
+    # Cross-project prerequisites count toward Bravo's path
+    assert g.critical_path(p2.id) == [a.id, b.id, d.id]
+
+
+def test_cli_depend_rejects_cycles(make_project, make_task, isolate_storage_paths):
+    from main import main
+
+    p1, _p2, (a, _b, c, _d) = _seed(make_project, make_task)
+    main(["depend", "--id", a.id, "--on", c.id])
+    raw = json.loads(isolate_storage_paths.PROJECTS_PATH.read_text(encoding="utf-8"))
+    assert raw[0]["tasks"][0]["depends_on"] == []
+
+    main(["add-task", "--project", "Alpha", "--title", "e", "--depends-on", c.id])
+    main(["critical-path", "--project", "Alpha"])
+    raw = json.loads(isolate_storage_paths.PROJECTS_PATH.read_text(encoding="utf-8"))
+    e = raw[0]["tasks"][-1]
+    assert e["depends_on"] == [c.id]
+    assert _graph().critical_path(p1.id)[-1] == e["id"]
@@ -0,0 +1,73 @@
+import csv
+import json
+
+import pytest
+
+from utils import export, storage
+
+
+def _seed(make_project, make_user):
+    u = make_user("Alex")
+    storage.save_users([u])
+    p1 = make_project("CLI Tool", u.id, with_tasks=True)
+    p2 = make_project("Web App", u.id, with_tasks=True)
+    storage.save_projects([p1, p2])
+    return p1, p2
+
+
+def test_export_tasks_csv_with_project_filter(tmp_path, make_project, make_user):
+    p1, _p2 = _seed(make_project, make_user)
+    out = tmp_path / "tasks.csv"
+    n = export.export("tasks", "csv", out, project_title="cli tool", chunk_rows=1)
+    assert n == 2
+    with out.open(encoding="utf-8") as fh:
+        rows = list(csv.DictReader(fh))
+    assert [r["title"] for r in rows] == [t.title for t in p1.tasks]
+    assert {r["project_id"] for r in rows} == {p1.id}
+
+
+def test_export_projects_jsonl(tmp_path, make_project, make_user):
+    _seed(make_project, make_user)
+    out = tmp_path / "projects.jsonl"
+    assert export.export("projects", "jsonl", out) == 2
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r["task_count"] for r in rows] == [2, 2]
+    assert "tasks" not in rows[0]
+
+
+def test_export_columnar_round_trip(tmp_path, make_project, make_user):
+    p1, p2 = _seed(make_project, make_user)
+    out = tmp_path / "tasks.col"
+    assert export.export("tasks", "columnar", out, chunk_rows=3) == 4
+    lines = out.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1 + 2  # header + two chunks (3 + 1 rows)
+    rows = list(export.iter_columnar(out))
+    assert [r["id"] for r in rows] == [t.id for t in p1.tasks + p2.tasks]
+
+
+def test_cli_export_users_to_stdout(capsys, make_user):
+    from main import main
+
+    storage.save_users([make_user("Alex"), make_user("Bri")])
+    main(["export", "users", "--format", "csv"])
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "id,name,email,created_at"
+    assert len(out) == 3
+
+
+def test_unknown_project_is_rejected_before_writing(
+    tmp_path, capsys, make_project, make_user
+):
+    from main import main
+
+    _seed(make_project, make_user)
+    out = tmp_path / "tasks.csv"
+    with pytest.raises(ValueError, match="No project titled"):
+        export.export("tasks", "csv", out, project_title="CLI Tol")
+    assert not out.exists()
+
+    with pytest.raises(SystemExit) as exc:
+        main(["export", "tasks", "--project", "CLI Tol", "--out", str(out)])
+    assert exc.value.code == 1
+    assert "No project titled" in capsys.readouterr().out
+    assert not out.exists()
@@ -22,3 +22,21 @@ def test_print_projects_and_tasks_plain(capsys, monkeypatch, make_project, make_
     out = capsys.readouterr().out
     assert p.title in out
     assert t1.title in out
+
+
+def test_echo_goes_through_console_without_markup(monkeypatch):
+    calls = []
+
+    class FakeConsole:
+        def print(self, *args, **kwargs):
+            calls.append((args, kwargs))
+
+    monkeypatch.setattr(formatting, "HAS_RICH", True, raising=True)
+    monkeypatch.setattr(formatting, "console", FakeConsole(), raising=True)
+    formatting.echo("  record [3]: bad status", "dim")
+    assert calls == [
+        (
+            ("  record [3]: bad status",),
+            {"style": "dim", "markup": False, "highlight": False},
+        )
+    ]
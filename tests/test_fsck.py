@@ -0,0 +1,132 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from utils import fsck, storage
+
+
+def _seed(make_user, make_project, n=3):
+    alex = make_user("Alex")
+    projects = [
+        make_project(f"P{i}", user_id=alex.id, with_tasks=True) for i in range(n)
+    ]
+    storage.save_users([alex])
+    storage.save_projects(projects)
+    return alex, projects
+
+
+def _problems(report):
+    return [msg for f in report["files"] for msg in f["problems"]]
+
+
+def test_clean_files_pass(make_user, make_project):
+    _seed(make_user, make_project)
+    report = fsck.fsck(storage.DATA_DIR, workers=1)
+    assert _problems(report) == []
+    assert report["records"] == 4
+    assert all(f["intact"] and f["kept"] == f["records"] for f in report["files"])
+
+
+def test_detects_record_and_reference_problems(make_user, make_project):
+    alex, projects = _seed(make_user, make_project)
+    data = json.loads(storage.PROJECTS_PATH.read_text(encoding="utf-8"))
+    data[0]["tasks"][0]["status"] = "finished"
+    data[1]["tasks"][0]["assigned_to"] = "user-gone"
+    data[2]["user_id"] = "user-gone"
+    data.append(dict(data[1]))  # duplicate project id
+    storage.PROJECTS_PATH.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    problems = _problems(fsck.fsck(storage.DATA_DIR, workers=1))
+    assert any("Status must be" in m and "dropped" in m for m in problems)
+    assert any("missing user user-gone; cleared" in m for m in problems)
+    assert any("owner user-gone does not exist" in m for m in problems)
+    assert any("duplicate project id" in m for m in problems)
+
+
+def test_broken_array_is_recovered_from_layout(make_user, make_project):
+    _seed(make_user, make_project)
+    payload = storage.USERS_PATH.read_bytes()
+    bad = payload.replace(b'"Alex"', b'"Al\xffex"')
+    storage.USERS_PATH.write_bytes(bad[:-2])  # also truncate the closing "]"
+
+    report = fsck.fsck(storage.DATA_DIR, workers=1)
+    users = report["files"][0]
+    assert not users["intact"] and users["kept"] == 0
+    assert any("not valid UTF-8" in m for m in users["problems"])
+    # Every project now points at a missing owner
+    assert len(report["files"][1]["problems"]) == 3
+
+
+def test_repair_writes_loadable_copy(make_user, make_project):
+    _seed(make_user, make_project)
+    original = storage.PROJECTS_PATH.read_bytes()
+    data = json.loads(original)
+    data[0]["tasks"][1]["title"] = ""
+    data[1] = "not a record"
+    storage.PROJECTS_PATH.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    before = storage.PROJECTS_PATH.read_bytes()
+
+    report = fsck.fsck(storage.DATA_DIR, workers=1, repair=True)
+    repaired = storage.DATA_DIR / "projects.repaired.json"
+    assert report["files"][1]["repaired"] == str(repaired)
+    assert "repaired" not in report["files"][0]  # users.json was clean
+    assert storage.PROJECTS_PATH.read_bytes() == before
+
+    storage.PROJECTS_PATH.write_bytes(repaired.read_bytes())
+    loaded = storage.load_projects()
+    assert [p.title for p in loaded] == ["P0", "P2"]
+    assert len(loaded[0].tasks) == 1
+    assert _problems(fsck.fsck(storage.DATA_DIR, workers=1)) == []
+
+
+@pytest.mark.parametrize("reassign", [False, True])
+def test_repair_handles_orphaned_projects(make_user, make_project, reassign):
+    alex, _projects = _seed(make_user, make_project)
+    data = json.loads(storage.PROJECTS_PATH.read_text(encoding="utf-8"))
+    data[1]["user_id"] = "user-gone"
+    storage.PROJECTS_PATH.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        fsck.fsck(storage.DATA_DIR, workers=1, reassign_to="user-gone")
+    target = alex.id if reassign else None
+    report = fsck.fsck(storage.DATA_DIR, workers=1, repair=True, reassign_to=target)
+    [msg] = _problems(report)
+    assert msg.endswith(f"reassigned to {alex.id}" if reassign else "dropped")
+
+    storage.PROJECTS_PATH.write_bytes(Path(report["files"][1]["repaired"]).read_bytes())
+    loaded = storage.load_projects()
+    assert [p.title for p in loaded] == (
+        ["P0", "P1", "P2"] if reassign else ["P0", "P2"]
+    )
+    assert {p.user_id for p in loaded} == {alex.id}
+    assert _problems(fsck.fsck(storage.DATA_DIR, workers=1)) == []
+
+
+def test_parallel_matches_serial(monkeypatch, make_user, make_project):
+    _seed(make_user, make_project, n=12)
+    data = json.loads(storage.PROJECTS_PATH.read_text(encoding="utf-8"))
+    data[7]["tasks"][0]["status"] = "finished"
+    storage.PROJECTS_PATH.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    monkeypatch.setattr(fsck, "CHUNK_RECORDS", 4)
+
+    serial = fsck.fsck(storage.DATA_DIR, workers=1)
+    parallel = fsck.fsck(storage.DATA_DIR, workers=2)
+    assert parallel["workers"] == 2
+    assert serial["files"] == parallel["files"]
+    assert len(_problems(parallel)) == 1
+
+
+def test_cli_fsck_exit_status(make_user, make_project, capsys):
+    from main import main
+
+    _seed(make_user, make_project)
+    main(["fsck", "--workers", "1"])
+    assert "0 problem(s)" in capsys.readouterr().out
+
+    storage.USERS_PATH.write_text('[\n  {\n    "id": 1\n  }\n]', encoding="utf-8")
+    with pytest.raises(SystemExit) as exc:
+        main(["fsck", "--workers", "1", "--max-problems", "1"])
+    assert exc.value.code == 1
+    out = capsys.readouterr().out
+    assert "missing id" in out and "more (use --verbose)" in out
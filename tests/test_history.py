@@ -0,0 +1,109 @@
+import json
+import random
+
+import pytest
+
+from utils import history, storage
+
+
+def _snapshot(paths):
+    return (
+        paths.USERS_PATH.read_bytes(),
+        paths.PROJECTS_PATH.read_bytes(),
+    )
+
+
+def test_cli_undo_reverts_whole_command(isolate_storage_paths):
+    from main import main
+
+    main(["add-user", "--name", "Alex"])
+    main(["add-project", "--user", "Alex", "--title", "CLI Tool"])
+    before = _snapshot(isolate_storage_paths)
+    main(["delete-user", "--name", "Alex"])  # writes projects and users
+    assert storage.load_users() == []
+
+    main(["undo"])
+    assert _snapshot(isolate_storage_paths) == before
+    assert [t["label"] for t in history.transactions(storage.DATA_DIR)] == [
+        "add-user",
+        "add-project",
+    ]
+
+
+def test_rewind_to_any_point_with_checkpoints(
+    isolate_storage_paths, monkeypatch, make_project, make_task
+):
+    monkeypatch.setattr(history, "CHECKPOINT_EVERY", 4)
+    rng = random.Random(7)
+    data_dir = storage.DATA_DIR
+    states = {0: _snapshot(isolate_storage_paths)}
+    projects = []
+    for step in range(1, 16):
+        with history.transaction(data_dir, f"step-{step}"):
+            op = rng.choice(["add", "add", "edit", "remove", "reorder"])
+            if op == "add" or not projects:
+                projects.append(make_project(f"P{step}", "u1"))
+            elif op == "edit":
+                p = rng.choice(projects)
+                p.add_task(make_task(f"T{step}"))
+            elif op == "remove":
+                projects.pop(rng.randrange(len(projects)))
+            else:
+                rng.shuffle(projects)
+            storage.save_projects(projects)
+        states[step] = _snapshot(isolate_storage_paths)
+
+    assert any(
+        p.name.startswith("checkpoint-") for p in (data_dir / "history").iterdir()
+    )
+    for target in (12, 9, 5, 1, 0):
+        history.rewind(data_dir, target)
+        assert _snapshot(isolate_storage_paths) == states[target]
+    assert history.transactions(data_dir) == []
+
+
+def test_undo_refuses_after_external_edit(isolate_storage_paths, make_user):
+    storage.save_users([make_user("Alex")])
+    isolate_storage_paths.USERS_PATH.write_text("[]", encoding="utf-8")
+    with pytest.raises(history.HistoryError):
+        history.undo(storage.DATA_DIR)
+
+
+def test_checkpoint_never_splits_a_commit(isolate_storage_paths, monkeypatch):
+    from main import main
+
+    monkeypatch.setattr(history, "CHECKPOINT_EVERY", 4)
+    main(["add-user", "--name", "A"])
+    main(["add-user", "--name", "B"])
+    main(["add-project", "--user", "A", "--title", "Alpha"])
+    before = _snapshot(isolate_storage_paths)
+    # Logs users at seq 4 (a checkpoint boundary) and projects at seq 5
+    main(["delete-user", "--name", "A", "--reassign-to", "B"])
+    assert [e["seq"] for e in history.entries(storage.DATA_DIR)][-2:] == [4, 5]
+
+    main(["undo", "1"])
+    assert _snapshot(isolate_storage_paths) == before
+    owner = storage.get_user_by_name(storage.load_users(), "A")
+    alpha = storage.get_project_by_title(storage.load_projects(), "Alpha")
+    assert alpha.user_id == owner.id
+
+
+def test_history_counts_records_of_full_deltas(isolate_storage_paths, make_user):
+    # No offset table matches a hand-written file, so the delta keeps it whole
+    users = [make_user("Alex").to_dict(), make_user("Bri").to_dict()]
+    isolate_storage_paths.USERS_PATH.write_text(json.dumps(users), encoding="utf-8")
+    storage.save_users([make_user("Cai")])
+    last = history.entries(storage.DATA_DIR)[-1]
+    assert "full" in last
+    assert history.transactions(storage.DATA_DIR)[-1]["records"] == 2
+
+
+def test_cli_history_rejects_negative_limit(capsys):
+    from main import main
+
+    main(["add-user", "--name", "Alex"])
+    capsys.readouterr()
+    main(["history", "--limit", "-1"])
+    assert "--limit" in capsys.readouterr().out
+    main(["history", "--limit", "1"])
+    assert "add-user" in capsys.readouterr().out
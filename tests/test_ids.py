@@ -0,0 +1,77 @@
+import uuid
+from datetime import datetime, timezone
+
+from models import ids
+from utils import indexes, storage
+
+
+def test_uuid7_is_valid_sortable_and_time_stamped():
+    minted = [ids.uuid7() for _ in range(2000)]
+    assert minted == sorted(minted)
+    assert len(set(minted)) == len(minted)
+    parsed = uuid.UUID(minted[0])
+    assert parsed.version == 7 and parsed.variant == uuid.RFC_4122
+
+    at = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+    rid = ids.uuid7(ms=int(at.timestamp() * 1000))
+    assert ids.id_timestamp(rid) == at
+    assert ids.lower_bound(at) <= rid
+
+
+def test_new_id_scheme_is_opt_in(monkeypatch, make_task):
+    monkeypatch.delenv(ids.ID_SCHEME_ENV, raising=False)
+    assert not ids.is_time_ordered(make_task().id)
+    monkeypatch.setenv(ids.ID_SCHEME_ENV, "uuid7")
+    assert ids.is_time_ordered(make_task().id)
+
+
+def test_sort_key_orders_legacy_and_time_ordered_ids():
+    legacy = ids.sort_key(str(uuid.uuid4()), "2023-01-01T00:00:00+00:00")
+    modern = ids.sort_key(ids.uuid7(), None)
+    assert legacy < modern
+    assert ids.sort_key(str(uuid.uuid4()), "garbage") is None
+
+
+def test_cli_newest_and_created_after_use_task_index(monkeypatch, capsys):
+    from main import main
+
+    main(["add-user", "--name", "Alex"])
+    main(["add-project", "--user", "Alex", "--title", "CLI Tool"])
+    main(["add-task", "--project", "CLI Tool", "--title", "Legacy task"])
+    projects = storage.load_projects()
+    projects[0].tasks[0].created_at = "2020-01-01T00:00:00+00:00"
+    projects[0].tasks[0].title = "Legacy task"  # mark dirty
+    storage.save_projects(projects)
+
+    monkeypatch.setenv(ids.ID_SCHEME_ENV, "uuid7")
+    main(["add-task", "--project", "CLI Tool", "--title", "Fresh task"])
+    main(["add-task", "--project", "CLI Tool", "--title", "Fresher task"])
+
+    idx = storage.project_index(indexes.TASKS_BY_CREATED)
+    assert len(idx.entries) == 3
+
+    capsys.readouterr()
+    main(["list-tasks", "--newest", "1"])
+    out = capsys.readouterr().out
+    assert "Fresher task" in out and "Fresh task" not in out
+
+    main(["list-tasks", "--created-after", "2021-01-01"])
+    out = capsys.readouterr().out
+    assert "Fresh task" in out and "Legacy task" not in out
+
+    main(["list-tasks", "--project", "CLI Tool", "--newest", "2"])
+    out = capsys.readouterr().out
+    assert "Fresher task" in out and "Legacy task" not in out
+
+    main(["list-tasks", "--created-after", "2021-01-01", "--newest", "5"])
+    out = capsys.readouterr().out
+    assert out.index("Fresher task") < out.index("Fresh task")
+    assert "Legacy task" not in out
+
+    main(["list-tasks", "--newest", "0"])
+    out = capsys.readouterr().out
+    assert "--newest must be at least 1" in out and "Legacy task" not in out
+
+    assert [e[2] for e in idx.latest(2)] == [e[2] for e in idx.entries[::-1][:2]]
+    assert idx.latest(9, lo=idx.entries[1][0]) == idx.entries[1:][::-1]
+    assert idx.latest(0) == []
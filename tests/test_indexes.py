@@ -0,0 +1,280 @@
+from utils import indexes, storage
+
+
+def _assignees():
+    return storage.project_index(indexes.ASSIGNEES)
+
+
+def test_assignee_index_follows_saves(make_project, isolate_storage_paths):
+    p1 = make_project("Alpha", "u1", with_tasks=True)
+    p2 = make_project("Bravo", "u1", with_tasks=True)
+    p1.tasks[0].assigned_to = "u2"
+    storage.save_projects([p1, p2])
+    assert _assignees().lookup("u2") == [[p1.id, p1.tasks[0].id]]
+
+    loaded = storage.load_projects()
+    loaded[1].tasks[1].assigned_to = "u2"
+    changes = storage.save_projects(loaded)
+    assert changes.exact and [p.id for p in changes.changed] == [p2.id]
+    assert sorted(_assignees().lookup("u2")) == sorted(
+        [[p1.id, p1.tasks[0].id], [p2.id, p2.tasks[1].id]]
+    )
+
+    # Dropping a project retracts its postings
+    changes = storage.save_projects(loaded[1:])
+    assert changes.removed == [p1.id]
+    assert _assignees().lookup("u2") == [[p2.id, p2.tasks[1].id]]
+
+
+def test_index_rebuilds_after_external_edit(make_project, isolate_storage_paths):
+    import json
+
+    p = make_project("Alpha", "u1", with_tasks=True)
+    storage.save_projects([p])
+    raw = json.loads(isolate_storage_paths.PROJECTS_PATH.read_text(encoding="utf-8"))
+    raw[0]["tasks"][0]["assigned_to"] = "u9"
+    isolate_storage_paths.PROJECTS_PATH.write_text(json.dumps(raw), encoding="utf-8")
+
+    assert _assignees().lookup("u9") == [[p.id, p.tasks[0].id]]
+
+
+def test_load_projects_by_ids_seeks_offsets(make_project):
+    projects = [make_project(t, "u1") for t in ("Alpha", "Bravo ✓", "Charlie")]
+    storage.save_projects(projects)
+    loaded = storage.load_projects_by_ids([projects[2].id, "missing", projects[1].id])
+    assert [p.title for p in loaded] == ["Charlie", "Bravo ✓"]
+
+
+def test_cli_assign_and_my_tasks(capsys):
+    from main import main
+
+    main(["add-user", "--name", "Alex"])
+    main(["add-user", "--name", "Bri"])
+    main(["add-project", "--user", "Alex", "--title", "CLI Tool"])
+    main(["add-task", "--project", "CLI Tool", "--title", "Review PR"])
+    task_id = storage.load_projects()[0].tasks[0].id
+
+    main(["assign", "--id", task_id, "--user", "Bri"])
+    capsys.readouterr()
+    main(["my-tasks", "--user", "Bri"])
+    assert "Review PR" in capsys.readouterr().out
+
+    main(["unassign", "--id", task_id])
+    capsys.readouterr()
+    main(["my-tasks", "--user", "Bri"])
+    assert "No tasks assigned" in capsys.readouterr().out
+
+
+def test_patch_projects_only_rewrites_targets(make_project, isolate_storage_paths):
+    import json
+
+    a, b = make_project("Alpha", "u1"), make_project("Bravo", "u2")
+    storage.save_projects([a, b])
+    (target,) = storage.load_projects_by_ids([b.id])
+    target.title = "Bravo 2"
+    new = make_project("Charlie", "u2")
+    changes = storage.patch_projects(upserts=[target, new], removed_ids=[a.id])
+
+    assert changes.removed == [a.id]
+    raw = json.loads(isolate_storage_paths.PROJECTS_PATH.read_text(encoding="utf-8"))
+    assert [p["title"] for p in raw] == ["Bravo 2", "Charlie"]
+    assert storage.project_index(indexes.OWNERS).lookup("u2") == [b.id, new.id]
+    assert storage.project_index(indexes.OWNERS).lookup("u1") == []
+
+
+def test_cli_delete_user_reassign_and_cascade(capsys):
+    from main import main
+
+    for name in ("Alex", "Bri", "Cam"):
+        main(["add-user", "--name", name])
+    main(["add-project", "--user", "Alex", "--title", "Alpha"])
+    main(["add-project", "--user", "Bri", "--title", "Bravo"])
+    main(["add-task", "--project", "Bravo", "--title", "Review"])
+    task_id = storage.get_project_by_title(storage.load_projects(), "Bravo").tasks[0].id
+    main(["assign", "--id", task_id, "--user", "Alex"])
+
+    main(["delete-user", "--name", "Alex", "--reassign-to", "Cam"])
+    cam = storage.get_user_by_name(storage.load_users(), "Cam")
+    projects = storage.index_by_id(storage.load_projects())
+    assert {p.title for p in projects.values() if p.user_id == cam.id} == {"Alpha"}
+    assert storage.project_index(indexes.ASSIGNEES).lookup(cam.id) != []
+
+    main(["delete-user", "--name", "Cam"])
+    titles = {p.title for p in storage.load_projects()}
+    assert titles == {"Bravo"}
+    assert storage.load_projects()[0].tasks[0].assigned_to is None
+    assert storage.get_user_by_name(storage.load_users(), "Cam") is None
+
+    capsys.readouterr()
+    main(["list-projects", "--user", "Bri"])
+    assert "Bravo" in capsys.readouterr().out
+
+
+def test_due_date_index_range_queries(make_project):
+    projects = []
+    for title, due in [("A", "2025-01-10"), ("B", "2025-01-03"), ("C", None)]:
+        p = make_project(title, "u1")
+        if due:
+            p.due_date = due
+        projects.append(p)
+    storage.save_projects(projects)
+
+    idx = storage.project_index(indexes.DUE_DATES)
+    assert [pid for _d, pid in idx.range("2025-01-01", "2025-01-10")] == [
+        projects[1].id,
+        projects[0].id,
+    ]
+    assert [pid for _d, pid in idx.before("2025-01-05")] == [projects[1].id]
+
+    # Incremental update moves the entry
+    loaded = storage.load_projects()
+    loaded[0].due_date = "2024-12-31"
+    storage.save_projects(loaded)
+    idx = storage.project_index(indexes.DUE_DATES)
+    assert idx.entries[0] == ["2024-12-31", projects[0].id]
+    assert len(idx.entries) == 2
+
+
+def test_cli_due_and_overdue(capsys):
+    from datetime import date, timedelta
+    from main import main
+
+    today = date.today()
+    main(["add-user", "--name", "Alex"])
+    main(["add-project", "--user", "Alex", "--title", "Late", "--due", "2000-01-01"])
+    soon = (today + timedelta(days=3)).isoformat()
+    main(["add-project", "--user", "Alex", "--title", "Soon", "--due", soon])
+    main(["add-project", "--user", "Alex", "--title", "Bad", "--due", "nope"])
+    assert {p.title for p in storage.load_projects()} == {"Late", "Soon"}
+
+    capsys.readouterr()
+    main(["due", "--days", "5"])
+    out = capsys.readouterr().out
+    assert "Soon" in out and "Late" not in out
+    main(["due", "--days", "-3"])
+    assert "--days" in capsys.readouterr().out
+
+    main(["overdue"])
+    out = capsys.readouterr().out
+    assert "Late" in out and "Soon" not in out
+
+
+def test_saves_log_deltas_instead_of_rewriting(make_project, isolate_storage_paths):
+    data = isolate_storage_paths.DATA_DIR
+    p1 = make_project("Alpha", "u1", with_tasks=True)
+    p2 = make_project("Bravo", "u1", with_tasks=True)
+    storage.save_projects([p1, p2])
+    _assignees()  # settle the snapshot
+    snapshot = indexes.index_path(data, "assignees").read_bytes()
+    log_size = indexes.log_path(data, "assignees").stat().st_size
+
+    p2.tasks[0].assigned_to = "u2"
+    storage.commit(upserts=[p2])
+    assert indexes.index_path(data, "assignees").read_bytes() == snapshot
+    assert indexes.log_path(data, "assignees").stat().st_size > log_size
+
+    # Replaying the log gives what a rebuild would
+    replayed = storage.project_index(indexes.ASSIGNEES)
+    fresh = indexes.ReverseIndex("assignees", indexes.ASSIGNEES.contributions)
+    fresh.rebuild(storage.load_projects())
+    assert replayed.by_key == fresh.by_key
+    assert replayed.by_project == fresh.by_project
+
+
+def test_broken_log_chain_rebuilds(make_project, isolate_storage_paths):
+    data = isolate_storage_paths.DATA_DIR
+    p = make_project("Alpha", "u1", with_tasks=True)
+    storage.save_projects([p])
+    p.tasks[0].assigned_to = "u2"
+    storage.commit(upserts=[p])
+    log = indexes.log_path(data, "assignees")
+    log.write_text(log.read_text(encoding="utf-8")[:-5], encoding="utf-8")  # torn
+
+    assert _assignees().lookup("u2") == [[p.id, p.tasks[0].id]]
+
+
+def test_task_locator_finds_owning_project(make_project):
+    from utils.session import Session
+
+    a, b = make_project("Alpha", "u1", with_tasks=True), make_project("Bravo", "u1")
+    storage.save_projects([a, b])
+    locator = storage.project_index(indexes.TASK_PROJECTS)
+    assert locator.lookup(a.tasks[1].id) == a.id
+    assert locator.lookup("missing") is None
+
+    moved = a.tasks.pop(1)
+    b.tasks.append(moved)
+    storage.commit(upserts=[a, b])
+    assert storage.project_index(indexes.TASK_PROJECTS).lookup(moved.id) == b.id
+
+    gone = a.tasks.pop(0)
+    storage.commit(upserts=[a])
+    with Session() as s:
+        assert s.task(moved.id)[1].id == b.id
+        assert s.task(gone.id) is None  # stale locator entry is verified
+
+
+def test_name_lists_are_patched_in_place(make_project, isolate_storage_paths):
+    data = isolate_storage_paths.DATA_DIR
+    a, b = make_project("Alpha", "u1", with_tasks=True), make_project("Bravo", "u1")
+    storage.save_projects([a, b])
+    storage.project_index(indexes.NAMES)
+    tasks_txt = indexes.names_path(data, "tasks")
+    before = tasks_txt.stat().st_ino
+
+    a.tasks[0].assigned_to = "u2"  # no names change: lists untouched
+    storage.commit(upserts=[a])
+    assert tasks_txt.stat().st_ino == before
+
+    a.title = "Aleph"
+    moved = a.tasks.pop()
+    b.tasks.append(moved)
+    storage.commit(upserts=[a, b])
+    expected = indexes.NameIndex("names")
+    expected.rebuild(storage.load_projects())
+    assert sorted(indexes.read_names(data, "projects")) == sorted(
+        (t, pid) for pid, t in expected.titles.items()
+    )
+    assert (moved.id, b.id) in indexes.read_names(data, "tasks")
+    assert [n for n, _ in indexes.read_names(data, "projects")] == ["Aleph", "Bravo"]
+
+
+def test_sharded_map_sizes_its_shards_to_the_data(tmp_path, monkeypatch):
+    monkeypatch.setattr(indexes.ShardedMap, "PER_SHARD", 4)
+    shards = indexes.ShardedMap(tmp_path / "map")
+
+    def files():
+        return {p.name: p.stat().st_mtime_ns for p in shards.directory.glob("0*.json")}
+
+    shards.replace({"a": 1, "b": 2})
+    assert len(files()) == 1
+    items = {f"k{i}": i for i in range(20)}
+    shards.replace(items)
+    assert indexes.ShardedMap(shards.directory).shards_for(20) == 8
+    assert 1 < len(files()) <= 8 and shards.get_many(items) == items
+
+    # A rebuild with the same contents rewrites nothing
+    before = files()
+    shards.replace(dict(reversed(items.items())))
+    assert files() == before
+
+    # Growing past the shard count re-shards; emptying it shrinks back
+    shards.update({f"n{i}": i for i in range(60)})
+    fresh = indexes.ShardedMap(shards.directory)
+    assert fresh.shards_for(80) == 32 and fresh._manifest()["shards"] == 32
+    assert fresh.get("n59") == 59 and fresh.get("k3") == 3
+    fresh.update({}, [*items, *(f"n{i}" for i in range(60))])
+    assert indexes.ShardedMap(shards.directory)._manifest() == {"shards": 1, "keys": 0}
+    assert files() == {}
+
+
+def test_old_shard_layout_is_rebuilt(make_project, isolate_storage_paths):
+    a = make_project("Alpha", "u1", with_tasks=True)
+    storage.save_projects([a])
+    locator_dir = isolate_storage_paths.DATA_DIR / indexes.INDEX_DIR / "task_projects"
+    (locator_dir / indexes.ShardedMap.MANIFEST).unlink()
+    (locator_dir / "ff.json").write_text("{}", encoding="utf-8")
+
+    locator = storage.project_index(indexes.TASK_PROJECTS)
+    assert locator.lookup(a.tasks[0].id) == a.id
+    assert not (locator_dir / "ff.json").exists()
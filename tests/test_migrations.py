@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from utils import migrations, storage
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def test_migrate_makes_defaults_explicit(isolate_storage_paths):
+    _write(isolate_storage_paths.USERS_PATH, [{"id": "u1", "name": "Alex"}])
+    _write(
+        isolate_storage_paths.PROJECTS_PATH,
+        [
+            {
+                "id": "p1",
+                "title": "CLI Tool",
+                "user_id": "u1",
+                "tasks": [{"id": "t1", "title": "Write docs", "status": "DONE"}],
+            },
+            {"id": "p2", "title": "Web App", "user_id": "u1"},
+        ],
+    )
+    assert migrations.plan() == [("users", 1, 2), ("projects", 1, 2)]
+
+    reports = {r["file"]: r for r in migrations.migrate()}
+    assert reports["projects"]["records"] == 2
+    assert reports["projects"]["defaults"] == {
+        "tasks.created_at": 1,
+        "projects.created_at": 2,
+    }
+    assert reports["users"]["defaults"] == {"users.created_at": 1}
+
+    raw = json.loads(isolate_storage_paths.PROJECTS_PATH.read_text(encoding="utf-8"))
+    assert raw[0]["tasks"][0]["status"] == "done"
+    assert raw[1]["tasks"] == [] and raw[1]["description"] == ""
+    assert all(p["created_at"] for p in raw)
+    assert storage.schema_versions() == {"users": 2, "projects": 2}
+    assert migrations.plan() == []
+
+    # Offsets written during the streaming pass are usable straight away
+    assert [p.id for p in storage.load_projects_by_ids(["p2"])] == ["p2"]
+    # ...but the migrated text is not trusted as the models' canonical form
+    assert storage.pending_changes(storage.load_projects())
+
+
+def test_migrate_dry_run_leaves_files_alone(isolate_storage_paths):
+    _write(
+        isolate_storage_paths.PROJECTS_PATH,
+        [{"id": "p1", "title": "A", "user_id": "u"}],
+    )
+    before = isolate_storage_paths.PROJECTS_PATH.read_bytes()
+    (report,) = [r for r in migrations.migrate(dry_run=True) if r["file"] == "projects"]
+    assert report["records"] == 1
+    assert isolate_storage_paths.PROJECTS_PATH.read_bytes() == before
+    assert storage.schema_versions()["projects"] == 1
+
+
+def test_newer_schema_is_refused(isolate_storage_paths):
+    storage.set_schema_version("projects", storage.CURRENT_SCHEMA + 1)
+    with pytest.raises(storage.SchemaError):
+        storage.load_projects()
+
+
+def test_cli_migrate(capsys, isolate_storage_paths):
+    from main import main
+
+    main(["migrate"])
+    assert "Migrated projects" in capsys.readouterr().out
+    main(["migrate"])
+    assert "already at schema" in capsys.readouterr().out
+
+
+def test_cli_reports_schema_and_migration_errors(capsys, isolate_storage_paths):
+    from main import main
+
+    storage.set_schema_version("users", storage.CURRENT_SCHEMA + 1)
+    with pytest.raises(SystemExit) as exc:
+        main(["list-users"])
+    assert exc.value.code == 1
+    assert "supports up to" in capsys.readouterr().out
+
+    storage.set_schema_version("users", 1)
+    _write(
+        isolate_storage_paths.USERS_PATH, [{"id": "u1", "name": "Alex"}, {"id": "u2"}]
+    )
+    before = isolate_storage_paths.USERS_PATH.read_bytes()
+    main(["migrate"])
+    out = capsys.readouterr().out
+    assert "users.json record 1 (u2) has no 'name' field" in out
+    assert isolate_storage_paths.USERS_PATH.read_bytes() == before
+    assert storage.schema_versions()["users"] == 1
@@ -48,3 +48,21 @@ def test_project_add_task_and_serialize(make_project):
     p2 = Project.from_dict(d)
     assert p2.title == p.title
     assert len(p2.tasks) == 2
+
+
+def test_task_mutation_marks_parent_project_dirty(make_project):
+    p = make_project(with_tasks=True)
+    p.mark_clean()
+    assert not p.is_dirty and not p.tasks[0].is_dirty
+
+    p.tasks[0].mark_complete()
+    assert p.tasks[0].is_dirty
+    assert p.is_dirty
+    assert not p.tasks[1].is_dirty
+
+
+def test_project_detects_tasks_appended_directly(make_project, make_task):
+    p = make_project(with_tasks=False)
+    p.mark_clean()
+    p.tasks.append(make_task("Sneaky"))
+    assert p.is_dirty
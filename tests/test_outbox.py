@@ -0,0 +1,144 @@
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from utils import outbox, storage
+from utils.session import Session, SessionError
+
+
+def _seed():
+    with Session() as s:
+        s.add_user("Alex")
+        s.add_project("Alex", "CLI Tool")
+        task = s.add_task("CLI Tool", "Ship")
+    with Session() as s:
+        s.complete(task.id)
+    return task
+
+
+def _types():
+    return [e["type"] for e in outbox.pending(storage.DATA_DIR)]
+
+
+def test_events_are_committed_with_the_change(monkeypatch):
+    replaced = []
+    real = storage._replace_files
+    monkeypatch.setattr(
+        storage,
+        "_replace_files",
+        lambda files, d: replaced.append([p.parent.name for p, _ in files])
+        or real(files, d),
+    )
+    task = _seed()
+    assert _types() == [
+        "user.created",
+        "project.created",
+        "task.created",
+        "task.completed",
+    ]
+    assert outbox.pending(storage.DATA_DIR)[-1]["data"]["task_id"] == task.id
+    # Same journaled replace as the data files
+    assert replaced[0] == ["data", "data", "outbox"]
+
+    with Session() as s:
+        s.complete(task.id)  # already done: no change, no event
+        assert s.projects
+    with pytest.raises(SessionError):
+        with Session() as s:
+            s.add_task("CLI Tool", "Lost")
+            s.add_task("Nope", "Missing project")
+    assert len(_types()) == 4
+
+
+def test_dispatch_batches_and_deletes_segments(tmp_path):
+    _seed()
+    batches = []
+    sent = outbox.dispatch(storage.DATA_DIR, batches.append, batch=2)
+    # Batches hold whole segments: the first commit wrote three events
+    assert sent == 4 and [len(b) for b in batches] == [3, 1]
+    assert outbox.segments(storage.DATA_DIR) == []
+
+    sink = outbox.make_sink(f"file:{tmp_path / 'events.jsonl'}")
+    with Session() as s:
+        s.add_user("Bri")
+    assert outbox.dispatch(storage.DATA_DIR, sink) == 1
+    lines = (tmp_path / "events.jsonl").read_text().splitlines()
+    assert json.loads(lines[0])["data"]["name"] == "Bri"
+
+
+def test_dispatch_retries_with_backoff_then_gives_up():
+    _seed()
+    calls, sleeps = [], []
+
+    def flaky(events):
+        calls.append(len(events))
+        if len(calls) < 3:
+            raise ConnectionRefusedError("down")
+
+    assert outbox.dispatch(storage.DATA_DIR, flaky, sleep=sleeps.append) == 4
+    assert sleeps == [0.5, 1.0]
+
+    with Session() as s:
+        s.add_user("Bri")
+
+    def down(events):
+        raise OSError("down")
+
+    with pytest.raises(outbox.DispatchError):
+        outbox.dispatch(storage.DATA_DIR, down, retries=2, sleep=sleeps.append)
+    assert _types() == ["user.created"]  # left for the next run
+
+
+def test_socket_and_http_sinks(tmp_path):
+    _seed()
+    received = []
+
+    sock_path = tmp_path / "sink.sock"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(sock_path))
+    server.listen(1)
+
+    def accept_one():
+        conn, _ = server.accept()
+        with conn, conn.makefile("rwb") as fh:
+            received.extend(json.loads(line) for line in fh)
+            fh.write(b"ok\n")
+
+    t = threading.Thread(target=accept_one)
+    t.start()
+    assert outbox.dispatch(storage.DATA_DIR, outbox.make_sink(f"unix:{sock_path}")) == 4
+    t.join(5)
+    server.close()
+    assert [e["type"] for e in received][-1] == "task.completed"
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.extend(json.loads(body))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.handle_request).start()
+    with Session() as s:
+        s.add_user("Bri")
+    url = f"http://127.0.0.1:{httpd.server_port}/events"
+    assert outbox.dispatch(storage.DATA_DIR, outbox.make_sink(url)) == 1
+    httpd.server_close()
+    assert received[-1]["type"] == "user.created"
+
+
+def test_cli_dispatch(tmp_path, capsys):
+    from main import main
+
+    main(["add-user", "--name", "Alex"])
+    main(["dispatch", "--sink", f"file:{tmp_path / 'out.jsonl'}"])
+    assert "Delivered 1 event(s)" in capsys.readouterr().out
+    main(["dispatch", "--sink", "ftp:nowhere"])
+    assert "Unknown sink" in capsys.readouterr().out
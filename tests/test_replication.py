@@ -0,0 +1,207 @@
+import json
+import threading
+import time
+
+import pytest
+
+from utils import history, replication, storage
+from utils.session import Session
+
+
+def _seed():
+    replication.enable(storage.DATA_DIR)
+    with Session() as s:
+        s.add_user("Alex")
+        s.add_project("Alex", "CLI Tool")
+        s.add_task("CLI Tool", "one")
+
+
+def _same_files(a, b):
+    for name in ("users.json", "projects.json"):
+        assert (a / name).read_bytes() == (b / name).read_bytes()
+
+
+def test_replica_catches_up_with_deltas(tmp_path):
+    _seed()
+    primary, replica = storage.DATA_DIR, tmp_path / "replica"
+    first = replication.replicate(replica, str(primary))
+    assert first["role"] == "replica" and first["behind"] == 0
+    _same_files(primary, replica)
+
+    with Session() as s:
+        s.add_task("CLI Tool", "two")
+    entries = replication.read_log(primary, first["lsn"])[2]
+    assert [e["file"] for e in entries] == ["projects"]
+    assert "records" in entries[0] and "full" not in entries[0]
+
+    result = replication.replicate(replica, str(primary))
+    assert result["applied"] == 1 and result["lsn"] == result["head"]
+    _same_files(primary, replica)
+
+
+def test_replica_rejects_writes_until_promoted(tmp_path, monkeypatch, capsys):
+    from main import main
+
+    _seed()
+    primary, replica = storage.DATA_DIR, tmp_path / "replica"
+    replication.replicate(replica, str(primary))
+
+    with pytest.raises(SystemExit) as exc:
+        main(["--data-dir", str(replica), "add-user", "--name", "Bri"])
+    assert exc.value.code == 1
+    assert "read-only replica" in capsys.readouterr().out
+    assert [u.name for u in storage.load_users()] == ["Alex"]
+
+    lsn = replication.promote(replica)
+    assert lsn == replication.read_state(primary)["lsn"]
+    main(["add-user", "--name", "Bri"])
+    assert replication.read_state(replica)["lsn"] == lsn + 1
+
+
+def test_failover_follower_switches_source(tmp_path):
+    _seed()
+    primary = storage.DATA_DIR
+    a, b = tmp_path / "a", tmp_path / "b"
+    replication.replicate(a, str(primary))
+    replication.replicate(b, str(primary))
+
+    replication.promote(a)
+    storage.use_data_dir(a)
+    with Session() as s:
+        s.add_task("CLI Tool", "after failover")
+    result = replication.replicate(b, str(a))
+    assert result["applied"] == 1 and result["behind"] == 0
+    _same_files(a, b)
+
+
+def test_undo_resyncs_replicas_from_a_snapshot(tmp_path):
+    _seed()
+    primary, replica = storage.DATA_DIR, tmp_path / "replica"
+    with Session() as s:
+        s.add_user("Bri")
+    replication.replicate(replica, str(primary))
+    head = replication.read_state(primary)["lsn"]
+
+    history.undo(primary)
+    assert (primary / "replication" / "changes.jsonl").read_bytes() == b""
+    entries = replication.read_log(primary, head)[2]
+    assert entries and all(e["snapshot"] for e in entries)
+    replication.replicate(replica, str(primary))
+    _same_files(primary, replica)
+
+
+def test_gap_in_log_is_rejected(tmp_path):
+    _seed()
+    base = replication.read_state(storage.DATA_DIR)["base"]
+    entries = replication.read_log(storage.DATA_DIR, base)[2]
+    with pytest.raises(replication.ReplicationError):
+        replication.apply(tmp_path / "replica", entries[1:])
+
+
+def test_socket_transport(tmp_path):
+    _seed()
+    primary, replica = storage.DATA_DIR, tmp_path / "replica"
+    sock = tmp_path / "ship.sock"
+    server = threading.Thread(
+        target=replication.serve, args=(primary, sock), daemon=True
+    )
+    server.start()
+    deadline = time.monotonic() + 5
+    while not sock.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    result = replication.replicate(replica, str(sock), batch=2)
+    assert result["behind"] == 0 and result["applied"]
+    _same_files(primary, replica)
+    state = json.loads((replica / "replication" / "state.json").read_text())
+    assert state["source"] == str(sock.resolve())
+
+
+def test_archive_and_transitions_are_shipped(tmp_path):
+    from utils import archive, transitions
+
+    _seed()
+    primary, replica = storage.DATA_DIR, tmp_path / "replica"
+    archive.save_policy(30)
+    with Session() as s:
+        task, _ = s.tasks()[0]
+        s.set_status(task.id, "in_progress")
+        s.complete(task.id)
+    with Session("archive") as s:
+        s.archive()
+
+    def side_files(root):
+        found = [*root.glob("archive/*"), *root.glob("transitions/*")]
+        return {p.relative_to(root).as_posix(): p.read_bytes() for p in found}
+
+    replication.replicate(replica, str(primary))
+    assert len(side_files(primary)) == 3
+    assert side_files(replica) == side_files(primary)
+    _same_files(primary, replica)
+    assert len(list(transitions.iter_transitions(replica))) == 2
+
+    history.undo(primary)  # cuts the segment append; the replica follows
+    replication.replicate(replica, str(primary))
+    assert side_files(replica) == side_files(primary)
+    assert len(side_files(replica)) == 2
+    _same_files(primary, replica)
+
+
+def test_logging_is_opt_in(tmp_path, capsys):
+    from main import main
+
+    with Session() as s:
+        s.add_user("Alex")
+    assert not (storage.DATA_DIR / "replication").exists()
+    main(
+        ["--data-dir", str(tmp_path / "replica"), "replicate", "--from", str(tmp_path)]
+    )
+    assert "enable-replication" in capsys.readouterr().out
+
+    main(["--data-dir", str(tmp_path / "data"), "enable-replication"])
+    replication.replicate(tmp_path / "replica", str(tmp_path / "data"))
+    _same_files(tmp_path / "data", tmp_path / "replica")
+    with Session() as s:
+        s.add_user("Bri")
+    with pytest.raises(replication.ReplicationError, match="own data"):
+        replication.replicate(storage.DATA_DIR, str(tmp_path / "replica"))
+
+
+def test_log_is_compacted_past_acknowledged_lsns(tmp_path):
+    _seed()
+    primary, a, b = storage.DATA_DIR, tmp_path / "a", tmp_path / "b"
+    log = primary / "replication" / "changes.jsonl"
+    replication.replicate(a, str(primary))
+    with Session() as s:
+        s.add_task("CLI Tool", "two")
+    replication.replicate(a, str(primary))
+    replication.replicate(a, str(primary))  # a poll acks what a had applied
+    with Session() as s:
+        s.add_task("CLI Tool", "three")
+    logged = len(log.read_text().splitlines())
+
+    # Only what a has acknowledged goes; the rest stays for it
+    assert replication.compact(primary, force=True) == logged - 1
+    assert replication.replicate(a, str(primary))["applied"] == 1
+    replication.replicate(a, str(primary))
+    assert replication.compact(primary, force=True) == 1
+    assert log.read_bytes() == b""
+
+    # A new replica starts from a snapshot of the live files
+    replication.replicate(b, str(primary))
+    _same_files(primary, b)
+    with Session() as s:
+        s.add_task("CLI Tool", "four")
+    for replica in (a, b):
+        assert replication.replicate(replica, str(primary))["applied"] == 1
+        _same_files(primary, replica)
+
+
+def test_unreachable_source_leaves_node_writable(tmp_path, capsys):
+    from main import main
+
+    main(["replicate", "--from", str(tmp_path / "typo")])
+    assert "no change log" in capsys.readouterr().out
+    assert not replication.is_replica(storage.DATA_DIR)
+    main(["add-user", "--name", "Alex"])
+    assert [u.name for u in storage.load_users()] == ["Alex"]
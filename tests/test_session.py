@@ -0,0 +1,156 @@
+import json
+
+import pytest
+
+from utils import history, storage
+from utils.session import Session, SessionError
+
+
+def _seed():
+    with Session() as s:
+        s.add_user("Alex")
+        s.add_user("Bri")
+        s.add_project("Alex", "CLI Tool")
+        s.add_project("Bri", "Web App")
+    return s
+
+
+def test_session_commits_once_on_exit(isolate_storage_paths):
+    _seed()
+    with Session() as s:
+        for i in range(50):
+            s.add_task("CLI Tool", f"Task {i}")
+    raw = json.loads(isolate_storage_paths.PROJECTS_PATH.read_text(encoding="utf-8"))
+    assert len(raw[0]["tasks"]) == 50
+    # Seed + bulk add: two undoable steps, one write each for the bulk add
+    txns = history.transactions(storage.DATA_DIR)
+    assert len(txns) == 2 and txns[-1]["files"] == ["projects"]
+
+
+def test_session_loads_lazily_once_with_identity(monkeypatch):
+    _seed()
+    calls = []
+    real = storage.load_projects
+    monkeypatch.setattr(storage, "load_projects", lambda: calls.append(1) or real())
+    s = Session()
+    assert calls == []
+    task = s.add_task("CLI Tool", "Write docs")
+    assert s.project("cli tool") is s.project("CLI Tool")
+    assert s.task(task.id)[0] is task
+    assert s.tasks("CLI Tool") == [(task, s.project("CLI Tool").id)]
+    assert calls == [1]
+
+
+def test_session_discards_changes_on_error(isolate_storage_paths):
+    _seed()
+    before = isolate_storage_paths.PROJECTS_PATH.read_bytes()
+    with pytest.raises(SessionError):
+        with Session() as s:
+            s.add_task("CLI Tool", "Lost")
+            s.add_task("Nope", "Missing project")
+    assert isolate_storage_paths.PROJECTS_PATH.read_bytes() == before
+
+
+def test_read_only_session_writes_nothing():
+    _seed()
+    n = len(history.entries(storage.DATA_DIR))
+    with Session() as s:
+        assert [u.name for u in s.users] == ["Alex", "Bri"]
+        assert len(s.projects) == 2
+    assert len(history.entries(storage.DATA_DIR)) == n
+
+
+def test_index_backed_queries_see_pending_changes():
+    _seed()
+    with Session() as s:
+        (proj,) = s.projects_of("Alex")  # via the owner index
+        task = s.add_task("CLI Tool", "Ship")
+        s.assign(task.id, "Bri")
+        assert s.tasks_assigned_to("Bri") == [(task, proj.id)]
+    assert [t.id for t, _pid in Session().tasks_assigned_to("Bri")] == [task.id]
+
+
+def test_delete_user_updates_both_files_in_one_commit(isolate_storage_paths):
+    _seed()
+    with Session() as s:
+        summary = s.delete_user("Alex", reassign_to="Bri")
+    assert summary.owned == 1 and summary.deleted == 0
+    txns = history.transactions(storage.DATA_DIR)
+    assert sorted(txns[-1]["files"]) == ["projects", "users"]
+    s = Session()
+    assert sorted(p.title for p in s.projects_of("Bri")) == ["CLI Tool", "Web App"]
+
+    history.undo(storage.DATA_DIR)
+    assert Session().user("Alex") is not None
+
+
+def test_interrupted_commit_is_rolled_forward(isolate_storage_paths):
+    _seed()
+    users_tmp = storage._write_temp(storage.USERS_PATH, b"[]")
+    projects_tmp = storage._write_temp(storage.PROJECTS_PATH, b"[]")
+    journal = storage.DATA_DIR / storage.JOURNAL_FILE
+    journal.write_text(
+        json.dumps(
+            [
+                [users_tmp, str(storage.USERS_PATH)],
+                [projects_tmp, str(storage.PROJECTS_PATH)],
+            ]
+        ),
+        encoding="utf-8",
+    )
+    # Crash after the first rename: the next read finishes the second one
+    storage._roll_forward([[users_tmp, str(storage.USERS_PATH)]])
+    assert storage.load_projects() == []
+    assert not journal.exists()
+    assert storage.load_users() == []
+
+
+def test_dependencies_see_uncommitted_edges():
+    _seed()
+    with Session() as s:
+        a = s.add_task("CLI Tool", "A")
+        b = s.add_task("Web App", "B")
+    with Session() as s:
+        c = s.add_task("CLI Tool", "C")
+        assert s.depend(b.id, [a.id, c.id]) == (s.task(b.id)[0], [a.id, c.id])
+        with pytest.raises(SessionError, match="cycle"):
+            s.depend(c.id, [b.id])  # b -> c is not in the index yet
+        with pytest.raises(SessionError, match="No such task"):
+            s.depend(a.id, ["missing"])
+        assert s.undepend(b.id, [c.id])[1] == [c.id]
+        s.depend(c.id, [b.id])  # no cycle once the edge is gone
+    assert Session().task(b.id)[0].depends_on == [a.id]
+
+
+def test_archive_writes_segments_with_the_commit(monkeypatch):
+    from utils import archive
+
+    _seed()
+    with Session() as s:
+        done = s.add_task("CLI Tool", "Done")
+        s.add_task("CLI Tool", "Open")
+        s.complete(done.id)
+    with pytest.raises(SessionError):
+        with Session() as s:
+            assert s.archive() == 1
+            s.add_task("Nope", "Missing project")
+    assert archive.segment_paths() == []  # nothing written on error
+
+    def refuse(**_kw):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m:
+        m.setattr(storage, "commit", refuse)
+        with pytest.raises(OSError):
+            with Session("archive") as s:
+                s.archive()
+    assert archive.segment_paths() == []  # no copy of tasks still in the data
+
+    with Session("archive") as s:
+        assert s.archive(codec="xz") == 1
+        assert s.task(done.id) is None
+    assert [t.id for t, _pid in archive.iter_archived()] == [done.id]
+    assert [t.title for t, _pid in Session().tasks()] == ["Open"]
+    history.undo(storage.DATA_DIR)  # one step undoes both
+    assert archive.segment_paths() == []
+    assert len(Session().tasks()) == 2
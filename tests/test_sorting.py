@@ -0,0 +1,87 @@
+import pytest
+
+from models.task import Task
+from utils import sorting, storage
+
+
+def _rows(n=40):
+    return [(Task(f"Task {(i * 7) % n:02d}"), f"p{i % 3}") for i in range(n)]
+
+
+def test_parse_budget():
+    assert sorting.parse_budget("512M") == 512 << 20
+    assert sorting.parse_budget("64kb") == 64 << 10
+    assert sorting.parse_budget("1GiB") == 1 << 30
+    assert sorting.parse_budget("4096") == 4096
+    for bad in ("", "lots", "0", "-5M", "inf", "-inf", "nan", "1e999G"):
+        with pytest.raises(ValueError):
+            sorting.parse_budget(bad)
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_external_sort_spills_and_merges(tmp_path, monkeypatch, reverse):
+    monkeypatch.setattr(sorting, "MAX_FANIN", 3)  # force multi-pass merging
+    spill = tmp_path / "spill"
+    spill.mkdir()
+    rows = _rows()
+    key = sorting.sort_key("title", {})
+    stats = {}
+    out = list(
+        sorting.external_sort(
+            rows, key, budget=2000, reverse=reverse, tmp_dir=spill, stats=stats
+        )
+    )
+    assert stats["rows"] == 40 and stats["runs"] > 3
+    expected = sorted(rows, key=key, reverse=reverse)
+    assert [(t.id, pid) for t, pid in out] == [(t.id, pid) for t, pid in expected]
+    assert list(spill.iterdir()) == []  # runs cleaned up
+
+
+def test_external_sort_in_memory_when_it_fits(tmp_path):
+    rows = _rows(5)
+    stats = {}
+    key = sorting.sort_key("title", {})
+    out = sorting.external_sort(rows, key, 1 << 20, tmp_dir=tmp_path, stats=stats)
+    assert [t.title for t, _ in out] == sorted(t.title for t, _ in rows)
+    assert stats["runs"] == 0
+
+
+def test_top_n_and_project_order():
+    rows = _rows()
+    titles = {"p0": "Zeta", "p1": "alpha", "p2": "Beta"}
+    key = sorting.sort_key("project", titles)
+    assert sorting.top_n(rows, key, 5) == sorted(rows, key=key)[:5]
+    assert {pid for _t, pid in sorting.top_n(rows, key, 5)} == {"p1"}
+    assert sorting.top_n(rows, key, 3, reverse=True)[0][1] == "p0"
+    with pytest.raises(ValueError):
+        sorting.sort_key("due", {})
+
+
+def test_cli_sorted_listing(capsys, monkeypatch):
+    from main import main
+
+    main(["add-user", "--name", "Alex"])
+    main(["add-project", "--user", "Alex", "--title", "Web"])
+    main(["add-project", "--user", "Alex", "--title", "API"])
+    for project, title in [("Web", "b"), ("API", "c"), ("Web", "a")]:
+        main(["add-task", "--project", project, "--title", title])
+    capsys.readouterr()
+
+    def titles(out):
+        lines = out.splitlines()[2:]
+        return [line.split("|")[1].strip() for line in lines if "|" in line]
+
+    main(["list-tasks", "--sort", "title", "--memory-budget", "200"])
+    assert titles(capsys.readouterr().out) == ["a", "b", "c"]
+
+    main(["list-tasks", "--sort", "project", "--desc", "--limit", "2"])
+    out = capsys.readouterr().out
+    assert "Web" in out and "API" not in out
+
+    main(["list-tasks", "--sort", "title", "--memory-budget", "lots"])
+    assert "Invalid memory budget" in capsys.readouterr().out
+    main(["list-tasks", "--desc", "--limit", "2"])
+    assert "--desc requires --sort" in capsys.readouterr().out
+    main(["list-tasks", "--sort", "title", "--newest", "2"])
+    assert "cannot be combined" in capsys.readouterr().out
+    assert storage.load_projects()  # nothing was rewritten
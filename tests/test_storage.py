@@ -37,3 +37,139 @@ def test_lookup_helpers(make_user, make_project):
 
     idx = storage.index_by_id(storage.load_projects())
     assert projects[0].id in idx and projects[1].id in idx
+
+
+def test_save_projects_splices_unchanged_projects(make_project, isolate_storage_paths):
+    import json
+    from models.task import Task
+
+    storage.save_projects(
+        [make_project("Alpha", "u1", with_tasks=True), make_project("Bravo", "u1")]
+    )
+    loaded = storage.load_projects()
+    assert storage.pending_changes(loaded) == []
+
+    loaded[1].add_task(Task("New task"))
+    changes = storage.save_projects(loaded)
+    assert [p.title for p in changes.changed] == ["Bravo"]
+    assert changes.reused == 1
+
+    # Output is byte-identical to a full re-serialization
+    text = isolate_storage_paths.PROJECTS_PATH.read_text(encoding="utf-8")
+    assert text == json.dumps([p.to_dict() for p in loaded], indent=2)
+
+
+def test_non_canonical_records_are_rewritten(isolate_storage_paths):
+    import json
+
+    from main import main
+
+    paths = isolate_storage_paths
+    paths.USERS_PATH.write_text(
+        json.dumps(
+            [{"id": "u1", "name": "Alex", "email": " ALEX@Example.com "}], indent=2
+        ),
+        encoding="utf-8",
+    )
+    legacy = {
+        "title": "P1",
+        "user_id": "u1",
+        "due_date": "2030-01-02T09:30:00",
+        "tasks": [{"id": "t1", "title": "Ship", "status": "todo"}],
+    }
+    paths.PROJECTS_PATH.write_text(json.dumps([legacy], indent=2), encoding="utf-8")
+
+    # An id-less record gets the same id on every load
+    assert storage.load_projects()[0].id == storage.load_projects()[0].id
+    assert storage.pending_changes(storage.load_projects())
+
+    main(["complete-task", "--id", "t1"])
+    [project] = json.loads(paths.PROJECTS_PATH.read_text(encoding="utf-8"))
+    assert project["id"] and project["tasks"][0]["status"] == "done"
+    assert project["due_date"] == "2030-01-02"
+
+    storage.save_users(storage.load_users())
+    [user] = json.loads(paths.USERS_PATH.read_text(encoding="utf-8"))
+    assert user["email"] == "alex@example.com" and user["created_at"]
+
+
+def test_saves_keep_file_permissions(make_user, isolate_storage_paths):
+    import os
+
+    from utils import indexes
+
+    os.chmod(isolate_storage_paths.USERS_PATH, 0o640)
+    storage.save_users([make_user("Alex")])
+    assert isolate_storage_paths.USERS_PATH.stat().st_mode & 0o777 == 0o640
+
+    # New files get the umask default (0644 under umask 022), not 0600
+    isolate_storage_paths.PROJECTS_PATH.unlink()
+    storage.save_projects([])
+    for path in (
+        isolate_storage_paths.PROJECTS_PATH,
+        isolate_storage_paths.DATA_DIR / "indexes" / "names" / "users.txt",
+    ):
+        assert path.stat().st_mode & 0o777 == indexes._NEW_FILE_MODE
+
+
+def test_iter_json_array_grows_buffer_for_large_elements(monkeypatch, tmp_path):
+    import json
+
+    big = {
+        "id": "p1",
+        "tasks": [{"id": f"t{i}", "title": "x" * 40} for i in range(2000)],
+    }
+    path = tmp_path / "big.json"
+    path.write_text(json.dumps([1, big, "tail"], indent=2), encoding="utf-8")
+
+    calls = []
+    real = storage._DECODER.raw_decode
+
+    class Counting:
+        def raw_decode(self, s, idx=0):
+            calls.append(idx)
+            return real(s, idx)
+
+    monkeypatch.setattr(storage, "_DECODER", Counting())
+    assert list(storage.iter_json_array(path, chunk_chars=256)) == [1, big, "tail"]
+    # ~180 KB read 256 chars at a time: a doubling buffer retries ~10 times
+    assert len(calls) < 30
+
+
+def test_files_written_by_storage_load_without_round_trips(
+    make_project, make_task, isolate_storage_paths, monkeypatch
+):
+    from models.project import Project
+    from models.task import Task
+
+    p = make_project("Alpha", "u1")
+    p.add_task(make_task("Ship"))
+    storage.save_projects([p])
+    before = isolate_storage_paths.PROJECTS_PATH.read_bytes()
+
+    def fail(*_a):
+        raise AssertionError("re-serialized on load")
+
+    with monkeypatch.context() as m:
+        m.setattr(Project, "to_dict", fail)
+        m.setattr(Task, "title", property(fail, fail))  # setters must not run
+        loaded = storage.load_projects()
+        assert storage.pending_changes(loaded) == []
+        (by_id,) = storage.load_projects_by_ids([p.id])
+        assert not by_id.is_dirty
+
+    [task] = loaded[0].tasks
+    task.title = "Ship it"  # tracking still works on trusted models
+    assert loaded[0].is_dirty
+    storage.save_projects(loaded)
+    assert storage.load_projects()[0].tasks[0].title == "Ship it"
+    assert isolate_storage_paths.PROJECTS_PATH.read_bytes() != before
+
+    # A hand-edited file is not trusted: its records are normalized again
+    raw = isolate_storage_paths.PROJECTS_PATH.read_text(encoding="utf-8")
+    isolate_storage_paths.PROJECTS_PATH.write_text(
+        raw.replace('"status": "todo"', '"status": "TODO"'), encoding="utf-8"
+    )
+    reloaded = storage.load_projects()
+    assert reloaded[0].tasks[0].status == "todo"
+    assert storage.pending_changes(reloaded) == reloaded
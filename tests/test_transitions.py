@@ -0,0 +1,169 @@
+import uuid
+
+import pytest
+
+from models.task import Task
+from utils import formatting, storage, transitions
+from utils.session import Session, SessionError
+
+
+@pytest.fixture(autouse=True)
+def _fresh_buffer():
+    transitions.discard()
+    yield
+    transitions.discard()
+
+
+def _logged():
+    return [(t.old, t.new) for t in transitions.iter_transitions(storage.DATA_DIR)]
+
+
+def test_transitions_are_logged_on_save(make_project):
+    p = make_project("CLI Tool", with_tasks=True)
+    storage.save_projects([p])  # creating/loading tasks logs nothing
+    assert _logged() == []
+
+    todo, doing = p.tasks
+    todo.status = "in_progress"
+    todo.mark_complete()
+    doing.mark_complete()
+    doing.mark_complete()  # not a transition
+    assert _logged() == []  # buffered until saved
+
+    storage.save_projects([p])
+    assert _logged() == [
+        ("todo", "in_progress"),
+        ("in_progress", "done"),
+        ("in_progress", "done"),
+    ]
+    size = transitions.log_path(storage.DATA_DIR).stat().st_size
+    assert size == 3 * transitions.RECORD.size
+    assert storage.PROJECTS_PATH.read_text().count("in_progress") == 0
+
+
+def test_unsaved_changes_stay_out_of_the_log(make_project):
+    storage.save_projects([make_project("CLI Tool", with_tasks=True)])
+    with Session() as s:
+        task, _ = s.tasks()[0]
+
+    with pytest.raises(SessionError):
+        with Session() as s:
+            s.set_status(task.id, "in_progress")
+            s.add_task("Nope", "Missing project")
+
+    loose = Task("Never saved")
+    loose.mark_complete()
+    with Session() as s:
+        s.add_task("CLI Tool", "Other")
+    assert _logged() == []
+    del loose
+    assert transitions.flush(storage.DATA_DIR) == 0
+
+
+def test_switching_data_dir_drops_the_buffer(make_project, tmp_path):
+    p = make_project("CLI Tool", with_tasks=True)
+    storage.save_projects([p])
+    p.tasks[0].mark_complete()  # buffered for this data dir...
+    p.mark_clean()  # ...and never saved here
+
+    storage.use_data_dir(tmp_path / "other")
+    storage.save_projects([make_project("Other", with_tasks=True)])
+    assert _logged() == []
+
+
+def test_torn_tail_is_realigned(make_project):
+    p = make_project("CLI Tool", with_tasks=True)
+    storage.save_projects([p])
+    p.tasks[0].mark_complete()
+    storage.save_projects([p])
+    path = transitions.log_path(storage.DATA_DIR)
+    with path.open("ab") as fh:
+        fh.write(b"\x01" * 10)  # half-written record
+    assert len(_logged()) == 1
+
+    p.tasks[0].mark_incomplete()
+    storage.save_projects([p])
+    assert _logged() == [("todo", "done"), ("done", "todo")]
+
+
+def test_any_task_id_is_logged_under_a_distinct_key(make_project, monkeypatch):
+    p = make_project("CLI Tool")
+    long_id = "legacy-" + "x" * 40
+    tasks = [Task("A", task_id="tâche-1"), Task("B", task_id=long_id + "1")]
+    tasks.append(Task("C", task_id=long_id + "2"))  # same first 36 bytes as B
+    for t in tasks:
+        p.add_task(t)
+    storage.save_projects([p])
+    for t in tasks:
+        t.mark_complete()
+    storage.save_projects([p])
+    keys = [t.key for t in transitions.iter_transitions(storage.DATA_DIR)]
+    assert keys == [transitions.task_key(t.id) for t in tasks]
+    assert len(set(keys)) == 3
+    assert transitions.task_key(p.id) == uuid.UUID(p.id).bytes
+
+    def broken(task, old, new):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("models.task.STATUS_LISTENERS", [broken])
+    with pytest.warns(RuntimeWarning, match="boom"):
+        tasks[0].mark_incomplete()
+    assert tasks[0].status == "todo"
+
+
+def test_cycle_time_percentiles(make_project):
+    p = make_project("CLI Tool")
+    tasks = [Task(f"T{i}", created_at="2024-01-01T00:00:00+00:00") for i in range(4)]
+    for t in tasks:
+        p.add_task(t)
+    storage.save_projects([p])
+
+    day = 86_400_000_000
+    start = transitions._us("2024-01-01T00:00:00+00:00")
+    log = []
+    for i, t in enumerate(tasks[:3]):
+        tid = transitions.task_key(t.id)
+        log.append(transitions.RECORD.pack(tid, 1, 2, start + day))
+        log.append(transitions.RECORD.pack(tid, 2, 3, start + (i + 2) * day))
+        t.status = "done"
+    # Reopened and not finished again: skipped
+    log.append(
+        transitions.RECORD.pack(transitions.task_key(tasks[3].id), 1, 3, start + day)
+    )
+    log.append(
+        transitions.RECORD.pack(
+            transitions.task_key(tasks[3].id), 3, 1, start + 2 * day
+        )
+    )
+    transitions.discard()
+    path = transitions.log_path(storage.DATA_DIR)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"".join(log))
+
+    pairs = [(t, p.id) for t in tasks]
+    [row] = transitions.cycle_times(storage.DATA_DIR, pairs, (50, 100))
+    assert row["project_id"] == p.id and row["done"] == 3
+    assert row["lead"] == {50: 3 * 86400, 100: 4 * 86400}
+    assert row["cycle"] == {50: 2 * 86400, 100: 3 * 86400}
+
+
+def test_cli_set_status_and_cycle_time(capsys, monkeypatch):
+    from main import main
+
+    monkeypatch.setattr(formatting, "HAS_RICH", False)
+
+    main(["add-user", "--name", "Alex"])
+    main(["add-project", "--user", "Alex", "--title", "CLI Tool"])
+    main(["add-task", "--project", "CLI Tool", "--title", "Ship"])
+    with Session() as s:
+        task, _ = s.tasks()[0]
+    main(["set-status", "--id", task.id, "--status", "in_progress"])
+    main(["complete-task", "--id", task.id])
+    capsys.readouterr()
+
+    main(["cycle-time", "--percentiles", "50,90"])
+    out = [line.split("|") for line in capsys.readouterr().out.splitlines()]
+    assert [c.strip() for c in out[0][:4]] == ["Project", "Done", "Lead p50", "Lead p90"]
+    assert out[2][0].strip() == "CLI Tool" and out[2][1].strip() == "1"
+    main(["cycle-time", "--percentiles", "0"])
+    assert "--percentiles" in capsys.readouterr().out
@@ -0,0 +1,61 @@
+from utils import formatting, storage, watch
+
+
+def test_diff_rows_reports_added_changed_and_removed():
+    old = {"a": ("a", "x"), "b": ("b", "y")}
+    added, changed, removed = watch.diff_rows(old, [("a", "x2"), ("c", "z")])
+    assert added == [("c", "z")]
+    assert changed == [("a", "x2")]
+    assert removed == ["b"]
+
+
+def test_snapshot_reparses_only_changed_projects(make_project):
+    p1 = make_project("CLI Tool", with_tasks=True)
+    p2 = make_project("Web App")
+    storage.save_projects([p1, p2])
+
+    snap = watch.ProjectSnapshot()
+    changed, removed = snap.refresh()
+    assert changed == {p1.id, p2.id} and not removed
+    untouched = snap.projects[p2.id]
+
+    p1.tasks[0].status = "done"
+    storage.save_projects([p1, p2])
+    changed, removed = snap.refresh()
+    assert changed == {p1.id} and not removed
+    assert snap.projects[p1.id].tasks[0].status == "done"
+    assert snap.projects[p2.id] is untouched
+
+    # Unchanged file: nothing is re-read
+    assert snap.refresh() == (set(), set())
+
+    storage.save_projects([p1])
+    assert snap.refresh() == (set(), {p2.id})
+    assert list(snap.projects) == [p1.id]
+
+
+def test_watch_redraws_only_changed_rows(monkeypatch, capsys, make_project):
+    monkeypatch.setattr(formatting, "HAS_RICH", False)
+    p1 = make_project("CLI Tool")
+    storage.save_projects([p1])
+    calls = []
+
+    def build_rows(snap):
+        if not calls:  # simulate another process adding a project
+            storage.save_projects([p1, make_project("Web App")])
+        calls.append(len(snap.projects))
+        return [formatting.project_row(p) for p in snap.projects.values()]
+
+    redraws = watch.watch(
+        "Projects",
+        formatting.PROJECT_HEADERS,
+        build_rows,
+        interval=0.05,
+        max_cycles=3,
+        use_inotify=False,
+    )
+    out = capsys.readouterr().out
+    assert redraws == 2
+    assert calls[0] == 1 and calls[1] == 2
+    assert "+ " in out and "Web App" in out
+    assert "CLI Tool" in out.splitlines()[2]
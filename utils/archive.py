@@ -0,0 +1,167 @@
+# utils/archive.py
+from __future__ import annotations
+
+import gzip
+import json
+import lzma
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Tuple
+
+from models.project import Project
+from models.task import Task
+from utils import history, replication, storage
+
+# Completed tasks move out of projects.json into append-only, compressed
+# segments, one per month: data/archive/tasks-YYYY-MM.jsonl.{gz,xz}
+CODECS = {"gzip": ".jsonl.gz", "xz": ".jsonl.xz"}
+DEFAULT_CODEC = "gzip"
+POLICY_FILE = "policy.json"
+
+
+def archive_dir() -> Path:
+    """
+    Directory holding archive segments (follows storage.DATA_DIR).
+    """
+    return storage.DATA_DIR / "archive"
+
+
+def _open_segment(path: Path, mode: str) -> IO[str]:
+    # Both formats accept appends as extra members/streams and read them back
+    # transparently, so segments never need rewriting.
+    if path.name.endswith(".xz"):
+        return lzma.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+
+
+def _month_of(created_at: str) -> str:
+    try:
+        return datetime.fromisoformat(created_at).strftime("%Y-%m")
+    except (TypeError, ValueError):
+        return "unknown"
+
+
+def _is_older_than(task: Task, cutoff: Optional[datetime]) -> bool:
+    if cutoff is None:
+        return True
+    try:
+        created = datetime.fromisoformat(task.created_at)
+    except (TypeError, ValueError):
+        return False
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return created <= cutoff
+
+
+def select_completed(
+    projects: List[Project],
+    older_than_days: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[Tuple[Project, Task]]:
+    """
+    (project, task) pairs for the completed tasks of `projects`; with
+    older_than_days, only those created at least that long ago.
+    """
+    cutoff = None
+    if older_than_days is not None:
+        cutoff = (now or datetime.now(tz=timezone.utc)) - timedelta(
+            days=older_than_days
+        )
+    return [
+        (p, t)
+        for p in projects
+        for t in p.tasks
+        if t.completed and _is_older_than(t, cutoff)
+    ]
+
+
+def append_segments(rows: List[Tuple[str, Task]], codec: str = DEFAULT_CODEC) -> None:
+    """
+    Append (project_id, task) rows to their monthly segments. The appends
+    are logged so undo can cut them off and replicas receive them.
+    Session.archive() moves the tasks; its commit calls this once they have
+    left projects.json.
+    """
+    replication.ensure_writable(storage.DATA_DIR)
+    if codec not in CODECS:
+        raise ValueError(f"codec must be one of {sorted(CODECS)}")
+    by_month: dict[str, list[str]] = {}
+    for project_id, t in rows:
+        record = {"project_id": project_id, **t.to_dict()}
+        by_month.setdefault(_month_of(t.created_at), []).append(json.dumps(record))
+    if not by_month:
+        return
+
+    adir = archive_dir()
+    adir.mkdir(parents=True, exist_ok=True)
+    paths = {m: adir / f"tasks-{m}{CODECS[codec]}" for m in by_month}
+    sizes = {
+        path.relative_to(storage.DATA_DIR).as_posix(): (
+            path.stat().st_size if path.exists() else 0
+        )
+        for path in paths.values()
+    }
+    history.record_appends(storage.DATA_DIR, sizes)  # so undo can cut them off
+    for month, lines in sorted(by_month.items()):
+        with _open_segment(paths[month], "a") as fh:
+            fh.write("\n".join(lines) + "\n")
+    for rel, size in sizes.items():
+        replication.record_side(storage.DATA_DIR, rel, size)
+
+
+def segment_paths() -> List[Path]:
+    """
+    Archive segments in chronological order.
+    """
+    adir = archive_dir()
+    if not adir.exists():
+        return []
+    return sorted(
+        (p for p in adir.iterdir() if p.name.startswith("tasks-")),
+        key=lambda p: p.name,
+    )
+
+
+def iter_archived(project_id: Optional[str] = None) -> Iterator[Tuple[Task, str]]:
+    """
+    Lazily stream archived (task, project_id) pairs, one segment line at a time.
+    """
+    for path in segment_paths():
+        with _open_segment(path, "r") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                pid = data.pop("project_id", None)
+                if project_id is not None and pid != project_id:
+                    continue
+                yield Task.from_dict(data), pid
+
+
+# --- Auto policy ---
+
+
+def load_policy() -> Optional[int]:
+    """
+    Return the auto-archive age in days, or None when no policy is set.
+    """
+    path = archive_dir() / POLICY_FILE
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("older_than_days")
+    except json.JSONDecodeError:
+        return None
+
+
+def save_policy(older_than_days: Optional[int]) -> None:
+    """
+    Persist (or clear, with None) the auto-archive policy.
+    """
+    replication.ensure_writable(storage.DATA_DIR)
+    adir = archive_dir()
+    adir.mkdir(parents=True, exist_ok=True)
+    (adir / POLICY_FILE).write_text(
+        json.dumps({"older_than_days": older_than_days}), encoding="utf-8"
+    )
+    replication.record_side(storage.DATA_DIR, f"archive/{POLICY_FILE}", 0)
@@ -0,0 +1,203 @@
+# utils/async_storage.py
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from models.project import Project
+from models.user import User
+from utils import history, storage
+from utils.storage import ChangeSet
+
+# asyncio front end to utils.storage for servers that embed the package.
+#
+# - Loads and parsing run in a bounded thread pool, never on the event loop.
+# - Identical loads issued while one is in flight share it (coalescing), so a
+#   burst of N dashboard requests costs one parse. Coalesced callers receive
+#   the *same* objects: treat them as read-only or copy before mutating.
+# - Awaited saves are queued to a single writer. Everything queued while a
+#   write is running goes out as the next batch: one storage.commit(), one
+#   undo step. Each caller resumes once the batch holding its change is on
+#   disk (or with the batch's exception).
+# - Reads never overlap a write, and a load issued after a save completed
+#   always sees that save.
+#
+#     async with AsyncStorage() as db:
+#         projects = await db.load_projects()
+#         await db.patch_projects([changed])
+
+EMPTY_CHANGES = ChangeSet(changed=[], removed=[], reused=0, exact=True)
+
+
+class _Batch:
+    """Saves merged in arrival order into one commit."""
+
+    def __init__(self) -> None:
+        self.users: Optional[List[User]] = None
+        self.projects: Optional[List[Project]] = None
+        self.upserts: Dict[str, Project] = {}
+        self.removed: set = set()
+
+    def add(self, op: str, payload: Any) -> None:
+        if op == "users":
+            self.users = payload
+        elif op == "projects":  # a full save supersedes earlier patches
+            self.projects = list(payload)
+            self.upserts, self.removed = {}, set()
+        else:
+            upserts, removed_ids = payload
+            if self.projects is not None:  # patch on top of a full save
+                drop = set(removed_ids)
+                replace = {p.id: p for p in upserts}
+                kept = [replace.pop(p.id, p) for p in self.projects if p.id not in drop]
+                self.projects = kept + list(replace.values())
+                return
+            for pid in removed_ids:
+                self.upserts.pop(pid, None)
+                self.removed.add(pid)
+            for p in upserts:
+                self.upserts[p.id] = p
+                self.removed.discard(p.id)
+
+
+class AsyncStorage:
+    def __init__(self, max_workers: int = 4, label: str = "async-save"):
+        self.label = label
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="async-storage"
+        )
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._generation = 0  # bumped by every committed batch
+        self._queue: List[Tuple[str, Any, asyncio.Future]] = []
+        self._writer: Optional[asyncio.Task] = None
+        self._gate: Optional[asyncio.Condition] = None
+        self._readers = 0
+        self._write_pending = False
+        # Counters for benchmarks and tests
+        self.loads = 0  # loads actually run
+        self.coalesced = 0  # load calls that joined one in flight
+        self.batches = 0  # commits written
+        self.saves = 0  # save calls
+
+    async def __aenter__(self) -> "AsyncStorage":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        await self.close()
+        return False
+
+    async def close(self) -> None:
+        """Wait for queued saves, then shut the thread pool down."""
+        if self._writer is not None:
+            await asyncio.shield(self._writer)
+        self._executor.shutdown(wait=True)
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the loop the storage is used from
+        if self._gate is None:
+            self._gate = asyncio.Condition()
+        return self._gate
+
+    # --- Reads ---
+
+    async def load_users(self) -> List[User]:
+        return await self._read("users", storage.load_users)
+
+    async def load_projects(self) -> List[Project]:
+        return await self._read("projects", storage.load_projects)
+
+    async def load_projects_by_ids(self, ids: Iterable[str]) -> List[Project]:
+        ids = list(ids)
+        return await self._read(
+            ("projects_by_ids", tuple(sorted(ids))),
+            lambda: storage.load_projects_by_ids(ids),
+        )
+
+    async def _read(self, what: Any, load: Callable[[], Any]) -> Any:
+        key = (what, self._generation)
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(self._run_load(load))
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _f: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+        # One caller being cancelled must not cancel the shared load
+        return await asyncio.shield(fut)
+
+    async def _run_load(self, load: Callable[[], Any]) -> Any:
+        gate = self._condition()
+        async with gate:  # writers waiting go first
+            await gate.wait_for(lambda: not self._write_pending)
+            self._readers += 1
+        try:
+            self.loads += 1
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, load
+            )
+        finally:
+            async with gate:
+                self._readers -= 1
+                gate.notify_all()
+
+    # --- Writes ---
+
+    async def save_users(self, users: List[User]) -> ChangeSet:
+        return await self._submit("users", users)
+
+    async def save_projects(self, projects: List[Project]) -> ChangeSet:
+        return await self._submit("projects", projects)
+
+    async def patch_projects(
+        self, upserts: Iterable[Project] = (), removed_ids: Iterable[str] = ()
+    ) -> ChangeSet:
+        return await self._submit("patch", (list(upserts), list(removed_ids)))
+
+    async def _submit(self, op: str, payload: Any) -> ChangeSet:
+        fut = asyncio.get_running_loop().create_future()
+        self._queue.append((op, payload, fut))
+        self.saves += 1
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.ensure_future(self._drain())
+        return await fut
+
+    async def _drain(self) -> None:
+        gate = self._condition()
+        loop = asyncio.get_running_loop()
+        while self._queue:
+            async with gate:
+                self._write_pending = True
+                await gate.wait_for(lambda: self._readers == 0)
+            queued, self._queue = self._queue, []
+            batch = _Batch()
+            for op, payload, _fut in queued:
+                batch.add(op, payload)
+            try:
+                users_cs, projects_cs = await loop.run_in_executor(
+                    self._executor, self._commit, batch
+                )
+            except Exception as e:
+                for _op, _payload, fut in queued:
+                    if not fut.done():
+                        fut.set_exception(e)
+            else:
+                self.batches += 1
+                self._generation += 1
+                for op, _payload, fut in queued:
+                    cs = users_cs if op == "users" else projects_cs
+                    if not fut.done():
+                        fut.set_result(cs or EMPTY_CHANGES)
+            finally:
+                async with gate:
+                    self._write_pending = False
+                    gate.notify_all()
+
+    def _commit(self, batch: _Batch) -> Tuple[Optional[ChangeSet], Optional[ChangeSet]]:
+        with history.transaction(storage.DATA_DIR, self.label):
+            return storage.commit(
+                users=batch.users,
+                projects=batch.projects,
+                upserts=list(batch.upserts.values()),
+                removed_ids=sorted(batch.removed),
+            )
@@ -0,0 +1,156 @@
+# utils/completion.py
+from __future__ import annotations
+
+import argparse
+import re
+import shlex
+from pathlib import Path
+from typing import Dict, List
+
+from utils.indexes import INDEX_DIR, NAMES_DIR
+
+# Shell completion scripts generated from build_parser(). Option values that
+# name users, projects or tasks are read from the plain-text lists under
+# data/indexes/names/ (kept current by every save), so pressing <Tab> runs
+# grep/awk over a sorted "name<TAB>id" file and never starts Python.
+
+SHELLS = ("bash", "zsh")
+
+# Options whose values are existing records, by name list
+VALUE_SOURCES: Dict[str, str] = {
+    "--user": "users",
+    "--reassign-to": "users",
+    "--project": "projects",
+    "--id": "tasks",
+    "--on": "tasks",
+    "--depends-on": "tasks",
+}
+
+# bash fills COMPREPLY line by line; zsh (via bashcompinit) has no mapfile
+_FILL = {
+    "bash": 'mapfile -t COMPREPLY < <({fn}_names "$data_dir" "$kind" "$cur")',
+    "zsh": 'COMPREPLY=(${{(f)"$({fn}_names "$data_dir" "$kind" "$cur")"}})',
+}
+
+_PRELUDE = {
+    "bash": "",
+    "zsh": (
+        "(( $+functions[compdef] )) || { autoload -U +X compinit && compinit; }\n"
+        "autoload -U +X bashcompinit && bashcompinit\n\n"
+    ),
+}
+
+_TEMPLATE = """\
+# {shell} completion for {prog}; generated by `{prog} completion {shell}`.
+# Load it with: source <({prog} completion {shell})
+{prelude}{fn}_names() {{
+    local file="$1/{names_dir}/$2.txt" p="$3"
+    [[ -r $file ]] || return 0
+    if [[ -z $p ]]; then
+        cut -f1 -- "$file"
+    else
+        # grep -F narrows the list fast; awk keeps names that start with $p
+        LC_ALL=C grep -F -- "$p" "$file" | p="$p" awk -F '\t' \
+            'BEGIN {{ n = length(ENVIRON["p"]) }} substr($1, 1, n) == ENVIRON["p"] {{ print $1 }}'
+    fi
+}}
+
+{fn}() {{
+    local cur=${{COMP_WORDS[COMP_CWORD]}} prev=${{COMP_WORDS[COMP_CWORD-1]}}
+    local data_dir={data_dir} cmd="" kind="" words="" i w
+    cur=${{cur#[\\"\\']}}
+    for ((i = 1; i < COMP_CWORD; i++)); do
+        w=${{COMP_WORDS[i]}}
+        case $w in
+            --data-dir) data_dir=${{COMP_WORDS[i+1]}}; ((i++)) ;;
+            --data-dir=*) data_dir=${{w#*=}} ;;
+            -*) ;;
+            *) [[ -z $cmd ]] && cmd=$w ;;
+        esac
+    done
+    data_dir=${{data_dir/#\\~/$HOME}}
+
+    case $prev in
+{value_cases}
+        --data-dir) COMPREPLY=($(compgen -d -- "$cur")); return 0 ;;
+    esac
+    if [[ -n $kind ]]; then
+        {fill}
+        compopt -o filenames 2>/dev/null  # quote names containing spaces
+        return 0
+    fi
+
+    case "$cmd $prev" in
+{choice_cases}
+    esac
+    if [[ -z $words ]]; then
+        case $cmd in
+            "") words="{global_words}" ;;
+{option_cases}
+        esac
+    fi
+    COMPREPLY=($(compgen -W "$words" -- "$cur"))
+}}
+
+complete -F {fn} {prog}
+"""
+
+
+def _subcommands(parser: argparse.ArgumentParser) -> Dict[str, argparse.ArgumentParser]:
+    for action in parser._actions:
+        if isinstance(action, argparse._SubParsersAction):
+            return dict(action.choices)
+    return {}
+
+
+def _options(parser: argparse.ArgumentParser) -> List[argparse.Action]:
+    return [a for a in parser._actions if a.option_strings]
+
+
+def script(
+    parser: argparse.ArgumentParser, shell: str, prog: str, data_dir: Path
+) -> str:
+    """
+    Completion script for `shell` ("bash" or "zsh") registering `prog`.
+    `data_dir` is where names are looked up unless --data-dir is typed.
+    """
+    if shell not in SHELLS:
+        raise ValueError(f"Unsupported shell: {shell}")
+    commands = _subcommands(parser)
+    fn = "_" + re.sub(r"\W", "_", prog) + "_complete"
+
+    value_cases = "\n".join(
+        f"        {'|'.join(opts)}) kind={kind} ;;"
+        for kind in ("users", "projects", "tasks")
+        for opts in [[o for o, k in VALUE_SOURCES.items() if k == kind]]
+    )
+    choice_cases, option_cases = [], []
+    for name, sub in commands.items():
+        flags = []
+        for action in sub._actions:
+            if not action.option_strings:  # positional: offer its choices
+                flags.extend(str(c) for c in action.choices or ())
+                continue
+            flags.extend(o for o in action.option_strings if o.startswith("--"))
+            if action.choices:
+                for opt in action.option_strings:
+                    values = " ".join(str(c) for c in action.choices)
+                    choice_cases.append(f'        "{name} {opt}") words="{values}" ;;')
+        option_cases.append(f'            {name}) words="{" ".join(flags)}" ;;')
+
+    global_flags = [
+        o for a in _options(parser) for o in a.option_strings if o.startswith("--")
+    ]
+    return _TEMPLATE.format(
+        shell=shell,
+        prog=prog,
+        prelude=_PRELUDE[shell],
+        fn=fn,
+        names_dir=f"{INDEX_DIR}/{NAMES_DIR}",
+        data_dir=shlex.quote(str(data_dir)),
+        value_cases=value_cases,
+        fill=_FILL[shell].format(fn=fn),
+        choice_cases="\n".join(choice_cases),
+        global_words=" ".join(global_flags + list(commands)),
+        option_cases="\n".join(option_cases),
+    )
@@ -0,0 +1,201 @@
+# utils/export.py
+from __future__ import annotations
+
+import csv
+import json
+import sys
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.task import Task
+from utils import indexes, storage
+from utils.archive import iter_archived
+
+# Streaming export: records flow source -> filter -> row -> chunked writer
+# as generators, so memory is bounded by one project plus one chunk of rows.
+
+FIELDS: Dict[str, List[str]] = {
+    "users": ["id", "name", "email", "created_at"],
+    "projects": [
+        "id",
+        "title",
+        "user_id",
+        "description",
+        "due_date",
+        "task_count",
+        "created_at",
+    ],
+    "tasks": ["project_id", "id", "title", "status", "assigned_to", "created_at"],
+}
+FORMATS = ("csv", "jsonl", "columnar")
+DEFAULT_CHUNK_ROWS = 1000
+COLUMNAR_FORMAT = "ppm-columnar"
+
+
+# --- Sources ---
+
+
+def _iter_raw_projects(project_title: Optional[str] = None) -> Iterator[dict]:
+    if not storage.PROJECTS_PATH.exists():
+        return
+    title_l = (project_title or "").strip().lower()
+    for raw in storage.iter_json_array(storage.PROJECTS_PATH):
+        if title_l and str(raw.get("title", "")).strip().lower() != title_l:
+            continue
+        yield raw
+
+
+def _has_project(project_title: str) -> bool:
+    # The completion name list answers the usual case without parsing
+    # projects.json; an unlisted title is confirmed by a streaming scan.
+    wanted = project_title.strip().lower()
+    names = indexes.read_names(storage.DATA_DIR, "projects") or []
+    if any(name.strip().lower() == wanted for name, _pid in names):
+        return True
+    return next(_iter_raw_projects(project_title), None) is not None
+
+
+def iter_users() -> Iterator[dict]:
+    if not storage.USERS_PATH.exists():
+        return
+    yield from storage.iter_json_array(storage.USERS_PATH)
+
+
+def iter_projects(project_title: Optional[str] = None) -> Iterator[dict]:
+    for raw in _iter_raw_projects(project_title):
+        row = {k: v for k, v in raw.items() if k != "tasks"}
+        row["task_count"] = len(raw.get("tasks", []))
+        yield row
+
+
+def iter_flat_tasks(
+    project_title: Optional[str] = None, include_archived: bool = False
+) -> Iterator[Tuple[Task, str]]:
+    """
+    Stream (task, project_id) pairs -- the shape of
+    main._flatten_tasks_with_project_id() -- one project at a time,
+    accepting the same filters as list-tasks.
+    """
+    project_ids = set()
+    for raw in _iter_raw_projects(project_title):
+        project_ids.add(raw["id"])
+        for td in raw.get("tasks", []):
+            yield Task.from_dict(td), raw["id"]
+    if include_archived:
+        for task, pid in iter_archived():
+            if project_title is None or pid in project_ids:
+                yield task, pid
+
+
+def iter_tasks(
+    project_title: Optional[str] = None, include_archived: bool = False
+) -> Iterator[dict]:
+    for task, pid in iter_flat_tasks(project_title, include_archived):
+        yield {"project_id": pid, **task.to_dict()}
+
+
+# --- Writers ---
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _write_csv(out: IO[str], fields: List[str], chunks: Iterable[List[dict]]) -> int:
+    writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    n = 0
+    for chunk in chunks:
+        writer.writerows(chunk)
+        n += len(chunk)
+    return n
+
+
+def _write_jsonl(out: IO[str], fields: List[str], chunks: Iterable[List[dict]]) -> int:
+    n = 0
+    for chunk in chunks:
+        out.write(
+            "".join(json.dumps({f: r.get(f) for f in fields}) + "\n" for r in chunk)
+        )
+        n += len(chunk)
+    return n
+
+
+def _write_columnar(
+    out: IO[str], fields: List[str], chunks: Iterable[List[dict]]
+) -> int:
+    """
+    Chunked columnar JSON-lines: a header line naming the fields, then one
+    line per chunk holding a list of column arrays (same order as fields).
+    """
+    out.write(
+        json.dumps({"format": COLUMNAR_FORMAT, "version": 1, "fields": fields}) + "\n"
+    )
+    n = 0
+    for chunk in chunks:
+        columns = [[r.get(f) for r in chunk] for f in fields]
+        out.write(json.dumps({"rows": len(chunk), "columns": columns}) + "\n")
+        n += len(chunk)
+    return n
+
+
+WRITERS: Dict[str, Callable[[IO[str], List[str], Iterable[List[dict]]], int]] = {
+    "csv": _write_csv,
+    "jsonl": _write_jsonl,
+    "columnar": _write_columnar,
+}
+
+
+def iter_columnar(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Read a columnar export back as row dicts, one chunk in memory at a time.
+    """
+    with path.open("r", encoding="utf-8") as fh:
+        header = json.loads(fh.readline())
+        if header.get("format") != COLUMNAR_FORMAT:
+            raise ValueError(f"{path} is not a {COLUMNAR_FORMAT} file")
+        fields = header["fields"]
+        for line in fh:
+            chunk = json.loads(line)
+            yield from (dict(zip(fields, values)) for values in zip(*chunk["columns"]))
+
+
+def export(
+    entity: str,
+    fmt: str,
+    out_path: Optional[Path] = None,
+    project_title: Optional[str] = None,
+    include_archived: bool = False,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> int:
+    """
+    Stream `entity` ("users", "projects" or "tasks") to `out_path` (stdout if
+    None) in `fmt`. Returns the number of rows written. An unknown
+    `project_title` raises ValueError before anything is written.
+    """
+    if entity not in FIELDS:
+        raise ValueError(f"entity must be one of {sorted(FIELDS)}")
+    if fmt not in WRITERS:
+        raise ValueError(f"format must be one of {list(FORMATS)}")
+    if project_title and entity != "users" and not _has_project(project_title):
+        raise ValueError(f"No project titled {project_title!r}")
+
+    rows: Iterable[dict]
+    if entity == "users":
+        rows = iter_users()
+    elif entity == "projects":
+        rows = iter_projects(project_title)
+    else:
+        rows = iter_tasks(project_title, include_archived)
+
+    chunks = _chunks(rows, max(1, chunk_rows))
+    if out_path is None:
+        return WRITERS[fmt](sys.stdout, FIELDS[entity], chunks)
+    with out_path.open("w", encoding="utf-8", newline="") as out:
+        return WRITERS[fmt](out, FIELDS[entity], chunks)
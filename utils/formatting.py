@@ -15,6 +15,17 @@ except Exception:  # pragma: no cover
     console = None  # type: ignore
 
 
+def echo(text: str, style: Optional[str] = None) -> None:
+    """
+    Print one line of data through the console (no markup parsing, so
+    brackets in record text survive); plain print without rich.
+    """
+    if HAS_RICH and console is not None:
+        console.print(text, style=style, markup=False, highlight=False)
+    else:
+        print(text)
+
+
 # --- Table printing functions ---
 def _materialize(it: Iterable[Any]) -> list[list[str]]:
     """
@@ -85,91 +96,135 @@ def print_users(users) -> None:
         _plain_table(headers, rows)
 
 
-def print_projects(projects, users_by_id: Optional[dict] = None) -> None:
+PROJECT_HEADERS = ["ID", "Title", "Owner", "Due", "Tasks", "Created At"]
+TASK_HEADERS = ["ID", "Title", "Project", "Completed", "Created At"]
+
+
+def project_row(p, users_by_id: Optional[dict] = None) -> tuple:
     """
-    Pretty-print projects with owner and task count.
+    One print_projects() row for project `p`.
+    """
+    user_id = getattr(p, "user_id", None)
+    owner = "-"
+    if users_by_id and user_id in users_by_id:
+        owner = getattr(users_by_id[user_id], "name", "-")
+    return (
+        getattr(p, "id", "-"),
+        getattr(p, "title", "-"),
+        owner,
+        getattr(p, "due_date", None) or "-",
+        len(getattr(p, "tasks", []) or []),
+        getattr(p, "created_at", "-"),
+    )
+
+
+def task_row(item, projects_by_id: Optional[dict] = None) -> tuple:
+    """
+    One print_tasks() row for a (Task, project_id) tuple, a dict, or a Task.
     """
-    headers = ["ID", "Title", "Owner", "Tasks", "Created At"]
 
-    def owner_name(user_id: Optional[str]) -> str:
-        if users_by_id and user_id in users_by_id:
-            return getattr(users_by_id[user_id], "name", "-")
+    def project_title(pid: Optional[str]) -> str:
+        if pid and projects_by_id and pid in projects_by_id:
+            return getattr(projects_by_id[pid], "title", "-")
         return "-"
 
-    rows = (
-        (
-            getattr(p, "id", "-"),
-            getattr(p, "title", "-"),
-            owner_name(getattr(p, "user_id", None)),
-            len(getattr(p, "tasks", []) or []),
-            getattr(p, "created_at", "-"),
-        )
-        for p in projects
-    )
+    # (Task, project_id) tuple
+    if isinstance(item, tuple) and len(item) == 2:
+        task, pid = item
+        tid = getattr(task, "id", "-")
+        ttitle = getattr(task, "title", "-")
+        tcreated = getattr(task, "created_at", "-")
+        tcompleted = bool(getattr(task, "completed", False))
+        return (tid, ttitle, project_title(pid), tcompleted, tcreated)
+
+    # Dict-like
+    if isinstance(item, dict):
+        tid = item.get("id", "-")
+        ttitle = item.get("title", "-")
+        tcreated = item.get("created_at", "-")
+        tcompleted = bool(item.get("completed", False))
+        # Try to derive project title if a project_id was included
+        pid = item.get("project_id")
+        return (tid, ttitle, project_title(pid), tcompleted, tcreated)
+
+    # Assume Task object
+    tid = getattr(item, "id", "-")
+    ttitle = getattr(item, "title", "-")
+    tcreated = getattr(item, "created_at", "-")
+    tcompleted = bool(getattr(item, "completed", False))
+    return (tid, ttitle, "-", tcompleted, tcreated)
+
+
+def render_table(title: str, headers: list[str], rows: Iterable[Iterable[Any]]):
+    """
+    Build a rich Table (only call when HAS_RICH).
+    """
+    table = Table(title=title)
+    for h in headers:
+        table.add_column(h)
+    for row in rows:
+        table.add_row(*[str(x) for x in row])
+    return table
 
+
+def print_table(title: str, headers: list[str], rows: Iterable[Iterable[Any]]) -> None:
+    """
+    Pretty-print arbitrary rows under `headers` (rich table, else plain).
+    """
     if HAS_RICH and console is not None:
-        table = Table(title="Projects")
-        for h in headers:
-            table.add_column(h)
-        for row in rows:
-            table.add_row(*[str(x) for x in row])
-        console.print(table)
+        console.print(render_table(title, headers, rows))
     else:
         _plain_table(headers, rows)
 
 
+def print_projects(projects, users_by_id: Optional[dict] = None) -> None:
+    """
+    Pretty-print projects with owner and task count.
+    """
+    rows = (project_row(p, users_by_id) for p in projects)
+
+    if HAS_RICH and console is not None:
+        console.print(render_table("Projects", PROJECT_HEADERS, rows))
+    else:
+        _plain_table(PROJECT_HEADERS, rows)
+
+
 def print_tasks(tasks, projects_by_id: Optional[dict] = None) -> None:
     """
     Pretty-print tasks.
     If projects_by_id is provided, will show project titles.
     """
-    headers = ["ID", "Title", "Project", "Completed", "Created At"]
-
-    def project_title(pid: Optional[str]) -> str:
-        if pid and projects_by_id and pid in projects_by_id:
-            return getattr(projects_by_id[pid], "title", "-")
-        return "-"
-
-    norm_rows = []
-
-    for item in tasks:
-        # (Task, project_id) tuple
-        if isinstance(item, tuple) and len(item) == 2:
-            task, pid = item
-            tid = getattr(task, "id", "-")
-            ttitle = getattr(task, "title", "-")
-            tcreated = getattr(task, "created_at", "-")
-            tcompleted = bool(getattr(task, "completed", False))
-            norm_rows.append((tid, ttitle, project_title(pid), tcompleted, tcreated))
-            continue
-
-        # Dict-like
-        if isinstance(item, dict):
-            tid = item.get("id", "-")
-            ttitle = item.get("title", "-")
-            tcreated = item.get("created_at", "-")
-            tcompleted = bool(item.get("completed", False))
-            # Try to derive project title if a project_id was included
-            pid = item.get("project_id")
-            norm_rows.append((tid, ttitle, project_title(pid), tcompleted, tcreated))
-            continue
-
-        # Assume Task object
-        tid = getattr(item, "id", "-")
-        ttitle = getattr(item, "title", "-")
-        tcreated = getattr(item, "created_at", "-")
-        tcompleted = bool(getattr(item, "completed", False))
-        norm_rows.append((tid, ttitle, "-", tcompleted, tcreated))
+    norm_rows = [task_row(item, projects_by_id) for item in tasks]
 
     if HAS_RICH and console is not None:
-        table = Table(title="Tasks")
-        for h in headers:
-            table.add_column(h)
-        for row in norm_rows:
-            table.add_row(*[str(x) for x in row])
-        console.print(table)
+        console.print(render_table("Tasks", TASK_HEADERS, norm_rows))
     else:
-        _plain_table(headers, norm_rows)
+        _plain_table(TASK_HEADERS, norm_rows)
+
+
+STREAM_WIDTHS = [36, 32, 20, 9, 32]
+
+
+def stream_tasks(tasks, project_titles: Optional[dict] = None) -> int:
+    """
+    Print (Task, project_id) rows as they arrive, in fixed-width plain
+    columns, without holding them in memory (a table needs every row for
+    its widths). Long cells overflow their column. Returns the row count.
+    """
+    titles = project_titles or {}
+
+    def line(cells) -> str:
+        return " | ".join(c.ljust(w) for c, w in zip(cells, STREAM_WIDTHS)).rstrip()
+
+    print(line(TASK_HEADERS))
+    print("-+-".join("-" * w for w in STREAM_WIDTHS))
+    count = 0
+    for task, pid in tasks:
+        row = list(task_row((task, None)))
+        row[2] = titles.get(pid, "-")
+        print(line([str(c) for c in row]))
+        count += 1
+    return count
 
 
 def print_all_tasks_from_projects(projects) -> None:
@@ -0,0 +1,375 @@
+# utils/fsck.py
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models.project import Project
+from models.task import Task
+from models.user import User
+from utils import storage
+
+# Integrity checker for users.json / projects.json.
+#
+# The loaders are all-or-nothing (a JSONDecodeError reads as "no data", a
+# bad record aborts from_dict), so fsck works on raw bytes instead: the file
+# is split into one byte string per record (by the JSON grammar, or by the
+# indented layout storage writes when the JSON itself is broken), chunks of
+# records are validated in worker processes, and cross-record rules (unique
+# ids, user references) are checked once the chunks are back. Salvage keeps
+# every record that validates, dropping bad tasks rather than whole projects
+# and clearing assignments to missing users, and writes <name>.repaired.json
+# beside the original, which is never modified.
+
+CHUNK_RECORDS = 2000
+REPAIRED_SUFFIX = ".repaired.json"
+
+
+class Problem(Exception):
+    """A record-level integrity problem (also used to report one)."""
+
+
+# --- Splitting ---
+
+
+def split_records(payload: bytes) -> Tuple[List[bytes], bool]:
+    """
+    (raw record bytes, intact) for a data file. The split is a byte scan of
+    the indented layout storage writes (records are parsed later, in the
+    workers); files in another layout fall back to the JSON grammar.
+    `intact` is False when the array itself is broken and records were
+    recovered from the layout as far as possible.
+    """
+    pieces = list(_split_layout(payload))
+    if storage._encode_fragments(pieces)[0] == payload:
+        return pieces, True
+    try:
+        text = payload.decode("utf-8")
+        return [
+            text[start:end].encode("utf-8")
+            for _value, start, end in storage._iter_array_spans(text)
+        ], True
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return pieces, False
+
+
+def _split_layout(payload: bytes) -> Iterator[bytes]:
+    # storage writes each record as "  {" ... "  }" lines inside the array;
+    # nested lines are indented further, so ",\n  {" only separates records
+    if payload.startswith(b"[\n  {") and payload.endswith(b"\n  }\n]"):
+        parts = payload[4:-2].split(b",\n  {")
+        if all(part.endswith(b"\n  }") for part in parts):
+            yield parts[0]
+            for part in parts[1:]:
+                yield b"{" + part
+            return
+    current: Optional[List[bytes]] = None
+    for line in payload.split(b"\n"):
+        bare = line.rstrip(b"\r")
+        if bare == b"  {":
+            if current:
+                yield b"\n".join(current)  # unterminated: reported as broken
+            current = [b"{"]
+        elif current is not None:
+            if bare in (b"  }", b"  },"):
+                current.append(b"  }")
+                yield b"\n".join(current)
+                current = None
+            else:
+                current.append(bare)
+    if current:
+        yield b"\n".join(current)
+
+
+# --- Per-record checks (run in worker processes) ---
+
+
+def _iso(value, field: str) -> None:
+    if value is None:
+        return
+    try:
+        datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise Problem(f"invalid {field} {value!r}") from None
+
+
+def _decode(piece: bytes) -> dict:
+    try:
+        data = json.loads(piece.decode("utf-8"))
+    except UnicodeDecodeError:
+        raise Problem("not valid UTF-8") from None
+    except json.JSONDecodeError as e:
+        raise Problem(f"malformed JSON ({e.msg})") from None
+    if not isinstance(data, dict):
+        raise Problem("not a JSON object")
+    if not isinstance(data.get("id"), str) or not data["id"]:
+        raise Problem("missing id")
+    return data
+
+
+def _check_model(from_dict, data: dict) -> None:
+    try:
+        from_dict(data)
+    except KeyError as e:
+        raise Problem(f"missing field {e}") from None
+    except (ValueError, TypeError, AttributeError) as e:
+        raise Problem(str(e).rstrip(".")) from None
+
+
+def _check_user(piece: bytes) -> tuple:
+    data = _decode(piece)
+    _check_model(User.from_dict, data)
+    _iso(data.get("created_at"), "created_at")
+    return (data["id"],)
+
+
+def _check_project(piece: bytes) -> tuple:
+    """
+    (id, user_id, [(task_id, assigned_to)], problems, fixed piece or None).
+    Bad tasks are dropped (and reported) instead of failing the project.
+    """
+    data = _decode(piece)
+    tasks = data.get("tasks", [])
+    if not isinstance(tasks, list):
+        raise Problem("tasks is not a list")
+    _check_model(Project.from_dict, {**data, "tasks": []})
+    _iso(data.get("created_at"), "created_at")
+
+    kept, refs, problems, seen = [], [], [], set()
+    for i, td in enumerate(tasks):
+        try:
+            if not isinstance(td, dict):
+                raise Problem("not a JSON object")
+            _check_model(Task.from_dict, td)
+            _iso(td.get("created_at"), "created_at")
+            if td["id"] in seen:
+                raise Problem("duplicate task id")
+        except Problem as e:
+            tid = td.get("id") if isinstance(td, dict) else None
+            problems.append(f"task {i} ({tid or '?'}): {e}; dropped")
+            continue
+        seen.add(td["id"])
+        kept.append(td)
+        refs.append((td["id"], td.get("assigned_to")))
+    fixed = None
+    if len(kept) != len(tasks):
+        fixed = storage._fragment({**data, "tasks": kept}).encode("utf-8")
+    return data["id"], data["user_id"], refs, problems, fixed
+
+
+_CHECKS = {"users": _check_user, "projects": _check_project}
+
+
+def check_chunk(kind: str, pieces: List[bytes]) -> List[tuple]:
+    """
+    Validate a chunk of raw records. One (ok, result-or-message) per record.
+    """
+    check = _CHECKS[kind]
+    out = []
+    for piece in pieces:
+        try:
+            out.append((True, check(piece)))
+        except Problem as e:
+            out.append((False, str(e)))
+    return out
+
+
+# --- Whole-file checks ---
+
+
+def _check_file(
+    kind: str, pieces: List[bytes], pool: Optional[ProcessPoolExecutor]
+) -> List[tuple]:
+    chunks = [
+        pieces[i : i + CHUNK_RECORDS] for i in range(0, len(pieces), CHUNK_RECORDS)
+    ]
+    if pool is None:
+        results = [check_chunk(kind, c) for c in chunks]
+    else:
+        results = list(pool.map(check_chunk, [kind] * len(chunks), chunks))
+    return [r for chunk in results for r in chunk]
+
+
+def _report(path: Path, size: int, intact: bool) -> dict:
+    return {
+        "file": path.name,
+        "bytes": size,
+        "intact": intact,
+        "records": 0,
+        "kept": 0,
+        "problems": [],
+    }
+
+
+def _problem(report: dict, index: int, rid, msg: str) -> None:
+    report["problems"].append(f"{report['file']} record {index} ({rid or '?'}): {msg}")
+
+
+def _users_pass(
+    path: Path, payload: bytes, pieces: List[bytes], intact: bool, checked: List[tuple]
+) -> Tuple[dict, List[bytes], set]:
+    """
+    Check user records; returns (report, kept pieces, valid user ids).
+    """
+    report = _report(path, len(payload), intact)
+    if not intact:
+        report["problems"].append(
+            f"{path.name}: the JSON array is broken; records recovered from layout"
+        )
+    user_ids: set = set()
+    kept_users: List[bytes] = []
+    for i, (piece, (ok, result)) in enumerate(zip(pieces, checked)):
+        if not ok:
+            _problem(report, i, None, f"{result}; dropped")
+            continue
+        (uid,) = result
+        if uid in user_ids:
+            _problem(report, i, uid, "duplicate user id; dropped")
+            continue
+        user_ids.add(uid)
+        kept_users.append(piece)
+    report["records"], report["kept"] = len(pieces), len(kept_users)
+    return report, kept_users, user_ids
+
+
+def _projects_pass(
+    path: Path,
+    payload: bytes,
+    pieces: List[bytes],
+    intact: bool,
+    checked: List[tuple],
+    user_ids: set,
+    reassign_to: Optional[str] = None,
+) -> Tuple[dict, List[bytes]]:
+    """
+    Check project records against the valid user ids; returns
+    (report, kept pieces). Projects whose owner is missing are dropped,
+    or handed to user `reassign_to` when given.
+    """
+    report = _report(path, len(payload), intact)
+    if not intact:
+        report["problems"].append(
+            f"{path.name}: the JSON array is broken; records recovered from layout"
+        )
+    project_ids: set = set()
+    task_ids: set = set()
+    kept_projects: List[bytes] = []
+    for i, (piece, (ok, result)) in enumerate(zip(pieces, checked)):
+        if not ok:
+            _problem(report, i, None, f"{result}; dropped")
+            continue
+        pid, owner, refs, problems, fixed = result
+        for msg in problems:
+            _problem(report, i, pid, msg)
+        if pid in project_ids:
+            _problem(report, i, pid, "duplicate project id; dropped")
+            continue
+        project_ids.add(pid)
+        orphan = owner not in user_ids
+        if orphan and reassign_to is None:
+            _problem(report, i, pid, f"owner {owner} does not exist; dropped")
+            continue
+        if orphan:
+            _problem(
+                report,
+                i,
+                pid,
+                f"owner {owner} does not exist; reassigned to {reassign_to}",
+            )
+        drop, unassign = set(), set()
+        for tid, assignee in refs:
+            if tid in task_ids:
+                _problem(
+                    report, i, pid, f"task {tid} duplicates an earlier id; dropped"
+                )
+                drop.add(tid)
+                continue
+            task_ids.add(tid)
+            if assignee and assignee not in user_ids:
+                _problem(
+                    report,
+                    i,
+                    pid,
+                    f"task {tid} assigned to missing user {assignee}; cleared",
+                )
+                unassign.add(tid)
+        if drop or unassign or orphan:
+            data = json.loads((fixed or piece).decode("utf-8"))
+            if orphan:
+                data["user_id"] = reassign_to
+            tasks = []
+            for td in data["tasks"]:
+                if td["id"] in drop:
+                    continue
+                if td["id"] in unassign:
+                    td["assigned_to"] = None
+                tasks.append(td)
+            data["tasks"] = tasks
+            fixed = storage._fragment(data).encode("utf-8")
+        kept_projects.append(fixed or piece)
+    report["records"], report["kept"] = len(pieces), len(kept_projects)
+    return report, kept_projects
+
+
+def fsck(
+    data_dir: Optional[Path] = None,
+    workers: Optional[int] = None,
+    repair: bool = False,
+    reassign_to: Optional[str] = None,
+) -> dict:
+    """
+    Check users.json and projects.json, optionally writing salvaged
+    <name>.repaired.json files. Projects with a missing owner are dropped
+    from the salvage, or reassigned to the user id `reassign_to` (which
+    must be a valid user; ValueError otherwise). Returns {"files": [per-file reports],
+    "seconds", "records", "bytes", "workers"}; a file's report lists its
+    problems and how many records salvage keeps.
+    """
+    data_dir = data_dir or storage.DATA_DIR
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+
+    loaded: Dict[str, Tuple[Path, bytes, List[bytes], bool]] = {}
+    for kind in ("users", "projects"):
+        path = data_dir / f"{kind}.json"
+        payload = path.read_bytes() if path.exists() else b"[]"
+        pieces, intact = split_records(payload)
+        loaded[kind] = (path, payload, pieces, intact)
+
+    total = sum(len(v[2]) for v in loaded.values())
+    pool = (
+        ProcessPoolExecutor(workers) if workers > 1 and total > CHUNK_RECORDS else None
+    )
+    try:
+        checked = {kind: _check_file(kind, v[2], pool) for kind, v in loaded.items()}
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    report, kept, user_ids = _users_pass(*loaded["users"], checked["users"])
+    if reassign_to is not None and reassign_to not in user_ids:
+        raise ValueError(f"No valid user with id {reassign_to} to reassign to.")
+    reports = [(report, kept)]
+    reports.append(
+        _projects_pass(*loaded["projects"], checked["projects"], user_ids, reassign_to)
+    )
+
+    if repair:
+        for report, kept in reports:
+            if report["problems"]:
+                target = data_dir / (Path(report["file"]).stem + REPAIRED_SUFFIX)
+                storage.atomic_write_bytes(target, storage._encode_fragments(kept)[0])
+                report["repaired"] = str(target)
+
+    return {
+        "files": [r for r, _kept in reports],
+        "seconds": time.perf_counter() - started,
+        "records": total,
+        "bytes": sum(len(v[1]) for v in loaded.values()),
+        "workers": workers if pool is not None else 1,
+    }
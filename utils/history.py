@@ -0,0 +1,370 @@
+# utils/history.py
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils import replication
+
+# Point-in-time history for the data files, stored under data/history/.
+#
+# Every storage write appends one entry to log.jsonl holding a *reverse*
+# delta: the previous text of each record the write replaced or removed
+# (null for records it added), plus the old id order only if records were
+# reordered. Undo replays those deltas newest-first. Once CHECKPOINT_EVERY
+# entries have been logged since the last one, the end of the next commit
+# takes a gzip snapshot of both files, tagged with that commit's last seq,
+# which bounds how far back a replay has to start. Writes issued inside one
+# `transaction()` undo together.
+#
+# Append-only side files (archive segments) are tracked by size instead: an
+# "appends" entry records each file's length before the append, and undo
+# truncates it back (gzip/xz appends add whole members, so the cut is clean).
+
+HISTORY_DIR = "history"
+LOG_FILE = "log.jsonl"
+HEAD_FILE = "head.json"
+CHECKPOINT_EVERY = 50
+TRACKED_FILES = ("users", "projects")
+
+
+class HistoryError(Exception):
+    """Raised when history cannot be replayed onto the current data files."""
+
+
+_TXN: Optional[Tuple[int, str]] = None
+
+
+def _dir(data_dir: Path) -> Path:
+    return data_dir / HISTORY_DIR
+
+
+def _digest(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(tz=timezone.utc).isoformat()
+
+
+def _read_head(data_dir: Path) -> dict:
+    try:
+        return json.loads((_dir(data_dir) / HEAD_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"seq": 0, "txn": 0}
+
+
+def _write_head(data_dir: Path, head: dict) -> None:
+    (_dir(data_dir) / HEAD_FILE).write_text(json.dumps(head), encoding="utf-8")
+
+
+@contextmanager
+def transaction(data_dir: Path, label: str) -> Iterator[None]:
+    """
+    Group every write issued inside the block into one undoable step.
+    """
+    global _TXN
+    if _TXN is not None:  # nested: join the outer transaction
+        yield
+        return
+    _TXN = (_read_head(data_dir).get("txn", 0) + 1, label)
+    try:
+        yield
+    finally:
+        _TXN = None
+
+
+# --- Recording ---
+
+
+def capture(
+    path: Path,
+    previous: Optional[Dict[str, list]],
+    ids: List[str],
+    changed_ids: List[str],
+) -> dict:
+    """
+    Build the reverse delta for a write that is about to replace `path`.
+    `previous` is the old id -> byte span table (None if it cannot be
+    trusted, in which case the whole old file is kept). Must run before the
+    file is overwritten.
+    """
+    delta: dict = {"file": path.stem}
+    if previous is None:
+        delta["full"] = path.read_text(encoding="utf-8") if path.exists() else "[]"
+        return delta
+
+    current = set(ids)
+    old_ids = list(previous)
+    wanted = [pid for pid in changed_ids if pid in previous]
+    removed = [(i, pid) for i, pid in enumerate(old_ids) if pid not in current]
+    old_text: Dict[str, str] = {}
+    if wanted or removed:
+        with path.open("rb") as fh:
+            for pid in wanted + [pid for _i, pid in removed]:
+                start, end = previous[pid]
+                fh.seek(start)
+                old_text[pid] = fh.read(end - start).decode("utf-8")
+
+    delta["changed"] = {pid: old_text.get(pid) for pid in changed_ids}
+    delta["removed"] = [[i, pid, old_text[pid]] for i, pid in removed]
+    old_set = set(old_ids)
+    if [pid for pid in old_ids if pid in current] != [
+        pid for pid in ids if pid in old_set
+    ]:
+        delta["order"] = old_ids
+    return delta
+
+
+def append(data_dir: Path, delta: dict, payload: bytes) -> int:
+    """
+    Log `delta` once the new `payload` is on disk. Returns its sequence number.
+    """
+    return _log(data_dir, {**delta, "after": _digest(payload)})
+
+
+def record_appends(data_dir: Path, sizes: Dict[str, int]) -> int:
+    """
+    Log that the files in `sizes` (paths relative to `data_dir`, mapped to
+    their length before the append; 0 = new file) are about to be appended
+    to. Must run before the append. Returns its sequence number.
+    """
+    return _log(data_dir, {"file": "archive", "appends": dict(sizes)})
+
+
+def _log(data_dir: Path, delta: dict) -> int:
+    hdir = _dir(data_dir)
+    hdir.mkdir(parents=True, exist_ok=True)
+    head = _read_head(data_dir)
+    seq = head["seq"] + 1
+    if _TXN is not None:
+        txn, label = _TXN
+    else:
+        txn, label = head.get("txn", 0) + 1, delta["file"]
+    entry = {"seq": seq, "txn": txn, "label": label, "ts": _now(), **delta}
+    with (hdir / LOG_FILE).open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    _write_head(data_dir, {**head, "seq": seq, "txn": txn})
+    return seq
+
+
+def checkpoint(data_dir: Path) -> None:
+    """
+    Snapshot the data files if CHECKPOINT_EVERY entries were logged since the
+    last snapshot. Call once every file of a commit is in place and logged:
+    a snapshot taken between two files' entries would already hold the
+    later file's new text, which replay could then never reverse.
+    """
+    head = _read_head(data_dir)
+    if head["seq"] - head.get("checkpoint", 0) < CHECKPOINT_EVERY:
+        return
+    _write_checkpoint(data_dir, head["seq"])
+    _write_head(data_dir, {**head, "checkpoint": head["seq"]})
+
+
+def _truncate_appends(data_dir: Path, undo: List[dict]) -> None:
+    sizes: Dict[str, int] = {}
+    for e in reversed(undo):  # the oldest recorded size wins
+        sizes.update(e.get("appends", {}))
+    for rel, size in sizes.items():
+        path = data_dir / rel
+        if size == 0:
+            path.unlink(missing_ok=True)
+        elif path.exists():
+            with path.open("r+b") as fh:
+                fh.truncate(size)
+        replication.record_side(data_dir, rel, size)
+
+
+def _file_path(data_dir: Path, name: str) -> Path:
+    return data_dir / f"{name}.json"
+
+
+def _write_checkpoint(data_dir: Path, seq: int) -> None:
+    snapshot = {}
+    for name in TRACKED_FILES:
+        path = _file_path(data_dir, name)
+        snapshot[name] = path.read_text(encoding="utf-8") if path.exists() else "[]"
+    with gzip.open(_dir(data_dir) / f"checkpoint-{seq:08d}.json.gz", "wt") as fh:
+        json.dump(snapshot, fh)
+
+
+# --- Reading / replay ---
+
+
+def entries(data_dir: Path) -> List[dict]:
+    path = _dir(data_dir) / LOG_FILE
+    if not path.exists():
+        return []
+    with path.open("r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def transactions(data_dir: Path) -> List[dict]:
+    """
+    One summary per undoable step, oldest first:
+    {"txn", "label", "ts", "seq" (last entry), "files", "records"}.
+    An entry that kept the whole old file counts every record in it.
+    """
+    out: Dict[int, dict] = {}
+    for e in entries(data_dir):
+        t = out.setdefault(
+            e["txn"],
+            {
+                "txn": e["txn"],
+                "label": e["label"],
+                "ts": e["ts"],
+                "files": [],
+                "records": 0,
+            },
+        )
+        t["seq"] = e["seq"]
+        if e["file"] not in t["files"]:
+            t["files"].append(e["file"])
+        if "full" in e:
+            t["records"] += len(_split(e["full"]))
+        else:
+            t["records"] += len(e.get("changed", {})) + len(e.get("removed", []))
+    return list(out.values())
+
+
+def _split(text: str) -> List[Tuple[str, str]]:
+    from utils.storage import _iter_array_spans
+
+    return [(v.get("id"), text[s:e]) for v, s, e in _iter_array_spans(text)]
+
+
+def _join(records: List[Tuple[str, str]]) -> bytes:
+    from utils.storage import _encode_fragments
+
+    return _encode_fragments([frag.encode("utf-8") for _pid, frag in records])[0]
+
+
+def _reverse(records: List[Tuple[str, str]], entry: dict) -> List[Tuple[str, str]]:
+    """
+    Apply one reverse delta: turn the state after `entry` into the state before.
+    """
+    if "full" in entry:
+        return _split(entry["full"])
+    changed = entry.get("changed", {})
+    current = dict(records)
+    for pid, old in changed.items():
+        if old is None:
+            current.pop(pid, None)  # record was added by this write
+        else:
+            current[pid] = old
+    if "order" in entry:
+        removed = {pid: text for _i, pid, text in entry.get("removed", [])}
+        return [(pid, removed.get(pid) or current[pid]) for pid in entry["order"]]
+
+    out = [(pid, current[pid]) for pid, _frag in records if pid in current]
+    for i, pid, text in sorted(entry.get("removed", [])):
+        out.insert(i, (pid, text))
+    return out
+
+
+def _checkpoints(data_dir: Path) -> List[int]:
+    hdir = _dir(data_dir)
+    if not hdir.exists():
+        return []
+    return sorted(int(p.name[11:19]) for p in hdir.glob("checkpoint-*.json.gz"))
+
+
+def rewind(data_dir: Path, keep_txn: int) -> List[dict]:
+    """
+    Restore the data files to their state right after transaction `keep_txn`
+    (0 = before any recorded write) and drop the newer history. Returns the
+    transactions that were undone, newest first.
+    """
+    replication.ensure_writable(data_dir)
+    log = entries(data_dir)
+    keep = [e for e in log if e["txn"] <= keep_txn]
+    undo = [e for e in log if e["txn"] > keep_txn]
+    if not undo:
+        return []
+    keep_seq = keep[-1]["seq"] if keep else 0
+
+    # Start from the earliest checkpoint at/after the target, else from disk
+    start_seq = None
+    for c in _checkpoints(data_dir):
+        if c >= keep_seq:
+            start_seq = c
+            break
+
+    state: Dict[str, List[Tuple[str, str]]] = {}
+    if start_seq is not None:
+        path = _dir(data_dir) / f"checkpoint-{start_seq:08d}.json.gz"
+        with gzip.open(path, "rt") as fh:
+            snapshot = json.load(fh)
+        for name in TRACKED_FILES:
+            state[name] = _split(snapshot.get(name, "[]"))
+    else:
+        start_seq = log[-1]["seq"]
+        latest = {e["file"]: e for e in log if "after" in e}
+        for name in TRACKED_FILES:
+            path = _file_path(data_dir, name)
+            payload = path.read_bytes() if path.exists() else b"[]"
+            if name in latest and latest[name]["after"] != _digest(payload):
+                raise HistoryError(
+                    f"{path.name} was modified outside the tracker; cannot undo."
+                )
+            state[name] = _split(payload.decode("utf-8"))
+
+    for e in reversed(undo):
+        if e["seq"] <= start_seq and e["file"] in state:
+            state[e["file"]] = _reverse(state[e["file"]], e)
+
+    from utils.storage import atomic_write_bytes
+
+    for name in TRACKED_FILES:
+        atomic_write_bytes(_file_path(data_dir, name), _join(state[name]))
+    _truncate_appends(data_dir, undo)
+
+    hdir = _dir(data_dir)
+    with (hdir / LOG_FILE).open("w", encoding="utf-8") as fh:
+        for e in keep:
+            fh.write(json.dumps(e, separators=(",", ":")) + "\n")
+    kept = 0
+    for c in _checkpoints(data_dir):
+        if c > keep_seq:
+            (hdir / f"checkpoint-{c:08d}.json.gz").unlink()
+        else:
+            kept = c
+    _write_head(data_dir, {"seq": keep_seq, "txn": keep_txn, "checkpoint": kept})
+    replication.rebase(data_dir)
+
+    undone: Dict[int, dict] = {}
+    for e in reversed(undo):
+        undone.setdefault(
+            e["txn"], {"txn": e["txn"], "label": e["label"], "ts": e["ts"]}
+        )
+    return list(undone.values())
+
+
+def reset(data_dir: Path) -> None:
+    """
+    Forget all recorded history (e.g. after a migration rewrote the files,
+    which the reverse deltas can no longer be replayed onto).
+    """
+    hdir = _dir(data_dir)
+    if not hdir.exists():
+        return
+    for path in hdir.iterdir():
+        if path.name in (LOG_FILE, HEAD_FILE) or path.name.startswith("checkpoint-"):
+            path.unlink()
+
+
+def undo(data_dir: Path, steps: int = 1) -> List[dict]:
+    """
+    Undo the last `steps` transactions.
+    """
+    txns = transactions(data_dir)
+    if steps < 1 or not txns:
+        return []
+    keep = txns[-steps - 1]["txn"] if steps < len(txns) else 0
+    return rewind(data_dir, keep)
@@ -0,0 +1,1087 @@
+# utils/indexes.py
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from bisect import bisect_left, bisect_right, insort
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from models.ids import sort_key
+
+# Persistent secondary indexes over projects.json, stored under data/indexes/.
+# Each index remembers the fingerprint of the projects.json it describes;
+# storage.save_projects() updates it incrementally from the save's ChangeSet,
+# and a mismatched fingerprint (file edited elsewhere) forces a rebuild.
+#
+# The large indexes (LoggedIndex) are never loaded by a save. <name>.json is
+# a snapshot; each save appends one line to <name>.log holding the changed
+# projects' new contributions and the removed ids, chained by fingerprint:
+#     {"from": fp before, "to": fp after, "set": {pid: ...}, "del": [pid]}
+# A load replays the chain onto the snapshot. Once the log outgrows the
+# snapshot, the next save loads the index and writes a fresh snapshot.
+# Task -> project lookups go through TaskLocator's small hashed shards.
+
+INDEX_DIR = "indexes"
+# Plain-text name lists (sorted "name<TAB>id" lines) read by the shell
+# completion script, which must not start Python to answer.
+NAMES_DIR = "names"
+
+
+def index_path(data_dir: Path, name: str) -> Path:
+    return data_dir / INDEX_DIR / f"{name}.json"
+
+
+def log_path(data_dir: Path, name: str) -> Path:
+    return data_dir / INDEX_DIR / f"{name}.log"
+
+
+def names_path(data_dir: Path, kind: str) -> Path:
+    return data_dir / INDEX_DIR / NAMES_DIR / f"{kind}.txt"
+
+
+def fingerprint(path: Path) -> Optional[list]:
+    """
+    Cheap identity of a file's current contents: [inode, size, mtime_ns].
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+
+def _default_mode() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+_NEW_FILE_MODE = _default_mode()
+
+
+def mkstemp_beside(path: Path) -> Tuple[int, str]:
+    """
+    (fd, name) of a new temp file next to `path` for an atomic replace,
+    carrying `path`'s permissions (or the umask default for a new file)
+    instead of mkstemp's 0600.
+    """
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = _NEW_FILE_MODE
+    os.fchmod(fd, mode)
+    return fd, tmp
+
+
+def write_json(path: Path, data) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+
+
+def write_names(data_dir: Path, kind: str, pairs: Iterable[Tuple[str, str]]) -> None:
+    """
+    Replace the `kind` name list with sorted "name<TAB>id" lines. The file is
+    swapped in atomically since completion may be reading it.
+    """
+    _write_lines(names_path(data_dir, kind), sorted(_name_lines(pairs)))
+
+
+def patch_names(
+    data_dir: Path,
+    kind: str,
+    dropped: Iterable[Tuple[str, str]],
+    added: Iterable[Tuple[str, str]],
+) -> None:
+    """
+    Remove and insert a few (name, id) lines of a name list, keeping it
+    sorted, without parsing the rest.
+    """
+    path = names_path(data_dir, kind)
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines(keepends=True)
+    except FileNotFoundError:
+        lines = []
+    gone = set(_name_lines(dropped))
+    if gone:
+        lines = [line for line in lines if line not in gone]
+    for line in sorted(_name_lines(added)):
+        insort(lines, line)
+    _write_lines(path, lines)
+
+
+def _name_lines(pairs: Iterable[Tuple[str, str]]) -> Iterator[str]:
+    for name, rid in pairs:
+        if name:
+            yield f"{name.replace(chr(9), ' ').replace(chr(10), ' ')}\t{rid}\n"
+
+
+def _write_lines(path: Path, lines: List[str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = mkstemp_beside(path)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write("".join(lines))
+    os.replace(tmp, path)
+
+
+def read_names(data_dir: Path, kind: str) -> Optional[List[Tuple[str, str]]]:
+    """
+    (name, id) pairs from a name list, or None if it does not exist.
+    """
+    try:
+        text = names_path(data_dir, kind).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+    return [tuple(line.rsplit("\t", 1)) for line in text.splitlines()]  # type: ignore[misc]
+
+
+def read_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+COMPACT_MIN_BYTES = 1 << 20  # logs below this are never compacted
+
+
+def _tail(path: Path) -> Tuple[Optional[dict], int]:
+    """
+    (last complete line of a log, parsed; byte length of its complete
+    lines). Reads backwards from the end, so only the last line is read.
+    """
+    try:
+        fh = path.open("rb")
+    except FileNotFoundError:
+        return None, 0
+    with fh:
+        size = fh.seek(0, os.SEEK_END)
+        buf, pos, end = b"", size, None
+        while pos > 0:
+            step = min(1 << 16, pos)
+            pos -= step
+            fh.seek(pos)
+            buf = fh.read(step) + buf
+            if end is None:
+                cut = buf.rfind(b"\n")
+                if cut < 0:
+                    continue
+                end = pos + cut + 1  # a torn (unterminated) tail ends here
+                buf = buf[: cut + 1]
+            start = buf.rfind(b"\n", 0, len(buf) - 1)
+            if start >= 0 or pos == 0:
+                try:
+                    return json.loads(buf[start + 1 :]), end
+                except json.JSONDecodeError:
+                    return None, end
+        return None, 0
+
+
+class LoggedIndex:
+    """
+    Persistence shared by the per-project indexes: a snapshot plus an
+    append-only delta log (see the module comment). Subclasses define
+    contribution(project) -> JSON value (what the project adds), _put(pid,
+    contribution) and _drop(pid) to apply one, and _snapshot() / _restore()
+    for the snapshot body.
+    """
+
+    name: str
+    fingerprint: Optional[list]
+
+    def contribution(self, project):
+        raise NotImplementedError
+
+    def _put(self, project_id: str, contribution) -> None:
+        raise NotImplementedError
+
+    def _drop(self, project_id: str) -> None:
+        raise NotImplementedError
+
+    def _snapshot(self) -> dict:
+        raise NotImplementedError
+
+    def _restore(self, raw: dict) -> None:
+        raise NotImplementedError
+
+    def load(self, data_dir: Path):
+        raw = read_json(index_path(data_dir, self.name)) or {}
+        self._restore(raw)
+        self.fingerprint = raw.get("fingerprint")
+        try:
+            fh = log_path(data_dir, self.name).open("r", encoding="utf-8")
+        except FileNotFoundError:
+            return self
+        with fh:
+            for line in fh:
+                if not line.endswith("\n"):
+                    break  # torn by a crash
+                entry = json.loads(line)
+                if "from" not in entry:
+                    continue  # header written with the snapshot
+                if entry["from"] != self.fingerprint:
+                    break  # chain broken: stays stale and gets rebuilt
+                self._apply_entry(entry)
+                self.fingerprint = entry["to"]
+        return self
+
+    def _apply_entry(self, entry: dict) -> None:
+        for pid in entry.get("del", []):
+            self._drop(pid)
+        for pid, contribution in entry.get("set", {}).items():
+            self._put(pid, contribution)
+
+    def save(self, data_dir: Path, fp: Optional[list]) -> None:
+        self.fingerprint = fp
+        log = log_path(data_dir, self.name)
+        log.unlink(missing_ok=True)  # first: a crash leaves a stale snapshot
+        write_json(
+            index_path(data_dir, self.name), {"fingerprint": fp, **self._snapshot()}
+        )
+        _append_line(log, {"to": fp})
+
+    def apply(self, changed: Iterable, removed: Iterable[str]) -> None:
+        for pid in removed:
+            self._drop(pid)
+        for p in changed:
+            self._put(p.id, self.contribution(p))
+
+    def append(
+        self,
+        data_dir: Path,
+        changed: list,
+        removed: list,
+        before: Optional[list],
+        after: Optional[list],
+    ) -> bool:
+        """
+        Log a save's delta without loading the index. False when the index
+        on disk is not at `before` or its log is due for compaction; the
+        caller then loads, applies and saves it instead.
+        """
+        log = log_path(data_dir, self.name)
+        last, end = _tail(log)
+        if last is None or last.get("to") != before:
+            return False
+        if end > COMPACT_MIN_BYTES:
+            try:
+                if end > index_path(data_dir, self.name).stat().st_size:
+                    return False
+            except FileNotFoundError:
+                return False
+        entry = {
+            "from": before,
+            "to": after,
+            "set": {p.id: self.contribution(p) for p in changed},
+            "del": list(removed),
+        }
+        _append_line(log, entry, end)
+        return True
+
+
+def _append_line(path: Path, data: dict, end: Optional[int] = None) -> None:
+    """Append one JSON line, first cutting a torn tail back to `end`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, _NEW_FILE_MODE)
+    try:
+        if end is not None and os.fstat(fd).st_size > end:
+            os.ftruncate(fd, end)
+        os.write(fd, (json.dumps(data, separators=(",", ":")) + "\n").encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+class ReverseIndex(LoggedIndex):
+    """
+    Key -> [values] postings built from each project's contributions.
+    `contributions(project)` returns the (key, value) pairs a project adds;
+    they are also kept per project id so a changed or removed project can be
+    retracted without scanning the others.
+    """
+
+    def __init__(self, name: str, contributions: Callable[[object], list]):
+        self.name = name
+        self.contributions = contributions
+        self.fingerprint: Optional[list] = None
+        self.by_key: dict = {}
+        self.by_project: dict = {}
+
+    def _snapshot(self) -> dict:
+        return {"by_key": self.by_key, "by_project": self.by_project}
+
+    def _restore(self, raw: dict) -> None:
+        self.by_key = raw.get("by_key", {})
+        self.by_project = raw.get("by_project", {})
+
+    def contribution(self, project) -> list:
+        return [[k, v] for k, v in self.contributions(project)]
+
+    def _put(self, project_id: str, pairs: list) -> None:
+        self._retract(project_id)
+        if not pairs:
+            return
+        self.by_project[project_id] = pairs
+        for key, value in pairs:
+            self.by_key.setdefault(key, []).append(value)
+
+    def _drop(self, project_id: str) -> None:
+        self._retract(project_id)
+
+    def _retract(self, project_id: str) -> None:
+        for key, value in self.by_project.pop(project_id, []):
+            postings = self.by_key.get(key)
+            if postings is None:
+                continue
+            try:
+                postings.remove(value)
+            except ValueError:
+                pass
+            if not postings:
+                del self.by_key[key]
+
+    def rebuild(self, projects: Iterable) -> None:
+        self.by_key, self.by_project = {}, {}
+        for p in projects:
+            self._put(p.id, self.contribution(p))
+
+    def lookup(self, key: str) -> List:
+        return list(self.by_key.get(key, []))
+
+
+class SortedIndex(LoggedIndex):
+    """
+    Sorted [key, project_id, ...] entries for range queries via bisect, e.g.
+    ISO due dates or time-ordered ids (both sort correctly as strings, so
+    queries never re-parse). `entries_for(project)` returns the entries a
+    project contributes (possibly none); they are also kept per project id
+    so a changed or removed project can be retracted in O(log n) each.
+    """
+
+    def __init__(self, name: str, entries_for: Callable[[object], list]):
+        self.name = name
+        self.entries_for = entries_for
+        self.fingerprint: Optional[list] = None
+        self.entries: list = []
+        self.by_project: dict = {}
+
+    def _snapshot(self) -> dict:
+        return {"entries": self.entries, "by_project": self.by_project}
+
+    def _restore(self, raw: dict) -> None:
+        self.entries = raw.get("entries", [])
+        self.by_project = raw.get("by_project", {})
+
+    def contribution(self, project) -> list:
+        return [list(e) for e in self.entries_for(project)]
+
+    def _put(self, project_id: str, entries: list) -> None:
+        self._retract(project_id)
+        if not entries:
+            return
+        self.by_project[project_id] = entries
+        for entry in entries:
+            insort(self.entries, entry)
+
+    def _drop(self, project_id: str) -> None:
+        self._retract(project_id)
+
+    def _retract(self, project_id: str) -> None:
+        for entry in self.by_project.pop(project_id, []):
+            i = bisect_left(self.entries, entry)
+            if i < len(self.entries) and self.entries[i] == entry:
+                del self.entries[i]
+
+    def rebuild(self, projects: Iterable) -> None:
+        self.by_project = {}
+        for p in projects:
+            entries = self.contribution(p)
+            if entries:
+                self.by_project[p.id] = entries
+        self.entries = sorted(e for es in self.by_project.values() for e in es)
+
+    def range(self, lo: Optional[str] = None, hi: Optional[str] = None) -> list:
+        """
+        Entries with lo <= key <= hi (open-ended if None), ascending.
+        """
+        start = 0 if lo is None else bisect_left(self.entries, [lo])
+        # "\uffff" sorts after any project id, making hi inclusive
+        end = (
+            len(self.entries)
+            if hi is None
+            else bisect_right(self.entries, [hi, "\uffff"])
+        )
+        return self.entries[start:end]
+
+    def before(self, hi: str) -> list:
+        """
+        Entries with key strictly less than `hi`, ascending.
+        """
+        return self.entries[: bisect_left(self.entries, [hi])]
+
+    def latest(self, n: int, lo: Optional[str] = None) -> list:
+        """
+        The `n` entries with the greatest keys (>= lo if given), newest
+        first. Only those entries are copied.
+        """
+        if n <= 0:
+            return []
+        start = 0 if lo is None else bisect_left(self.entries, [lo])
+        return self.entries[max(start, len(self.entries) - n) :][::-1]
+
+
+class DependencyIndex(LoggedIndex):
+    """
+    Task dependency graph across all projects, kept as adjacency lists in
+    both directions plus each open task's count of unmet dependencies
+    ("in-degree"), so ready/blocked queries never walk the graph and a
+    status change only visits the changed task's dependents.
+
+    A dependency is unmet while its task exists and is not done; edges to
+    missing (deleted or archived) tasks count as met.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.fingerprint: Optional[list] = None
+        self.nodes: Dict[str, list] = {}  # task id -> [project id, done]
+        self.deps: Dict[str, List[str]] = {}  # task id -> prerequisite ids
+        self.dependents: Dict[str, List[str]] = {}  # prerequisite -> task ids
+        self.unmet: Dict[str, int] = {}  # task id -> unmet count (> 0 only)
+        self.by_project: Dict[str, List[str]] = {}
+
+    def _restore(self, raw: dict) -> None:
+        self.nodes = raw.get("nodes", {})
+        self.deps = raw.get("deps", {})
+        self.unmet = raw.get("unmet", {})
+        # Reverse edges and per-project task lists are derived rather than
+        # stored: it keeps the file ~40% smaller and loads faster than parsing
+        # the duplicated ids back in.
+        self.dependents, self.by_project = {}, {}
+        for tid, deps in self.deps.items():
+            for d in deps:
+                self.dependents.setdefault(d, []).append(tid)
+        for tid, (pid, _done) in self.nodes.items():
+            self.by_project.setdefault(pid, []).append(tid)
+
+    def _snapshot(self) -> dict:
+        return {"nodes": self.nodes, "deps": self.deps, "unmet": self.unmet}
+
+    def contribution(self, project) -> list:
+        return [[t.id, t.completed, list(t.depends_on)] for t in project.tasks]
+
+    # --- Maintenance ---
+
+    def _is_open(self, task_id: str) -> bool:
+        node = self.nodes.get(task_id)
+        return node is not None and not node[1]
+
+    def _bump(self, task_id: str, delta: int) -> None:
+        n = self.unmet.get(task_id, 0) + delta
+        if n > 0:
+            self.unmet[task_id] = n
+        else:
+            self.unmet.pop(task_id, None)
+
+    def _set_node(self, task_id: str, project_id: Optional[str], done: bool) -> None:
+        was_open = self._is_open(task_id)
+        if project_id is None:
+            self.nodes.pop(task_id, None)
+        else:
+            self.nodes[task_id] = [project_id, done]
+        now_open = self._is_open(task_id)
+        if was_open != now_open:  # only dependents can be affected
+            for t in self.dependents.get(task_id, []):
+                self._bump(t, 1 if now_open else -1)
+
+    def _set_deps(self, task_id: str, deps: List[str]) -> None:
+        old = self.deps.get(task_id, [])
+        if old == deps:
+            return
+        for d in old:
+            users = self.dependents.get(d, [])
+            if task_id in users:
+                users.remove(task_id)
+                if not users:
+                    del self.dependents[d]
+            if self._is_open(d):
+                self._bump(task_id, -1)
+        for d in deps:
+            self.dependents.setdefault(d, []).append(task_id)
+            if self._is_open(d):
+                self._bump(task_id, 1)
+        if deps:
+            self.deps[task_id] = list(deps)
+        else:
+            self.deps.pop(task_id, None)
+
+    def _remove_task(self, task_id: str) -> None:
+        self._set_deps(task_id, [])
+        self._set_node(task_id, None, True)
+        self.unmet.pop(task_id, None)
+
+    def _put(self, project_id: str, tasks: list) -> None:
+        current = {tid for tid, _done, _deps in tasks}
+        for tid in self.by_project.get(project_id, []):
+            if tid not in current:
+                self._remove_task(tid)
+        for tid, done, deps in tasks:
+            self._set_node(tid, project_id, done)
+            self._set_deps(tid, deps)
+        if tasks:
+            self.by_project[project_id] = [tid for tid, _done, _deps in tasks]
+        else:
+            self.by_project.pop(project_id, None)
+
+    def _drop(self, project_id: str) -> None:
+        for tid in self.by_project.pop(project_id, []):
+            self._remove_task(tid)
+
+    def rebuild(self, projects: Iterable) -> None:
+        self.nodes, self.deps, self.dependents = {}, {}, {}
+        self.unmet, self.by_project = {}, {}
+        projects = list(projects)
+        for p in projects:  # nodes first so every edge sees its target
+            for t in p.tasks:
+                self.nodes[t.id] = [p.id, t.completed]
+            if p.tasks:
+                self.by_project[p.id] = [t.id for t in p.tasks]
+        for p in projects:
+            for t in p.tasks:
+                self._set_deps(t.id, t.depends_on)
+
+    # --- Queries ---
+
+    def ready(self, project_id: Optional[str] = None) -> List[list]:
+        """
+        [project_id, task_id] for open tasks with no unmet dependencies.
+        """
+        return [
+            [pid, tid]
+            for tid, (pid, done) in self.nodes.items()
+            if not done
+            and tid not in self.unmet
+            and (project_id is None or pid == project_id)
+        ]
+
+    def blocked(self, project_id: Optional[str] = None) -> List[list]:
+        """
+        [project_id, task_id, unmet_dependency_ids] for open blocked tasks.
+        """
+        out = []
+        for tid in self.unmet:
+            pid, done = self.nodes.get(tid, [None, True])
+            if done or (project_id is not None and pid != project_id):
+                continue
+            waiting = [d for d in self.deps.get(tid, []) if self._is_open(d)]
+            out.append([pid, tid, waiting])
+        return out
+
+    def unblocked_by(self, task_id: str) -> List[str]:
+        """
+        Dependents of `task_id` that are open with nothing left to wait on.
+        """
+        return [
+            t
+            for t in self.dependents.get(task_id, [])
+            if self._is_open(t) and t not in self.unmet
+        ]
+
+    def would_cycle(
+        self,
+        task_id: str,
+        dep_id: str,
+        overrides: Optional[Dict[str, List[str]]] = None,
+    ) -> Optional[List[str]]:
+        """
+        If adding task_id -> dep_id closes a cycle, return it as
+        [task_id, dep_id, ..., task_id]; else None. Visits only the
+        tasks reachable from dep_id. `overrides` replaces the stored
+        dependency lists of some tasks (e.g. uncommitted changes).
+        """
+        overrides = overrides or {}
+        if task_id == dep_id:
+            return [task_id, task_id]
+        parent: Dict[str, Optional[str]] = {dep_id: None}
+        stack = [dep_id]
+        while stack:
+            cur = stack.pop()
+            deps = overrides[cur] if cur in overrides else self.deps.get(cur, [])
+            for nxt in deps:
+                if nxt in parent:
+                    continue
+                parent[nxt] = cur
+                if nxt == task_id:
+                    path = [nxt]
+                    while parent[path[-1]] is not None:
+                        path.append(parent[path[-1]])  # type: ignore[arg-type]
+                    return [task_id] + path[::-1]
+                stack.append(nxt)
+        return None
+
+    def critical_path(self, project_id: str) -> List[str]:
+        """
+        Longest chain of open tasks (counted in tasks) that must finish, in
+        order, before every open task of `project_id` is done. Includes
+        prerequisites from other projects. Cycles, if any, are ignored.
+        """
+        # Open tasks of the project plus every open task they wait on
+        seen: set = set()
+        stack = [t for t in self.by_project.get(project_id, []) if self._is_open(t)]
+        while stack:
+            cur = stack.pop()
+            if cur in seen:
+                continue
+            seen.add(cur)
+            stack.extend(d for d in self.deps.get(cur, []) if self._is_open(d))
+
+        # Kahn's order over the subgraph; longest path by DP
+        indeg = {t: 0 for t in seen}
+        for t in seen:
+            for d in self.deps.get(t, []):
+                if d in seen:
+                    indeg[t] += 1
+        queue = [t for t, n in indeg.items() if n == 0]
+        length = {t: 1 for t in queue}
+        prev: Dict[str, Optional[str]] = {t: None for t in queue}
+        while queue:
+            cur = queue.pop()
+            for t in self.dependents.get(cur, []):
+                if t not in indeg:
+                    continue
+                if length[cur] + 1 > length.get(t, 0):
+                    length[t], prev[t] = length[cur] + 1, cur
+                indeg[t] -= 1
+                if indeg[t] == 0:
+                    queue.append(t)
+        if not length:
+            return []
+        end = max(length, key=lambda t: length[t])
+        path = [end]
+        while prev.get(path[-1]) is not None:
+            path.append(prev[path[-1]])  # type: ignore[arg-type]
+        return path[::-1]
+
+
+class ShardedMap:
+    """
+    String keys -> JSON values spread over small files (by a hash of the key)
+    under data/indexes/<name>/, so reading or updating a few keys touches a
+    few files instead of one large one. The shard count is a power of two
+    sized to hold about PER_SHARD keys each and is kept, with the key count,
+    in MANIFEST; empty shards have no file. A map without a manifest (never
+    built, or interrupted mid-rebuild) reads as empty and is not ready().
+    """
+
+    MANIFEST = "shards.json"
+    PER_SHARD = 512
+    MAX_SHARDS = 4096
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self._meta: Optional[dict] = None
+
+    @classmethod
+    def shards_for(cls, keys: int) -> int:
+        n = 1
+        while n < cls.MAX_SHARDS and n * cls.PER_SHARD < keys:
+            n *= 2
+        return n
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        raw = key.encode("utf-8", "surrogatepass")
+        return int.from_bytes(hashlib.blake2b(raw, digest_size=4).digest(), "big")
+
+    def _manifest(self) -> Optional[dict]:
+        if self._meta is None:
+            self._meta = read_json(self.directory / self.MANIFEST)
+        return self._meta
+
+    def ready(self) -> bool:
+        return self._manifest() is not None
+
+    def shard_of(self, key: str) -> int:
+        return self._hash(key) % (self._manifest() or {}).get("shards", 1)
+
+    def _path(self, n: int) -> Path:
+        return self.directory / f"{n:03x}.json"
+
+    def _write_manifest(self, shards: int, keys: int) -> None:
+        self._meta = {"shards": shards, "keys": keys}
+        write_json(self.directory / self.MANIFEST, self._meta)
+
+    def get(self, key: str):
+        if not self.ready():
+            return None
+        return (read_json(self._path(self.shard_of(key))) or {}).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> dict:
+        if not self.ready():
+            return {}
+        by_shard: Dict[int, List[str]] = {}
+        for key in keys:
+            by_shard.setdefault(self.shard_of(key), []).append(key)
+        out = {}
+        for n, wanted in by_shard.items():
+            shard = read_json(self._path(n)) or {}
+            out.update((k, shard[k]) for k in wanted if k in shard)
+        return out
+
+    def update(self, items: dict, deleted: Iterable[str] = ()) -> None:
+        """
+        Upsert `items` and drop `deleted`, rewriting only their shards. Once
+        the key count outgrows (or falls far below) the shard count, the map
+        is re-sharded.
+        """
+        fresh = not self.ready()
+        if fresh:
+            self._meta = {"shards": 1, "keys": 0}
+        meta = dict(self._meta or {})
+        by_shard: Dict[int, Tuple[dict, list]] = {}
+        for key, value in items.items():
+            by_shard.setdefault(self.shard_of(key), ({}, []))[0][key] = value
+        for key in deleted:
+            by_shard.setdefault(self.shard_of(key), ({}, []))[1].append(key)
+        keys = meta["keys"]
+        for n, (upserts, drops) in sorted(by_shard.items()):
+            shard = read_json(self._path(n)) or {}
+            before = len(shard)
+            for key in drops:
+                shard.pop(key, None)
+            shard.update(upserts)
+            keys += len(shard) - before
+            if shard:
+                write_json(self._path(n), shard)
+            else:
+                self._path(n).unlink(missing_ok=True)
+        shards = meta["shards"]
+        grown = shards < self.MAX_SHARDS and keys > 2 * shards * self.PER_SHARD
+        if grown or self.shards_for(keys) * 8 <= shards:
+            self.replace(self._load_all(shards))
+        elif fresh or keys != meta["keys"]:
+            self._write_manifest(shards, keys)
+
+    def _load_all(self, shards: int) -> dict:
+        out: dict = {}
+        for n in range(shards):
+            out.update(read_json(self._path(n)) or {})
+        return out
+
+    def replace(self, items: dict) -> None:
+        """
+        Make the map hold exactly `items`, re-sharded for their count. Only
+        shards whose contents differ are rewritten; files of shards that are
+        now empty (or from an earlier shard count) are removed.
+        """
+        shards = self.shards_for(len(items))
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / self.MANIFEST).unlink(missing_ok=True)
+        self._meta = {"shards": shards}
+        grouped: Dict[int, dict] = {}
+        for key, value in items.items():
+            grouped.setdefault(self.shard_of(key), {})[key] = value
+        keep = set()
+        for n, shard in grouped.items():
+            path = self._path(n)
+            keep.add(path.name)
+            if read_json(path) != shard:
+                write_json(path, shard)
+        # Only shard files: a map may share its directory (see NameIndex)
+        for path in self.directory.glob("*.json"):
+            stale = path.name not in keep and path.name != self.MANIFEST
+            if stale and all(c in "0123456789abcdef" for c in path.stem):
+                path.unlink()
+        self._write_manifest(shards, len(items))
+
+
+def _names_of(project) -> list:
+    return [project.title, [t.id for t in project.tasks]]
+
+
+class NameIndex:
+    """
+    Project titles and task ids for shell completion. The index *is* the two
+    name lists (projects.txt: "title<TAB>project id", tasks.txt: "task id<TAB>
+    project id"); the JSON file holds only the fingerprint. Each project's
+    names are also kept in a ShardedMap, so a save compares the projects it
+    changed against their old names and patches just the lines that differ
+    (most saves change none) without loading the lists.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.fingerprint: Optional[list] = None
+        self.titles: Dict[str, str] = {}  # project id -> title
+        self.tasks: Dict[str, List[str]] = {}  # project id -> task ids
+        self.changed = False
+        self._dropped: List[str] = []
+        self._rebuilt = False
+
+    def _shards(self, data_dir: Path) -> ShardedMap:
+        return ShardedMap(data_dir / INDEX_DIR / self.name)
+
+    def load(self, data_dir: Path) -> "NameIndex":
+        raw = read_json(index_path(data_dir, self.name)) or {}
+        projects = read_names(data_dir, "projects")
+        tasks = read_names(data_dir, "tasks")
+        # Lists deleted by hand (or no sharded copy yet) make the index stale
+        current = (
+            None not in (projects, tasks)
+            and raw.get("sharded")
+            and self._shards(data_dir).ready()
+        )
+        self.fingerprint = raw.get("fingerprint") if current else None
+        self.titles = {pid: title for title, pid in projects or ()}
+        self.tasks = {}
+        for tid, pid in tasks or ():
+            self.tasks.setdefault(pid, []).append(tid)
+        self.changed = False
+        self._dropped, self._rebuilt = [], False
+        return self
+
+    def append(
+        self,
+        data_dir: Path,
+        changed: list,
+        removed: list,
+        before: Optional[list],
+        after: Optional[list],
+    ) -> bool:
+        """
+        Patch the name lists from the changed projects' old names, without
+        loading them; False if the index is not at `before`.
+        """
+        path = index_path(data_dir, self.name)
+        raw = read_json(path) or {}
+        shards = self._shards(data_dir)
+        if (
+            raw.get("fingerprint") != before
+            or not raw.get("sharded")
+            or not shards.ready()
+        ):
+            return False
+        old = shards.get_many([p.id for p in changed] + list(removed))
+        new = {p.id: _names_of(p) for p in changed}
+        for kind, pairs_of in (
+            ("projects", lambda pid, names: {(names[0], pid)}),
+            ("tasks", lambda pid, names: {(tid, pid) for tid in names[1]}),
+        ):
+            dropped, added = set(), set()
+            for pid in set(old) | set(new):
+                was = pairs_of(pid, old[pid]) if pid in old else set()
+                now = pairs_of(pid, new[pid]) if pid in new else set()
+                dropped |= was - now
+                added |= now - was
+            if dropped or added:
+                patch_names(data_dir, kind, dropped, added)
+        shards.update(
+            {pid: names for pid, names in new.items() if old.get(pid) != names},
+            [pid for pid in removed if pid in old],
+        )
+        self.fingerprint = after
+        write_json(path, {"fingerprint": after, "sharded": True})
+        return True
+
+    def save(self, data_dir: Path, fp: Optional[list]) -> None:
+        names = {pid: [t, self.tasks.get(pid, [])] for pid, t in self.titles.items()}
+        if self._rebuilt:
+            self._shards(data_dir).replace(names)
+        elif self.changed:
+            self._shards(data_dir).update(names, self._dropped)
+        self._dropped, self._rebuilt = [], False
+        if self.changed:
+            write_names(data_dir, "projects", ((t, p) for p, t in self.titles.items()))
+            write_names(
+                data_dir,
+                "tasks",
+                ((t, p) for p, tids in self.tasks.items() for t in tids),
+            )
+            self.changed = False
+        self.fingerprint = fp
+        write_json(
+            index_path(data_dir, self.name), {"fingerprint": fp, "sharded": True}
+        )
+
+    def rebuild(self, projects: Iterable) -> None:
+        self.titles, self.tasks = {}, {}
+        self.apply(projects, ())
+        self.changed = self._rebuilt = True
+
+    def apply(self, changed: Iterable, removed: Iterable[str]) -> None:
+        for pid in removed:
+            if self.titles.pop(pid, None) is not None:
+                self.changed = True
+            self.tasks.pop(pid, None)
+            self._dropped.append(pid)
+        for p in changed:
+            tids = [t.id for t in p.tasks]
+            if self.titles.get(p.id) != p.title or set(self.tasks.get(p.id, ())) != set(
+                tids
+            ):
+                self.changed = True
+            self.titles[p.id] = p.title
+            if tids:
+                self.tasks[p.id] = tids
+            else:
+                self.tasks.pop(p.id, None)
+
+
+class TaskLocator:
+    """
+    Task id -> project id in a ShardedMap, so finding one task's project
+    reads one small shard instead of a whole index. A save only upserts the
+    shards its tasks hash to; entries of deleted tasks linger until the next
+    rebuild, so callers must check that the project they are pointed at
+    still holds the task.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.fingerprint: Optional[list] = None
+        self.data_dir: Optional[Path] = None
+        self._pending: Dict[str, str] = {}
+        self._rebuilt = False
+
+    def _shards(self, data_dir: Path) -> ShardedMap:
+        return ShardedMap(data_dir / INDEX_DIR / self.name)
+
+    def load(self, data_dir: Path) -> "TaskLocator":
+        raw = read_json(index_path(data_dir, self.name)) or {}
+        # No shard manifest: never built here, or a rebuild was cut short
+        ready = self._shards(data_dir).ready()
+        self.fingerprint = raw.get("fingerprint") if ready else None
+        self.data_dir = data_dir
+        self._pending, self._rebuilt = {}, False
+        return self
+
+    def save(self, data_dir: Path, fp: Optional[list]) -> None:
+        if self._rebuilt:
+            self._shards(data_dir).replace(self._pending)
+        elif self._pending:
+            self._shards(data_dir).update(self._pending)
+        self._pending, self._rebuilt = {}, False
+        self.fingerprint = fp  # last: a crash before this forces a rebuild
+        write_json(index_path(data_dir, self.name), {"fingerprint": fp})
+
+    def rebuild(self, projects: Iterable) -> None:
+        self._pending, self._rebuilt = {}, True
+        self.apply(projects, ())
+
+    def apply(self, changed: Iterable, removed: Iterable[str]) -> None:
+        # Removed projects' entries linger (see above)
+        for p in changed:
+            for t in p.tasks:
+                self._pending[t.id] = p.id
+
+    def append(
+        self,
+        data_dir: Path,
+        changed: list,
+        removed: list,
+        before: Optional[list],
+        after: Optional[list],
+    ) -> bool:
+        """Upsert the touched shards; False if the locator is not at `before`."""
+        if self.load(data_dir).fingerprint != before:
+            return False
+        self.apply(changed, removed)
+        self.save(data_dir, after)
+        return True
+
+    def lookup(self, task_id: str) -> Optional[str]:
+        """Project id last recorded for `task_id` (verify before trusting)."""
+        if self.data_dir is None:
+            return None
+        return self._shards(self.data_dir).get(task_id)
+
+
+def _assignee_contributions(project) -> list:
+    return [(t.assigned_to, [project.id, t.id]) for t in project.tasks if t.assigned_to]
+
+
+def _owner_contributions(project) -> list:
+    return [(project.user_id, project.id)] if project.user_id else []
+
+
+def _due_entries(project) -> list:
+    return [[project.due_date, project.id]] if project.due_date else []
+
+
+def _created_entries(project) -> list:
+    # Tasks clustered by creation time: [sort_key, project_id, task_id]
+    out = []
+    for t in project.tasks:
+        key = sort_key(t.id, t.created_at)
+        if key is not None:
+            out.append([key, project.id, t.id])
+    return out
+
+
+ASSIGNEES = ReverseIndex("assignees", _assignee_contributions)
+OWNERS = ReverseIndex("owners", _owner_contributions)
+DUE_DATES = SortedIndex("due_dates", _due_entries)
+TASKS_BY_CREATED = SortedIndex("tasks_by_created", _created_entries)
+DEPENDENCIES = DependencyIndex("dependencies")
+NAMES = NameIndex("names")
+TASK_PROJECTS = TaskLocator("task_projects")
+
+IndexT = TypeVar(
+    "IndexT", ReverseIndex, SortedIndex, DependencyIndex, NameIndex, TaskLocator
+)
+
+# Indexes maintained by storage.save_projects()
+PROJECT_INDEXES: List[
+    Union[ReverseIndex, SortedIndex, DependencyIndex, NameIndex, TaskLocator]
+] = [
+    ASSIGNEES,
+    OWNERS,
+    DUE_DATES,
+    TASKS_BY_CREATED,
+    DEPENDENCIES,
+    NAMES,
+    TASK_PROJECTS,
+]
+
+
+def refresh(
+    data_dir: Path,
+    load_all: Callable[[], list],
+    changed: list,
+    removed: list,
+    exact: bool,
+    before: Optional[list],
+    after: Optional[list],
+) -> None:
+    """
+    Bring every project index in step with a save that turned the file with
+    fingerprint `before` into `after`. When the change set is trustworthy
+    each index logs the delta without being loaded (append()); an index that
+    cannot is loaded and patched, or rebuilt from `load_all()` if it is not
+    at `before` either.
+    """
+    projects = None
+    trusted = exact and before is not None
+    for index in PROJECT_INDEXES:
+        if trusted and index.append(data_dir, changed, removed, before, after):
+            continue
+        index.load(data_dir)
+        if trusted and index.fingerprint == before:
+            index.apply(changed, removed)
+        else:
+            if projects is None:
+                projects = load_all()
+            index.rebuild(projects)
+        index.save(data_dir, after)
@@ -0,0 +1,190 @@
+# utils/migrations.py
+from __future__ import annotations
+
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from models.ids import id_timestamp, new_id
+from models.task import VALID_STATUSES
+from utils import replication, storage
+
+# Schema upgrades for the data files. MIGRATIONS[(file, n)] turns one record
+# at schema n into schema n + 1, counting any value it had to invent in
+# `stats` so silent defaults become visible. Files are rewritten in a single
+# streaming pass (one record in memory at a time) and swapped in atomically.
+
+Migration = Callable[[dict, Counter, str], dict]
+
+
+class MigrationError(Exception):
+    """Raised when a record cannot be upgraded; the file is left unchanged."""
+
+
+def _created_at(record: dict, stats: Counter, field: str, now: str) -> str:
+    if record.get("created_at"):
+        return record["created_at"]
+    stamp = id_timestamp(record.get("id") or "")
+    stats[f"{field}.created_at"] += 1
+    return stamp.isoformat() if stamp else now
+
+
+def _users_v1_to_v2(record: dict, stats: Counter, now: str) -> dict:
+    if not record.get("id"):
+        stats["users.id"] += 1
+    return {
+        "id": record.get("id") or new_id(),
+        "name": record["name"],
+        "email": record.get("email") or None,
+        "created_at": _created_at(record, stats, "users", now),
+    }
+
+
+def _task_v1_to_v2(record: dict, stats: Counter, now: str) -> dict:
+    status = (record.get("status") or "").strip().lower()
+    if status not in VALID_STATUSES:
+        stats["tasks.status"] += 1
+        status = "todo"
+    return {
+        **record,
+        "id": record["id"],
+        "title": record["title"],
+        "status": status,
+        "assigned_to": record.get("assigned_to"),
+        "created_at": _created_at(record, stats, "tasks", now),
+    }
+
+
+def _projects_v1_to_v2(record: dict, stats: Counter, now: str) -> dict:
+    if not record.get("id"):
+        stats["projects.id"] += 1
+    return {
+        **record,
+        "id": record.get("id") or new_id(),
+        "title": record["title"],
+        "user_id": record["user_id"],
+        "description": record.get("description") or "",
+        "due_date": record.get("due_date"),
+        "tasks": [_task_v1_to_v2(t, stats, now) for t in record.get("tasks", [])],
+        "created_at": _created_at(record, stats, "projects", now),
+    }
+
+
+MIGRATIONS: Dict[Tuple[str, int], Migration] = {
+    ("users", 1): _users_v1_to_v2,
+    ("projects", 1): _projects_v1_to_v2,
+}
+
+
+def _path_for(name: str) -> Path:
+    return storage.USERS_PATH if name == "users" else storage.PROJECTS_PATH
+
+
+def plan(target: int = storage.CURRENT_SCHEMA) -> List[Tuple[str, int, int]]:
+    """
+    (file, from_version, to_version) for each file that needs upgrading.
+    """
+    if target > storage.CURRENT_SCHEMA:
+        raise ValueError(f"Latest schema is v{storage.CURRENT_SCHEMA}")
+    versions = storage.schema_versions()
+    return [
+        (name, versions[name], target)
+        for name in ("users", "projects")
+        if versions[name] < target
+    ]
+
+
+def migrate_file(
+    name: str, start: int, target: int, dry_run: bool = False
+) -> Tuple[int, Counter]:
+    """
+    Stream `name` from schema `start` to `target`. Returns
+    (records migrated, stats of invented values). With dry_run the file is
+    read and migrated in memory one record at a time but not replaced.
+    """
+    path = _path_for(name)
+    offsets_name = (
+        storage.OFFSETS_INDEX if name == "projects" else storage.USERS_OFFSETS_INDEX
+    )
+    stats: Counter = Counter()
+    now = datetime.now(tz=timezone.utc).isoformat()
+    steps = [MIGRATIONS[(name, v)] for v in range(start, target)]
+    if not path.exists():
+        if not dry_run:
+            storage.set_schema_version(name, target)
+        return 0, stats
+
+    count = 0
+    ids: List[str] = []
+    spans: List[List[int]] = []
+
+    def upgraded():
+        for i, record in enumerate(storage.iter_json_array(path)):
+            if not isinstance(record, dict):
+                raise MigrationError(f"{path.name} record {i} is not an object")
+            rid = record.get("id") or "no id"
+            try:
+                for step in steps:
+                    record = step(record, stats, now)
+            except (KeyError, TypeError, AttributeError) as e:
+                what = (
+                    f"has no {e} field"
+                    if isinstance(e, KeyError)
+                    else f"is malformed ({e})"
+                )
+                raise MigrationError(
+                    f"{path.name} record {i} ({rid}) {what}; fix it and rerun"
+                ) from None
+            yield record
+
+    if dry_run:
+        for _record in upgraded():
+            count += 1
+        return count, stats
+
+    with storage.atomic_writer(path) as fh:
+        pos = 0
+        for record in upgraded():
+            sep = b"[\n  " if count == 0 else b",\n  "
+            frag = storage._fragment(record).encode("utf-8")
+            fh.write(sep + frag)
+            pos += len(sep)
+            spans.append([pos, pos + len(frag)])
+            pos += len(frag)
+            ids.append(record["id"])
+            count += 1
+        fh.write(b"\n]" if count else b"[]")
+    # Offsets let the fast paths keep working without a full re-save
+    storage._write_offsets(path, offsets_name, ids, spans)
+    storage.set_schema_version(name, target)
+    replication.rebase(storage.DATA_DIR)
+    return count, stats
+
+
+def migrate(
+    target: int = storage.CURRENT_SCHEMA, dry_run: bool = False
+) -> List[Dict[str, object]]:
+    """
+    Upgrade every data file below `target`. Returns one report per file.
+    """
+    if not dry_run:
+        replication.ensure_writable(storage.DATA_DIR)
+    reports: List[Dict[str, object]] = []
+    for name, start, to in plan(target):
+        t0 = time.perf_counter()
+        size = _path_for(name).stat().st_size if _path_for(name).exists() else 0
+        count, stats = migrate_file(name, start, to, dry_run=dry_run)
+        reports.append(
+            {
+                "file": name,
+                "from": start,
+                "to": to,
+                "records": count,
+                "bytes": size,
+                "seconds": time.perf_counter() - t0,
+                "defaults": dict(stats),
+            }
+        )
+    return reports
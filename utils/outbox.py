@@ -0,0 +1,217 @@
+# utils/outbox.py
+from __future__ import annotations
+
+import json
+import os
+import socket
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+# Transactional outbox for change notifications.
+#
+# Session operations (user/project/task created, task completed) record
+# events; storage.commit() writes them as a new segment file under
+# data/outbox/ in the same journaled commit as the data change, so an event
+# exists exactly when its change does. Commands never talk to other systems:
+# `dispatch` later delivers pending segments in batches to a sink and deletes
+# them once acknowledged. Delivery is at-least-once (a crash between send and
+# delete resends the batch); every event carries a unique "id" for dedup.
+#
+# Segments are only ever created by commits and only deleted by dispatch, so
+# the two never contend for the same file. Replicas do not receive them.
+
+OUTBOX_DIR = "outbox"
+DEFAULT_BATCH = 100
+DEFAULT_RETRIES = 5
+
+
+class DispatchError(Exception):
+    """Raised when a batch could not be delivered after every retry."""
+
+
+def _dir(data_dir: Path) -> Path:
+    return data_dir / OUTBOX_DIR
+
+
+def event(kind: str, **data) -> dict:
+    """A new event of type `kind` (e.g. "task.completed") carrying `data`."""
+    return {
+        "id": str(uuid.uuid4()),
+        "type": kind,
+        "ts": datetime.now(tz=timezone.utc).isoformat(),
+        "data": data,
+    }
+
+
+def stage(data_dir: Path, events: List[dict]) -> Tuple[Path, bytes]:
+    """
+    (path, payload) of a new segment holding `events`, for storage to put in
+    place together with the data files. Names sort in commit order.
+    """
+    outbox = _dir(data_dir)
+    outbox.mkdir(parents=True, exist_ok=True)
+    name = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}.json"
+    return outbox / name, json.dumps(events, separators=(",", ":")).encode("utf-8")
+
+
+def segments(data_dir: Path) -> List[Path]:
+    """Pending segment files, oldest first."""
+    outbox = _dir(data_dir)
+    if not outbox.exists():
+        return []
+    return sorted(p for p in outbox.iterdir() if p.suffix == ".json")
+
+
+def pending(data_dir: Path) -> List[dict]:
+    """Every undelivered event, oldest first."""
+    return [e for path in segments(data_dir) for e in _read(path)]
+
+
+def _read(path: Path) -> List[dict]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+# --- Sinks ---
+# A sink is any callable taking a list of events that returns once they are
+# durably accepted and raises (OSError, DispatchError, ...) otherwise.
+
+
+class FileSink:
+    """Append events as JSON lines to a local file (fsynced per batch)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def __call__(self, events: List[dict]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            for e in events:
+                fh.write(json.dumps(e, separators=(",", ":")) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+
+class SocketSink:
+    """
+    Send a batch as JSON lines over a unix socket, then half-close; the peer
+    acknowledges with a line "ok".
+    """
+
+    def __init__(self, path: Path, timeout: float = 10.0):
+        self.path = Path(path)
+        self.timeout = timeout
+
+    def __call__(self, events: List[dict]) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(str(self.path))
+            for e in events:
+                sock.sendall(json.dumps(e, separators=(",", ":")).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            with sock.makefile("rb") as fh:
+                reply = fh.readline().strip()
+        if reply != b"ok":
+            raise DispatchError(f"{self.path} did not acknowledge the batch")
+
+
+class HttpSink:
+    """POST a batch as a JSON array; any 2xx response acknowledges it."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self, events: List[dict]) -> None:
+        req = urllib.request.Request(
+            self.url,
+            data=json.dumps(events).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                resp.read()
+        except urllib.error.HTTPError as e:
+            raise DispatchError(f"{self.url} answered {e.code}") from e
+
+
+def make_sink(spec: str) -> Callable[[List[dict]], None]:
+    """
+    Sink from a CLI spec: "file:PATH", "unix:PATH" or an http(s):// URL.
+    """
+    if spec.startswith(("http://", "https://")):
+        return HttpSink(spec)
+    kind, sep, target = spec.partition(":")
+    if sep and target and kind == "file":
+        return FileSink(Path(target))
+    if sep and target and kind == "unix":
+        return SocketSink(Path(target))
+    raise ValueError(f"Unknown sink '{spec}' (use file:PATH, unix:PATH or a URL)")
+
+
+# --- Dispatch ---
+
+
+def _batches(paths: Iterable[Path], size: int) -> Iterable[Tuple[List[Path], list]]:
+    """Whole segments grouped until a batch reaches `size` events."""
+    group: List[Path] = []
+    events: list = []
+    for path in paths:
+        group.append(path)
+        events.extend(_read(path))
+        if len(events) >= size:
+            yield group, events
+            group, events = [], []
+    if group:
+        yield group, events
+
+
+def _send(
+    sink: Callable[[List[dict]], None],
+    events: List[dict],
+    retries: int,
+    backoff: float,
+    sleep: Callable[[float], None],
+) -> None:
+    for attempt in range(retries + 1):
+        try:
+            sink(events)
+            return
+        except (OSError, DispatchError) as e:
+            if attempt == retries:
+                raise DispatchError(
+                    f"Gave up after {retries + 1} attempt(s): {e}"
+                ) from e
+            sleep(backoff * 2**attempt)
+
+
+def dispatch(
+    data_dir: Path,
+    sink: Callable[[List[dict]], None],
+    batch: int = DEFAULT_BATCH,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = 0.5,
+    limit: Optional[int] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> int:
+    """
+    Deliver pending events oldest first in batches of about `batch`,
+    retrying each with exponential backoff, and delete delivered segments.
+    Stops after `limit` events if given. Returns the number delivered;
+    raises DispatchError (leaving the rest pending) if a batch keeps failing.
+    """
+    delivered = 0
+    for paths, events in _batches(segments(data_dir), max(1, batch)):
+        if events:
+            _send(sink, events, retries, backoff, sleep)
+        for path in paths:
+            path.unlink()
+        delivered += len(events)
+        if limit is not None and delivered >= limit:
+            break
+    return delivered
@@ -0,0 +1,762 @@
+# utils/replication.py
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import IO, Dict, List, Optional, Set, Tuple
+
+from utils import indexes
+
+# Log-shipping replication, stored under data/replication/.
+#
+# Logging is opt-in (`enable()`, which `ship-log` calls). From then on the
+# primary appends one forward delta per data-file write to changes.jsonl: the
+# records it wrote, the ids it removed and where it added new ids (or the
+# whole file, when the write reordered records). Entries are numbered by a
+# log sequence number (lsn). Files committed together are marked with "more"
+# on all but the last entry and are applied together.
+#
+# The log only covers lsns after its "base". A replica further behind (a new
+# one, one that missed a compaction, or any after undo/migrate rewrote the
+# files) is sent a snapshot instead: full copies of the live files, all
+# stamped with the lsn they reflect. The files may already hold the next,
+# not yet logged change; replaying it on top is harmless since every entry
+# is idempotent.
+#
+# A replica (`replicate --from`) fetches entries past its own lsn from the
+# primary's data directory or from a unix socket served by `ship-log`,
+# applies them, and appends them verbatim to its own log; a promoted replica
+# therefore continues the same sequence for the others. Replicas are
+# read-only until promoted. Each fetch acknowledges the lsn the replica has
+# applied (acks/); once the log reaches COMPACT_MIN_BYTES, entries every
+# replica polled within ACK_TTL has acknowledged are dropped.
+#
+# Files under SIDE_DIRS (archive segments and policy, the transitions log)
+# are shipped as byte ranges: {"path", "at", "data"} truncates the file to
+# `at` and writes `data` (base64) there, which covers appends, rewrites and
+# undo's truncations; {"path", "delete": true} removes it. Replaying one is
+# idempotent.
+
+REPLICATION_DIR = "replication"
+LOG_FILE = "changes.jsonl"
+STATE_FILE = "state.json"
+ACKS_DIR = "acks"
+ACK_TTL = timedelta(days=7)  # replicas silent for longer no longer pin the log
+COMPACT_MIN_BYTES = 1 << 20  # logs below this are never compacted
+SNAPSHOT_TRIES = 5
+TRACKED_FILES = ("users", "projects")
+OFFSETS = {"users": "users.offsets", "projects": "projects.offsets"}
+SIDE_DIRS = ("archive", "transitions")
+DEFAULT_BATCH = 1000
+
+
+class ReplicationError(Exception):
+    """Raised when a replica cannot apply the change log it was given."""
+
+
+class ReadOnlyError(Exception):
+    """Raised when writing to a data directory that is a read-only replica."""
+
+
+def _dir(data_dir: Path) -> Path:
+    return data_dir / REPLICATION_DIR
+
+
+def _digest(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(tz=timezone.utc).isoformat()
+
+
+def read_state(data_dir: Path) -> dict:
+    """
+    {"role": "primary" | "replica", "lsn": last logged lsn, "base": lsn the
+    log starts after, ...}; replicas also keep "source", "source_offset" and
+    "applied_ts", primaries whether logging is "enabled".
+    """
+    try:
+        return json.loads((_dir(data_dir) / STATE_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"role": "primary", "lsn": 0}
+
+
+def _write_state(data_dir: Path, state: dict) -> None:
+    _dir(data_dir).mkdir(parents=True, exist_ok=True)
+    (_dir(data_dir) / STATE_FILE).write_text(json.dumps(state), encoding="utf-8")
+
+
+def is_replica(data_dir: Path) -> bool:
+    return read_state(data_dir).get("role") == "replica"
+
+
+def ensure_writable(data_dir: Path) -> None:
+    """
+    Raise ReadOnlyError if `data_dir` is a replica.
+    """
+    state = read_state(data_dir)
+    if state.get("role") == "replica":
+        raise ReadOnlyError(
+            f"{data_dir} is a read-only replica of {state.get('source')}; "
+            "run `promote` to make it writable."
+        )
+
+
+# --- Recording (primary) ---
+
+
+def _schema_version(data_dir: Path, name: str) -> int:
+    from utils.storage import SCHEMA_FILE
+
+    raw = indexes.read_json(data_dir / SCHEMA_FILE) or {}
+    return int(raw.get(name, 1))
+
+
+def _full_entry(data_dir: Path, name: str) -> dict:
+    path = data_dir / f"{name}.json"
+    payload = path.read_bytes() if path.exists() else b"[]"
+    return {
+        "file": name,
+        "full": payload.decode("utf-8"),
+        "schema": _schema_version(data_dir, name),
+        "digest": _digest(payload),
+    }
+
+
+def _forward(
+    name: str, ids: List[str], spans: List[List[int]], payload: bytes, delta: dict
+) -> dict:
+    """
+    Turn a write (and its reverse delta from history.capture) into the
+    forward entry replicas apply.
+    """
+    entry: dict = {"file": name}
+    if "full" in delta or "order" in delta:
+        entry["full"] = payload.decode("utf-8")
+    else:
+        changed = delta.get("changed", {})
+        pos = {pid: i for i, pid in enumerate(ids)} if changed else {}
+        entry["records"] = {
+            pid: payload[spans[pos[pid]][0] : spans[pos[pid]][1]].decode("utf-8")
+            for pid in changed
+        }
+        entry["added"] = [
+            [pos[pid], pid] for pid, old in changed.items() if old is None
+        ]
+        entry["removed"] = [pid for _i, pid, _frag in delta.get("removed", [])]
+    entry["digest"] = _digest(payload)
+    return entry
+
+
+def _write_entries(data_dir: Path, state: dict, entries: List[dict]) -> None:
+    _dir(data_dir).mkdir(parents=True, exist_ok=True)
+    with (_dir(data_dir) / LOG_FILE).open("a", encoding="utf-8") as fh:
+        fh.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries))
+    state["lsn"] = entries[-1]["lsn"]
+    _write_state(data_dir, state)
+    compact(data_dir)
+
+
+def _logging(state: dict) -> bool:
+    return state.get("role") == "replica" or bool(state.get("enabled"))
+
+
+def _rebase(data_dir: Path, state: dict, lsn: int) -> None:
+    """
+    Empty the log and make `lsn` its base (the state at `lsn` is then only
+    available as a snapshot). The state goes first: a reader in between
+    sees the new base and never scans entries that are about to vanish.
+    """
+    _write_state(data_dir, {**state, "lsn": lsn, "base": lsn})
+    (_dir(data_dir) / LOG_FILE).write_bytes(b"")
+
+
+def enable(data_dir: Path) -> int:
+    """
+    Start logging this primary's writes for replicas (no-op if it already
+    does, or is a replica). Returns the log's base lsn: a replica starts
+    from a snapshot of the files as they are at that point.
+    """
+    state = read_state(data_dir)
+    if not _logging(state):
+        state["enabled"] = True
+        _rebase(data_dir, state, state.get("lsn", 0) + 1)
+        state = read_state(data_dir)
+    return state.get("base", 0)
+
+
+def rebase(data_dir: Path) -> None:
+    """
+    Note that the data files were rewritten outside storage's write path
+    (undo, migrations). The log no longer replays onto them, so it is dropped
+    and replicas re-sync from a snapshot; nothing is read here.
+    """
+    state = read_state(data_dir)
+    if state.get("enabled") and state.get("role") != "replica":
+        _rebase(data_dir, state, state.get("lsn", 0) + 1)
+
+
+def _ack_path(data_dir: Path, replica: str) -> Path:
+    return _dir(data_dir) / ACKS_DIR / f"{_digest(replica.encode('utf-8'))}.json"
+
+
+def acked_lsn(data_dir: Path) -> Optional[int]:
+    """
+    Lowest lsn acknowledged by a replica that polled within ACK_TTL, or None.
+    """
+    acks = _dir(data_dir) / ACKS_DIR
+    if not acks.is_dir():
+        return None
+    cutoff = datetime.now(tz=timezone.utc) - ACK_TTL
+    lsns = []
+    for path in acks.glob("*.json"):
+        ack = indexes.read_json(path)
+        if ack and datetime.fromisoformat(ack["ts"]) >= cutoff:
+            lsns.append(int(ack["lsn"]))
+    return min(lsns) if lsns else None
+
+
+def compact(data_dir: Path, force: bool = False) -> int:
+    """
+    Drop the log entries every live replica has acknowledged (all of them if
+    no replica polled within ACK_TTL) and move the base past them. Unless
+    `force`, logs under COMPACT_MIN_BYTES are left alone. Returns the number
+    of entries dropped.
+    """
+    path = _dir(data_dir) / LOG_FILE
+    try:
+        if not force and path.stat().st_size < COMPACT_MIN_BYTES:
+            return 0
+    except FileNotFoundError:
+        return 0
+    state = read_state(data_dir)
+    head, acked = state.get("lsn", 0), acked_lsn(data_dir)
+    upto = head if acked is None else min(acked, head)
+    if upto <= state.get("base", 0):
+        return 0
+    _write_state(data_dir, {**state, "base": upto})  # first, as in _rebase
+    dropped = 0
+    fd, tmp = indexes.mkstemp_beside(path)
+    with os.fdopen(fd, "wb") as out, path.open("rb") as fh:
+        for line in fh:
+            if line.endswith(b"\n") and json.loads(line)["lsn"] <= upto:
+                dropped += 1
+            else:
+                out.write(line)
+    os.replace(tmp, path)
+    return dropped
+
+
+def _side_files(data_dir: Path) -> List[str]:
+    return sorted(
+        p.relative_to(data_dir).as_posix()
+        for d in SIDE_DIRS
+        if (data_dir / d).is_dir()
+        for p in (data_dir / d).iterdir()
+        if p.is_file()
+    )
+
+
+def _side_entry(data_dir: Path, rel: str, at: int) -> dict:
+    path = data_dir / rel
+    if not path.exists():
+        return {"path": rel, "delete": True}
+    with path.open("rb") as fh:
+        fh.seek(at)
+        data = fh.read()
+    return {"path": rel, "at": at, "data": base64.b64encode(data).decode("ascii")}
+
+
+def _stamp(data_dir: Path, entries: List[dict]) -> None:
+    """
+    Append `entries` to the primary's log, if it keeps one.
+    """
+    state = read_state(data_dir)
+    if state.get("role") == "replica" or not state.get("enabled"):
+        return
+    lsn, ts = state.get("lsn", 0), _now()
+    stamped = []
+    for i, e in enumerate(entries):
+        lsn += 1
+        stamped.append({"lsn": lsn, "ts": ts, **e})
+        if i < len(entries) - 1:
+            stamped[-1]["more"] = True
+    _write_entries(data_dir, state, stamped)
+
+
+def record(data_dir: Path, writes: List[Tuple[str, list, list, bytes, dict]]) -> None:
+    """
+    Log the forward deltas of one commit: (file, ids, spans, payload,
+    reverse delta) per file written.
+    """
+    _stamp(data_dir, [_forward(*w) for w in writes])
+
+
+def record_side(data_dir: Path, rel: str, at: int) -> None:
+    """
+    Log that side file `rel` (relative to `data_dir`) changed from byte `at`
+    onwards: 0 after a rewrite, the old size after an append, the new size
+    after a truncation. A missing file is logged as deleted.
+    """
+    _stamp(data_dir, [_side_entry(data_dir, rel, at)])
+
+
+def _snapshot(data_dir: Path) -> List[dict]:
+    """
+    Entries recreating every tracked and side file as they are now, all
+    stamped with the lsn logged before and after reading them.
+    """
+    for _ in range(SNAPSHOT_TRIES):
+        lsn = read_state(data_dir).get("lsn", 0)
+        files = [_full_entry(data_dir, name) for name in TRACKED_FILES]
+        files += [_side_entry(data_dir, rel, 0) for rel in _side_files(data_dir)]
+        if read_state(data_dir).get("lsn", 0) == lsn:
+            ts = _now()
+            return [{"lsn": lsn, "ts": ts, "snapshot": True, **e} for e in files]
+    raise ReplicationError(f"{data_dir} changed during every snapshot; try again.")
+
+
+# --- Shipping ---
+
+
+def _seek(fh: IO[bytes], after: int, offset: int) -> int:
+    """
+    Position `fh` at the entry after lsn `after`, trusting `offset` (from a
+    previous read) when it lands there; otherwise rescan from the start.
+    """
+    if offset:
+        fh.seek(offset)
+        line = fh.readline()
+        try:
+            if line.endswith(b"\n") and json.loads(line)["lsn"] == after + 1:
+                fh.seek(offset)
+                return offset
+        except (ValueError, KeyError):
+            pass
+    fh.seek(0)
+    return 0
+
+
+def read_log(
+    data_dir: Path,
+    after: int,
+    offset: int = 0,
+    limit: int = DEFAULT_BATCH,
+    replica: Optional[str] = None,
+) -> Tuple[int, int, List[dict]]:
+    """
+    Return (head lsn, offset to resume from, entries with lsn > after), or a
+    snapshot if `after` precedes the log's base. At most `limit` entries are
+    returned, rounded up to a whole commit. `replica` names the caller, which
+    acknowledges having applied everything up to `after`.
+    """
+    state = read_state(data_dir)
+    if replica:
+        indexes.write_json(
+            _ack_path(data_dir, replica),
+            {"replica": replica, "lsn": after, "ts": _now()},
+        )
+    head = state.get("lsn", 0)
+    path = _dir(data_dir) / LOG_FILE
+    if head <= after or not path.exists():
+        return head, offset, []
+    if after < state.get("base", 0):
+        return head, 0, _snapshot(data_dir)
+    entries: List[dict] = []
+    ends: List[int] = []
+    with path.open("rb") as fh:
+        pos = start = _seek(fh, after, offset)
+        for line in iter(fh.readline, b""):
+            if not line.endswith(b"\n"):
+                break  # append in progress
+            pos += len(line)
+            entry = json.loads(line)
+            if entry["lsn"] <= after:
+                start = pos
+                continue
+            entries.append(entry)
+            ends.append(pos)
+            if len(entries) >= limit and not entry.get("more"):
+                break
+    while entries and entries[-1].get("more"):  # commit still being appended
+        entries.pop()
+        ends.pop()
+    return head, ends[-1] if ends else start, entries
+
+
+def serve(data_dir: Path, socket_path: Path, max_requests: Optional[int] = None) -> int:
+    """
+    Serve the change log on a unix socket. Each connection sends one JSON
+    line {"after", "offset", "limit"} and gets back a {"head", "offset"}
+    line followed by the entries. Returns the number of requests served.
+    """
+    enable(data_dir)
+    if socket_path.exists():
+        socket_path.unlink()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(socket_path))
+    server.listen(16)
+    served = 0
+    try:
+        while max_requests is None or served < max_requests:
+            conn, _addr = server.accept()
+            with conn, conn.makefile("rwb") as fh:
+                req = json.loads(fh.readline() or b"{}")
+                head, offset, entries = read_log(
+                    data_dir,
+                    int(req.get("after", 0)),
+                    int(req.get("offset", 0)),
+                    int(req.get("limit", DEFAULT_BATCH)),
+                    req.get("replica"),
+                )
+                fh.write(json.dumps({"head": head, "offset": offset}).encode() + b"\n")
+                for e in entries:
+                    fh.write(json.dumps(e, separators=(",", ":")).encode() + b"\n")
+                fh.flush()
+            served += 1
+    finally:
+        server.close()
+        if socket_path.exists():
+            socket_path.unlink()
+    return served
+
+
+def fetch(
+    source: str,
+    after: int,
+    offset: int = 0,
+    limit: int = DEFAULT_BATCH,
+    replica: Optional[str] = None,
+) -> Tuple[int, int, List[dict]]:
+    """
+    read_log() against a primary given as a data directory or a socket.
+    """
+    path = Path(source)
+    if path.is_socket():
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(path))
+            with sock.makefile("rwb") as fh:
+                req = {
+                    "after": after,
+                    "offset": offset,
+                    "limit": limit,
+                    "replica": replica,
+                }
+                fh.write(json.dumps(req).encode() + b"\n")
+                fh.flush()
+                header = json.loads(fh.readline())
+                entries = [json.loads(line) for line in fh]
+        return header["head"], header["offset"], entries
+    if not _logging(read_state(path)):
+        raise ReplicationError(
+            f"{source} has no change log to follow; run `enable-replication` there."
+        )
+    return read_log(path, after, offset, limit, replica)
+
+
+# --- Applying (replica) ---
+
+
+def _read_records(
+    data_dir: Path, name: str
+) -> Tuple[List[str], Dict[str, bytes], bool]:
+    """
+    (id order, id -> raw bytes, exact) for a replica file; `exact` is False
+    when the offset table was stale and the file had to be parsed.
+    """
+    from utils.storage import _iter_array_spans
+
+    path = data_dir / f"{name}.json"
+    if not path.exists():
+        return [], {}, True
+    raw = path.read_bytes()
+    table = indexes.read_json(indexes.index_path(data_dir, OFFSETS[name]))
+    if table and table.get("fingerprint") == indexes.fingerprint(path):
+        offsets = table.get("offsets", {})
+        return list(offsets), {p: raw[s:e] for p, (s, e) in offsets.items()}, True
+    text = raw.decode("utf-8")
+    frags = {v["id"]: text[s:e].encode("utf-8") for v, s, e in _iter_array_spans(text)}
+    return list(frags), frags, False
+
+
+def _split(text: str) -> Tuple[List[str], Dict[str, bytes]]:
+    from utils.storage import _iter_array_spans
+
+    frags = {v["id"]: text[s:e].encode("utf-8") for v, s, e in _iter_array_spans(text)}
+    return list(frags), frags
+
+
+def apply(data_dir: Path, entries: List[dict]) -> int:
+    """
+    Apply `entries` (ascending lsn; already-applied ones are skipped) to the
+    replica in `data_dir`, then append them to its own log. A snapshot
+    replaces every file instead (side files it lacks are removed) and
+    restarts the replica's log at its lsn. Every file is checked against the
+    primary's digest before anything is replaced. Returns the number of
+    entries applied.
+    """
+    from models.project import Project
+    from utils import storage
+
+    storage.recover(data_dir)
+    state = read_state(data_dir)
+    lsn = state.get("lsn", 0)
+    todo = [e for e in entries if e["lsn"] > lsn]
+    if not todo:
+        return 0
+    snapshot = bool(todo[0].get("snapshot"))
+    for expected, e in enumerate(todo, start=lsn + 1):
+        if not snapshot and e["lsn"] != expected:
+            raise ReplicationError(
+                f"Gap in change log: expected lsn {expected}, got {e['lsn']}."
+            )
+
+    side = [e for e in todo if "path" in e]
+    _check_side(data_dir, side)
+    order: Dict[str, List[str]] = {}
+    frags: Dict[str, Dict[str, bytes]] = {}
+    exact: Dict[str, bool] = {}
+    touched: Dict[str, Set[str]] = {name: set() for name in TRACKED_FILES}
+    removed: Dict[str, Set[str]] = {name: set() for name in TRACKED_FILES}
+    digests: Dict[str, str] = {}
+    schema: Dict[str, int] = {}
+    for e in todo:
+        if "path" in e:
+            continue
+        name = e["file"]
+        if "full" in e:
+            order[name], frags[name] = _split(e["full"])
+            exact[name] = False
+            if "schema" in e:
+                schema[name] = e["schema"]
+        else:
+            if name not in order:
+                order[name], frags[name], exact[name] = _read_records(data_dir, name)
+            ids, recs = order[name], frags[name]
+            gone = set(e.get("removed", []))
+            if gone:
+                ids[:] = [pid for pid in ids if pid not in gone]
+                for pid in gone:
+                    recs.pop(pid, None)
+                removed[name] |= gone
+            for pid, frag in e.get("records", {}).items():
+                recs[pid] = frag.encode("utf-8")
+                touched[name].add(pid)
+            for i, pid in sorted(e.get("added", [])):
+                if pid in ids:
+                    continue  # replayed after a crash: already there
+                if i >= len(ids):
+                    ids.append(pid)
+                else:
+                    ids.insert(i, pid)
+        digests[name] = e["digest"]
+
+    files: List[Tuple[Path, bytes]] = []
+    spans: Dict[str, list] = {}
+    for name in order:
+        payload, spans[name] = storage._encode_fragments(
+            [frags[name][pid] for pid in order[name]]
+        )
+        if _digest(payload) != digests[name]:
+            raise ReplicationError(
+                f"Replica {name}.json diverged from the primary at lsn "
+                f"{todo[-1]['lsn']}; run `replicate --resync`."
+            )
+        files.append((data_dir / f"{name}.json", payload))
+
+    if snapshot:
+        keep = {e["path"] for e in side}
+        for rel in _side_files(data_dir):
+            if rel not in keep:
+                (data_dir / rel).unlink()
+    for e in side:  # the primary writes these before the data files
+        _apply_side(data_dir, e)
+    before = indexes.fingerprint(data_dir / "projects.json")
+    storage._replace_files(files, data_dir)
+    for name in order:
+        path = data_dir / f"{name}.json"
+        indexes.write_json(
+            indexes.index_path(data_dir, OFFSETS[name]),
+            {
+                "fingerprint": indexes.fingerprint(path),
+                "offsets": dict(zip(order[name], spans[name])),
+            },
+        )
+    if schema:
+        versions = indexes.read_json(data_dir / storage.SCHEMA_FILE) or {}
+        versions.update(schema)
+        storage.atomic_write_bytes(
+            data_dir / storage.SCHEMA_FILE,
+            json.dumps(versions, indent=2).encode("utf-8"),
+        )
+    if "projects" in order:
+        recs = frags["projects"]
+
+        def parse(pid: str) -> Project:
+            return Project.from_dict(json.loads(recs[pid]))
+
+        indexes.refresh(
+            data_dir,
+            lambda: [parse(pid) for pid in order["projects"]],
+            [parse(pid) for pid in touched["projects"] if pid in recs],
+            [pid for pid in removed["projects"] if pid not in recs],
+            exact["projects"],
+            before,
+            indexes.fingerprint(data_dir / "projects.json"),
+        )
+
+    state["applied_ts"] = todo[-1]["ts"]
+    if snapshot:
+        _rebase(data_dir, state, todo[0]["lsn"])
+    else:
+        _write_entries(data_dir, state, todo)
+    return len(todo)
+
+
+def _side_path(data_dir: Path, rel: str) -> Path:
+    parts = Path(rel).parts
+    if len(parts) < 2 or parts[0] not in SIDE_DIRS or ".." in parts:
+        raise ReplicationError(f"Refusing to write {rel!r} outside {SIDE_DIRS}.")
+    return data_dir / rel
+
+
+def _check_side(data_dir: Path, entries: List[dict]) -> None:
+    """
+    Fail before anything is written if a side file is shorter than an
+    entry expects (the replica's copy diverged).
+    """
+    sizes: Dict[str, int] = {}
+    for e in entries:
+        rel = e["path"]
+        if rel not in sizes:
+            path = _side_path(data_dir, rel)
+            sizes[rel] = path.stat().st_size if path.exists() else 0
+        if e.get("delete"):
+            sizes[rel] = 0
+            continue
+        if sizes[rel] < e["at"]:
+            raise ReplicationError(
+                f"Replica {rel} diverged from the primary at lsn {e['lsn']}; "
+                "run `replicate --resync`."
+            )
+        sizes[rel] = e["at"] + len(base64.b64decode(e["data"]))
+
+
+def _apply_side(data_dir: Path, entry: dict) -> None:
+    path = _side_path(data_dir, entry["path"])
+    if entry.get("delete"):
+        path.unlink(missing_ok=True)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("r+b" if path.exists() else "wb") as fh:
+        fh.truncate(entry["at"])
+        fh.seek(entry["at"])
+        fh.write(base64.b64decode(entry["data"]))
+
+
+def status(data_dir: Path, head: Optional[int] = None) -> dict:
+    """
+    {"role", "lsn", "head", "behind", "lag_seconds"} for `data_dir`. Lag is
+    the age of the newest applied change while entries are outstanding.
+    """
+    state = read_state(data_dir)
+    lsn = state.get("lsn", 0)
+    head = lsn if head is None else head
+    lag = 0.0
+    if head > lsn and state.get("applied_ts"):
+        applied = datetime.fromisoformat(state["applied_ts"])
+        lag = (datetime.now(tz=timezone.utc) - applied).total_seconds()
+    return {
+        "role": state.get("role", "primary"),
+        "source": state.get("source"),
+        "lsn": lsn,
+        "head": head,
+        "behind": max(0, head - lsn),
+        "lag_seconds": lag,
+    }
+
+
+def replicate(data_dir: Path, source: str, batch: int = DEFAULT_BATCH) -> dict:
+    """
+    One poll: make `data_dir` a replica of `source` (a data directory or a
+    `ship-log` socket) if it is not one yet, apply every available entry in
+    batches of `batch`, and return status() plus "applied".
+    """
+    state = read_state(data_dir)
+    source = str(Path(source).resolve())
+    if state.get("role") != "replica":
+        if state.get("lsn", 0) > 0 or _has_data(data_dir):
+            raise ReplicationError(
+                f"{data_dir} has its own data; use --resync to discard "
+                f"it and follow {source}."
+            )
+        state = {"role": "replica", "source": source, "lsn": 0}
+    if state.get("source") != source:  # failover: follow the promoted node
+        state["source"], state["source_offset"] = source, 0
+    me = str(data_dir.resolve())
+    # Reach the source before this node is marked as its replica
+    head, offset, entries = fetch(
+        source, state["lsn"], state.get("source_offset", 0), batch, me
+    )
+    _write_state(data_dir, state)
+
+    applied = 0
+    while True:
+        applied += apply(data_dir, entries)
+        state = read_state(data_dir)
+        state["source_offset"] = offset
+        _write_state(data_dir, state)
+        if not entries or state["lsn"] >= head:
+            break
+        head, offset, entries = fetch(source, state["lsn"], offset, batch, me)
+    return {**status(data_dir, head), "applied": applied}
+
+
+def _has_data(data_dir: Path) -> bool:
+    for name in TRACKED_FILES:
+        path = data_dir / f"{name}.json"
+        if path.exists():
+            with path.open("rb") as fh:
+                if fh.read(64).strip() not in (b"", b"[]"):
+                    return True
+    return bool(_side_files(data_dir))
+
+
+def resync(data_dir: Path) -> None:
+    """
+    Discard this node's data and log so it can replay a primary from lsn 1.
+    """
+    from utils import history, storage
+
+    for name in TRACKED_FILES:
+        storage.atomic_write_bytes(data_dir / f"{name}.json", b"[]")
+    for rel in _side_files(data_dir):
+        (data_dir / rel).unlink()
+    log = _dir(data_dir) / LOG_FILE
+    if log.exists():
+        log.unlink()
+    _write_state(data_dir, {"role": "primary", "lsn": 0})
+    history.reset(data_dir)
+
+
+def promote(data_dir: Path) -> int:
+    """
+    Turn a replica into a writable primary; returns the lsn it continues from.
+    """
+    state = read_state(data_dir)
+    if state.get("role") != "replica":
+        raise ReplicationError(f"{data_dir} is not a replica.")
+    state = {
+        "role": "primary",
+        "lsn": state.get("lsn", 0),
+        "base": state.get("base", 0),
+        "enabled": True,  # keeps logging for the remaining replicas
+    }
+    _write_state(data_dir, state)
+    return state["lsn"]
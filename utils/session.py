@@ -0,0 +1,433 @@
+# utils/session.py
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from models.project import Project
+from models.task import Task
+from models.user import User
+from utils import archive, history, outbox, storage
+from utils.indexes import ASSIGNEES, DEPENDENCIES, OWNERS, TASK_PROJECTS
+
+# Programmatic API over the data files (the CLI handlers are thin wrappers).
+#
+# A Session is a unit of work: records load lazily and at most once, each id
+# maps to a single object for the session's lifetime (identity map), and
+# changes stay in memory until commit(), which writes every touched file in
+# one atomic step. Nothing is printed.
+#
+#     with Session() as s:
+#         for title in titles:
+#             s.add_task("CLI Tool", title)
+#     # one commit here; nothing is written if the block raised
+#
+# Creations and completions also queue outbox events (see utils/outbox.py),
+# committed together with the data. Archived tasks are held back the same
+# way and appended to their segments by commit(), just before the data.
+
+
+class SessionError(Exception):
+    """Raised when a Session operation names a missing record or breaks a rule."""
+
+
+class DeleteSummary(NamedTuple):
+    """Outcome of Session.delete_user()."""
+
+    owned: int  # projects the user owned
+    assigned: int  # tasks that were assigned to the user
+    deleted: int  # projects deleted (no reassignment target)
+
+
+class Session:
+    def __init__(self, label: str = "session"):
+        self.label = label
+        self._users: Optional[List[User]] = None
+        self._clean_user_ids: List[str] = []
+        self._projects: Dict[str, Project] = {}
+        self._tasks: Dict[str, Tuple[Task, Project]] = {}
+        self._all_projects = False
+        self._clean_project_ids: List[str] = []
+        self._removed_projects: set = set()
+        self._events: List[dict] = []
+        self._archived: List[Tuple[str, List[Tuple[str, Task]]]] = []
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        return False
+
+    # --- Loading (lazy, identity-mapped) ---
+
+    @property
+    def users(self) -> List[User]:
+        """All users, loaded on first access."""
+        if self._users is None:
+            self._users = storage.load_users()
+            self._clean_user_ids = [u.id for u in self._users]
+        return self._users
+
+    @property
+    def projects(self) -> List[Project]:
+        """
+        All projects, loaded on first access. Projects already loaded one by
+        one keep their identity (and any uncommitted changes).
+        """
+        if not self._all_projects:
+            merged: Dict[str, Project] = {}
+            for p in storage.load_projects():
+                if p.id not in self._removed_projects:
+                    merged[p.id] = self._projects.get(p.id, p)
+            self._clean_project_ids = list(merged)
+            for pid, p in self._projects.items():
+                merged.setdefault(pid, p)  # created in this session
+            self._projects = merged
+            self._all_projects = True
+            self._index_tasks(merged.values())
+        return list(self._projects.values())
+
+    def _index_tasks(self, projects: Iterable[Project]) -> None:
+        for p in projects:
+            for t in p.tasks:
+                self._tasks[t.id] = (t, p)
+
+    def _load_by_ids(self, ids: Iterable[str]) -> List[Project]:
+        ids = [pid for pid in ids if pid not in self._removed_projects]
+        missing = [pid for pid in ids if pid not in self._projects]
+        if missing and not self._all_projects:
+            loaded = storage.load_projects_by_ids(missing)
+            for p in loaded:
+                self._projects[p.id] = p
+            self._index_tasks(loaded)
+        return [self._projects[pid] for pid in ids if pid in self._projects]
+
+    def _has_project_changes(self) -> bool:
+        if self._removed_projects:
+            return True
+        return any(p.is_dirty for p in self._projects.values())
+
+    # --- Queries ---
+
+    def user(self, name: str) -> Optional[User]:
+        """Case-insensitive user lookup by name."""
+        return storage.get_user_by_name(self.users, name)
+
+    def project(self, title: str) -> Optional[Project]:
+        """Case-insensitive project lookup by title."""
+        return storage.get_project_by_title(self.projects, title)
+
+    def task(self, task_id: str) -> Optional[Tuple[Task, Project]]:
+        """
+        (task, project) for `task_id`. Reads only the owning project (found
+        via one task-locator shard) when the project list has not been loaded.
+        """
+        found = self._tasks.get(task_id)
+        if found and found[0] in found[1].tasks:
+            return found
+        for p in self._projects.values():  # tasks appended directly
+            for t in p.tasks:
+                if t.id == task_id:
+                    self._tasks[t.id] = (t, p)
+                    return t, p
+        if self._all_projects:
+            return None
+        pid = storage.project_index(TASK_PROJECTS).lookup(task_id)
+        if pid is None:
+            return None
+        self._load_by_ids([pid])
+        found = self._tasks.get(task_id)
+        return found if found and found[0] in found[1].tasks else None
+
+    def _require_user(self, name: str) -> User:
+        user = self.user(name)
+        if not user:
+            raise SessionError(f"No such user: {name}")
+        return user
+
+    def _require_project(self, title: str) -> Project:
+        proj = self.project(title)
+        if not proj:
+            raise SessionError(f"No such project: {title}")
+        return proj
+
+    def _require_task(self, task_id: str) -> Tuple[Task, Project]:
+        found = self.task(task_id)
+        if not found:
+            raise SessionError(f"No such task id: {task_id}")
+        return found
+
+    def projects_of(self, user_name: str) -> List[Project]:
+        """
+        Projects owned by a user, via the owner index unless this session
+        has uncommitted project changes the index cannot know about.
+        """
+        owner = self._require_user(user_name)
+        if self._all_projects or self._has_project_changes():
+            return [p for p in self.projects if p.user_id == owner.id]
+        return self._load_by_ids(storage.project_index(OWNERS).lookup(owner.id))
+
+    def tasks(self, project_title: Optional[str] = None) -> List[Tuple[Task, str]]:
+        """(task, project_id) rows, optionally for one project."""
+        if project_title:
+            proj = self._require_project(project_title)
+            return [(t, proj.id) for t in proj.tasks]
+        return [(t, p.id) for p in self.projects for t in p.tasks]
+
+    def tasks_assigned_to(self, user_name: str) -> List[Tuple[Task, str]]:
+        """
+        (task, project_id) rows assigned to a user, via the assignee index
+        unless this session has uncommitted project changes.
+        """
+        user = self._require_user(user_name)
+        if self._all_projects or self._has_project_changes():
+            return [
+                (t, p.id)
+                for p in self.projects
+                for t in p.tasks
+                if t.assigned_to == user.id
+            ]
+        refs = storage.project_index(ASSIGNEES).lookup(user.id)
+        by_id = storage.index_by_id(self._load_by_ids(pid for pid, _tid in refs))
+        rows = []
+        for pid, tid in refs:
+            task = by_id[pid].get_task(tid) if pid in by_id else None
+            if task:
+                rows.append((task, pid))
+        return rows
+
+    # --- Changes ---
+
+    def add_user(self, name: str, email: Optional[str] = None) -> User:
+        name = name.strip()
+        email = (email or "").strip().lower()
+        for u in self.users:
+            if u.name.lower() == name.lower():
+                raise SessionError(f"User with name '{name}' already exists.")
+            if email and (u.email or "").lower() == email:
+                raise SessionError(f"User with email '{email}' already exists.")
+        user = User(name=name, email=email or None)
+        self.users.append(user)
+        self._events.append(outbox.event("user.created", user_id=user.id, name=name))
+        return user
+
+    def delete_user(
+        self, name: str, reassign_to: Optional[str] = None
+    ) -> DeleteSummary:
+        """
+        Delete a user. Their projects and task assignments go to
+        `reassign_to`, or cascade (projects deleted, assignments cleared).
+        """
+        user = self._require_user(name)
+        target = self._require_user(reassign_to) if reassign_to else None
+        if target and target.id == user.id:
+            raise SessionError("Cannot reassign a user's work to themselves.")
+
+        owned = self.projects_of(user.name)
+        assigned = self.tasks_assigned_to(user.name)
+        new_owner = target.id if target else None
+        deleted = 0
+        for proj in owned:
+            if target:
+                proj.user_id = new_owner
+            else:
+                self._remove_project(proj)
+                deleted += 1
+        for task, pid in assigned:
+            if pid not in self._removed_projects:
+                task.assigned_to = new_owner
+        self.users.remove(user)
+        return DeleteSummary(len(owned), len(assigned), deleted)
+
+    def _remove_project(self, proj: Project) -> None:
+        self._projects.pop(proj.id, None)
+        self._removed_projects.add(proj.id)
+        for t in proj.tasks:
+            self._tasks.pop(t.id, None)
+
+    def add_project(
+        self, user_name: str, title: str, due_date: Optional[str] = None
+    ) -> Project:
+        owner = self._require_user(user_name)
+        try:
+            proj = Project(title=title.strip(), user_id=owner.id, due_date=due_date)
+        except ValueError as e:
+            raise SessionError(str(e)) from e
+        self._projects[proj.id] = proj
+        self._events.append(
+            outbox.event(
+                "project.created",
+                project_id=proj.id,
+                title=proj.title,
+                user_id=owner.id,
+            )
+        )
+        return proj
+
+    def add_task(
+        self, project_title: str, title: str, depends_on: Iterable[str] = ()
+    ) -> Task:
+        proj = self._require_project(project_title)
+        depends_on = list(depends_on)
+        for dep in depends_on:
+            self._require_task(dep)
+        task = Task(title=title.strip(), depends_on=depends_on)
+        proj.add_task(task)
+        self._tasks[task.id] = (task, proj)
+        self._events.append(
+            outbox.event(
+                "task.created", task_id=task.id, project_id=proj.id, title=task.title
+            )
+        )
+        return task
+
+    def complete(self, task_id: str) -> Tuple[Task, Project]:
+        task, proj = self._require_task(task_id)
+        if not task.completed:
+            task.mark_complete()
+            self._events.append(
+                outbox.event("task.completed", task_id=task.id, project_id=proj.id)
+            )
+        return task, proj
+
+    def set_status(self, task_id: str, status: str) -> Tuple[Task, Project]:
+        """Move a task to `status`; "done" goes through complete()."""
+        if status == "done":
+            return self.complete(task_id)
+        task, proj = self._require_task(task_id)
+        if task.status != status:
+            try:
+                task.status = status
+            except ValueError as e:
+                raise SessionError(str(e)) from None
+        return task, proj
+
+    def assign(self, task_id: str, user_name: str) -> Tuple[Task, User]:
+        user = self._require_user(user_name)
+        task, _proj = self._require_task(task_id)
+        if task.assigned_to != user.id:
+            task.assigned_to = user.id
+        return task, user
+
+    def unassign(self, task_id: str) -> Task:
+        task, _proj = self._require_task(task_id)
+        if task.assigned_to is not None:
+            task.assigned_to = None
+        return task
+
+    def depend(self, task_id: str, on: Iterable[str]) -> Tuple[Task, List[str]]:
+        """
+        Make a task depend on others (in any project). Returns (task, ids
+        newly added). Raises SessionError, changing nothing, if a task is
+        missing or an edge would close a cycle.
+        """
+        task, _proj = self._require_task(task_id)
+        on = [dep.strip() for dep in on]
+        for dep in on:
+            self._require_task(dep)
+        graph = storage.project_index(DEPENDENCIES)
+        edges = self._session_edges(graph.by_project)
+        mine = edges.setdefault(task.id, list(task.depends_on))
+        added = []
+        for dep in on:
+            cycle = graph.would_cycle(task.id, dep, edges)
+            if cycle:
+                raise SessionError(
+                    f"Dependency would create a cycle: {' -> '.join(cycle)}"
+                )
+            if dep not in mine:
+                mine.append(dep)  # later checks see it
+                added.append(dep)
+        for dep in added:
+            task.add_dependency(dep)
+        return task, added
+
+    def _session_edges(self, by_project: Dict[str, List[str]]) -> Dict[str, list]:
+        """
+        Dependency lists as this session sees them, for the tasks the
+        dependency index may not know yet (loaded, removed or added here).
+        """
+        edges: Dict[str, list] = {
+            t.id: list(t.depends_on) for p in self._projects.values() for t in p.tasks
+        }
+        for pid in self._removed_projects:
+            for tid in by_project.get(pid, []):
+                edges[tid] = []
+        return edges
+
+    def undepend(self, task_id: str, on: Iterable[str]) -> Tuple[Task, List[str]]:
+        """Drop dependencies from a task. Returns (task, ids removed)."""
+        task, _proj = self._require_task(task_id)
+        removed = [dep for dep in on if task.remove_dependency(dep.strip())]
+        return task, removed
+
+    def archive(
+        self,
+        older_than_days: Optional[int] = None,
+        codec: str = archive.DEFAULT_CODEC,
+    ) -> int:
+        """
+        Move completed tasks (created at least `older_than_days` ago, if
+        given) out of every project into the archive segments. Returns how
+        many moved; the segments are written by commit().
+        """
+        if codec not in archive.CODECS:
+            raise SessionError(f"codec must be one of {sorted(archive.CODECS)}")
+        moved = archive.select_completed(self.projects, older_than_days)
+        for proj, task in moved:
+            proj.remove_task(task.id)
+            self._tasks.pop(task.id, None)
+        if moved:
+            self._archived.append((codec, [(p.id, t) for p, t in moved]))
+        return len(moved)
+
+    # --- Commit ---
+
+    def commit(self) -> None:
+        """
+        Write every changed file in one atomic step (a no-op if nothing
+        changed). All writes undo together as one history transaction.
+        """
+        users = None
+        if self._users is not None and (
+            storage.pending_changes(self._users)
+            or [u.id for u in self._users] != self._clean_user_ids
+        ):
+            users = self._users
+
+        projects = None
+        upserts: List[Project] = []
+        removed: List[str] = []
+        if self._all_projects:
+            current = list(self._projects.values())
+            if (
+                storage.pending_changes(current)
+                or [p.id for p in current] != self._clean_project_ids
+            ):
+                projects = current
+        else:
+            upserts = storage.pending_changes(self._projects.values())
+            removed = sorted(self._removed_projects)
+
+        if users is None and projects is None and not upserts and not removed:
+            return
+        with history.transaction(storage.DATA_DIR, self.label):
+            storage.commit(
+                users=users,
+                projects=projects,
+                upserts=upserts,
+                removed_ids=removed,
+                events=self._events,
+            )
+            # Only once the tasks have left the data, so a failed commit
+            # cannot leave them in both places
+            archived, self._archived = self._archived, []
+            for codec, rows in archived:
+                archive.append_segments(rows, codec)
+        if users is not None:
+            self._clean_user_ids = [u.id for u in users]
+        if projects is not None:
+            self._clean_project_ids = [p.id for p in projects]
+        self._removed_projects.clear()
+        self._events = []
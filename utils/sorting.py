@@ -0,0 +1,200 @@
+# utils/sorting.py
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import sys
+import tempfile
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from models.ids import sort_key as created_key
+from models.task import Task
+
+# Sorting for task listings that may not fit in memory.
+#
+# - top_n(): `--limit N` keeps a bounded heap of N rows instead of sorting
+#   everything (O(n log N) time, N rows of memory).
+# - external_sort(): `--memory-budget` buffers rows as compact JSON lines
+#   until the budget is reached, spills each sorted buffer to a temp file
+#   (a run), then k-way merges the runs with heapq.merge and yields rows
+#   one at a time, so the caller can stream them into the renderer. When
+#   everything fits in one buffer nothing touches the disk.
+#
+# Keys are tuples of strings ending in the task id, so every order is total
+# and the same rows always print in the same order.
+
+SORT_FIELDS = ("created_at", "title", "project")
+MAX_FANIN = 64  # runs merged at once; more runs are merged in passes
+ROW_OVERHEAD = 120  # list slot + tuple + bookkeeping per buffered row
+_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+Row = Tuple[Task, str]
+Key = Tuple[str, ...]
+
+
+def parse_budget(text: str) -> int:
+    """Bytes from "512M", "64k", "2G" or a plain byte count."""
+    raw = text.strip().upper().removesuffix("B").removesuffix("I")
+    number, unit = raw, ""
+    if raw and raw[-1] in _UNITS:
+        number, unit = raw[:-1], raw[-1]
+    try:
+        amount = float(number) * _UNITS[unit]
+    except ValueError:
+        amount = math.nan
+    if not math.isfinite(amount) or int(amount) <= 0:  # also inf, nan, 1e999
+        raise ValueError(f"Invalid memory budget '{text}' (e.g. 256M)")
+    return int(amount)
+
+
+def sort_key(field: str, project_titles: Dict[str, str]) -> Callable[[Row], Key]:
+    """Key function ordering (task, project_id) rows by `field`."""
+    if field == "created_at":
+        return lambda r: (created_key(r[0].id, r[0].created_at) or "", r[0].id)
+    if field == "title":
+        return lambda r: (r[0].title.casefold(), r[0].id)
+    if field == "project":
+        return lambda r: (
+            project_titles.get(r[1], "").casefold(),
+            r[1] or "",
+            created_key(r[0].id, r[0].created_at) or "",
+            r[0].id,
+        )
+    raise ValueError(f"Unknown sort field '{field}' (use {', '.join(SORT_FIELDS)})")
+
+
+def top_n(
+    rows: Iterable[Row], key: Callable[[Row], Key], n: int, reverse: bool = False
+) -> List[Row]:
+    """The first `n` rows in key order, via a bounded heap."""
+    pick = heapq.nlargest if reverse else heapq.nsmallest
+    return pick(n, rows, key=key)
+
+
+# --- External merge sort ---
+
+
+# A spilled row is "<key JSON>\t<[project_id, task] JSON>" (JSON never holds
+# a raw tab), so merging only parses keys and rows are rebuilt on output.
+
+
+def _encode(key: Key, row: Row) -> str:
+    task, pid = row
+    return (
+        json.dumps(key, separators=(",", ":"))
+        + "\t"
+        + json.dumps([pid, task.to_dict()], separators=(",", ":"))
+    )
+
+
+def _decode(line: str) -> Row:
+    pid, data = json.loads(line.partition("\t")[2])
+    return Task.from_dict(data), pid
+
+
+def _write_run(lines: List[Tuple[Key, str]], tmp: Path, n: int) -> Path:
+    path = tmp / f"run-{n:05d}.jsonl"
+    with path.open("w", encoding="utf-8") as fh:
+        for _key, line in lines:
+            fh.write(line)
+            fh.write("\n")
+    return path
+
+
+def _read_run(path: Path) -> Iterator[Tuple[Key, str]]:
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.rstrip("\n")
+            yield tuple(json.loads(line.partition("\t")[0])), line
+
+
+def _merge(
+    sources: List[Iterable[Tuple[Key, str]]], reverse: bool
+) -> Iterator[Tuple[Key, str]]:
+    return heapq.merge(*sources, key=lambda e: e[0], reverse=reverse)
+
+
+def external_sort(
+    rows: Iterable[Row],
+    key: Callable[[Row], Key],
+    budget: int,
+    reverse: bool = False,
+    tmp_dir: Optional[Path] = None,
+    stats: Optional[dict] = None,
+) -> Iterator[Row]:
+    """
+    Yield `rows` in key order while buffering about `budget` bytes at most,
+    spilling sorted runs to a temp directory (removed when the generator is
+    exhausted or closed). `stats`, if given, receives "rows" and "runs".
+    """
+    stats = stats if stats is not None else {}
+    stats.update(rows=0, runs=0)
+    with tempfile.TemporaryDirectory(prefix="ppm-sort-", dir=tmp_dir) as name:
+        tmp = Path(name)
+        runs: List[Path] = []
+        buffer: List[Tuple[Key, str]] = []
+        used = 0
+        for row in rows:
+            k = key(row)
+            line = _encode(k, row)
+            buffer.append((k, line))
+            used += sys.getsizeof(line) + sum(map(sys.getsizeof, k)) + ROW_OVERHEAD
+            stats["rows"] += 1
+            if used >= budget:
+                buffer.sort(key=lambda e: e[0], reverse=reverse)
+                runs.append(_write_run(buffer, tmp, len(runs)))
+                buffer, used = [], 0
+        buffer.sort(key=lambda e: e[0], reverse=reverse)
+        if not runs:
+            for _k, line in buffer:
+                yield _decode(line)
+            return
+        if buffer:
+            runs.append(_write_run(buffer, tmp, len(runs)))
+            buffer = []
+        stats["runs"] = len(runs)
+
+        n = len(runs)
+        while len(runs) > MAX_FANIN:  # merge in passes to bound open files
+            merged: List[Path] = []
+            for i in range(0, len(runs), MAX_FANIN):
+                group = runs[i : i + MAX_FANIN]
+                path = tmp / f"run-{n:05d}.jsonl"
+                n += 1
+                with path.open("w", encoding="utf-8") as fh:
+                    for _k, line in _merge([_read_run(p) for p in group], reverse):
+                        fh.write(line)
+                        fh.write("\n")
+                for p in group:
+                    p.unlink()
+                merged.append(path)
+            runs = merged
+
+        for _k, line in _merge([_read_run(p) for p in runs], reverse):
+            yield _decode(line)
+
+
+def sorted_rows(
+    rows: Iterable[Row],
+    field: Optional[str],
+    project_titles: Dict[str, str],
+    limit: Optional[int] = None,
+    budget: Optional[int] = None,
+    reverse: bool = False,
+) -> Iterable[Row]:
+    """
+    `rows` ordered by `field` (None keeps input order) and cut to `limit`:
+    a bounded heap when limited, an external sort under `budget`, otherwise
+    an in-memory sort.
+    """
+    if field is None:
+        return rows if limit is None else islice(rows, limit)
+    key = sort_key(field, project_titles)
+    if limit is not None:
+        return top_n(rows, key, limit, reverse)
+    if budget is not None:
+        return external_sort(rows, key, budget, reverse)
+    return sorted(rows, key=key, reverse=reverse)
@@ -2,12 +2,17 @@
 from __future__ import annotations
 
 import json
+import os
+import uuid
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List
+from typing import IO, Any, Callable, Iterator, List, NamedTuple, Optional, Tuple
 
 # Model imports (match your existing files)
 from models.user import User
 from models.project import Project
+from utils import history, indexes, outbox, replication, transitions
 
 # --- Paths ---
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
@@ -17,13 +22,476 @@ USERS_PATH = DATA_DIR / "users.json"
 PROJECTS_PATH = DATA_DIR / "projects.json"
 
 
+def use_data_dir(path: Path) -> None:
+    """
+    Point storage (and every module that follows storage.DATA_DIR) at
+    another data directory, e.g. a replica's. Status transitions buffered
+    for the previous directory are dropped rather than logged here.
+    """
+    global DATA_DIR, USERS_PATH, PROJECTS_PATH
+    transitions.discard()
+    DATA_DIR = Path(path)
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    USERS_PATH = DATA_DIR / "users.json"
+    PROJECTS_PATH = DATA_DIR / "projects.json"
+
+
+# Schema versions of the data files live in a sidecar header so the files
+# themselves stay plain JSON arrays. Files without an entry are version 1.
+SCHEMA_FILE = "schema.json"
+CURRENT_SCHEMA = 2
+
+
+class SchemaError(Exception):
+    """Raised when a data file was written by a newer schema than this code."""
+
+
+# Byte spans of each record inside the data files (under data/indexes/)
+OFFSETS_INDEX = "projects.offsets"
+USERS_OFFSETS_INDEX = "users.offsets"
+
+
 # --- Ensure files exist ---
 def _ensure_file(path: Path) -> None:
     """
-    Ensure the file exists. If not, create an empty JSON list file.
+    Ensure the file exists. If not, create an empty JSON list file
+    stamped with the current schema version.
     """
     if not path.exists():
         path.write_text("[]", encoding="utf-8")
+        set_schema_version(path.stem, CURRENT_SCHEMA)
+
+
+# --- Schema header ---
+def schema_versions() -> dict:
+    """
+    Return {"users": n, "projects": n} from the sidecar header (default 1).
+    """
+    try:
+        raw = json.loads((DATA_DIR / SCHEMA_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        raw = {}
+    return {name: int(raw.get(name, 1)) for name in ("users", "projects")}
+
+
+def set_schema_version(name: str, version: int) -> None:
+    versions = schema_versions()
+    versions[name] = version
+    atomic_write_bytes(
+        DATA_DIR / SCHEMA_FILE, json.dumps(versions, indent=2).encode("utf-8")
+    )
+
+
+def _check_schema(path: Path) -> None:
+    version = schema_versions().get(path.stem, 1)
+    if version > CURRENT_SCHEMA:
+        raise SchemaError(
+            f"{path.name} uses schema v{version}; this version of the tool "
+            f"supports up to v{CURRENT_SCHEMA}."
+        )
+
+
+@contextmanager
+def atomic_writer(path: Path) -> Iterator[IO[bytes]]:
+    """
+    Yield a binary handle to a temp file beside `path`; on clean exit it is
+    fsynced and renamed over `path`, so readers see the old or new file,
+    never a partial one. On error the temp file is discarded.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = indexes.mkstemp_beside(path)
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            yield fh
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_bytes(path: Path, payload: bytes) -> None:
+    with atomic_writer(path) as fh:
+        fh.write(payload)
+
+
+# --- Serialized-fragment cache ---
+# Each loaded/saved record maps to the exact JSON text it occupies inside the
+# indented top-level array. Clean records are spliced back from this cache on
+# save instead of being re-serialized. Keyed weakly so dropped objects vanish.
+# Only canonical text is cached: a record that from_dict() completed or
+# normalized is left out, so its next save writes the model's form. A file
+# whose offset table is current and marked "canonical" was laid out entirely
+# from to_dict() output, so its records are cached (and built) without that
+# check.
+_FRAGMENTS: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+_LEGACY_ID_NS = uuid.UUID("6f1c2a0e-4d3b-5e8f-9a7c-1b2d3e4f5a6b")
+
+_DECODER = json.JSONDecoder()
+_WS = " \t\n\r"
+
+
+class ChangeSet(NamedTuple):
+    """
+    What a save did: records re-serialized, ids dropped since the previous
+    file, and how many records were spliced from cache. `exact` is False when
+    the previous file could not be vouched for (so `removed` is unknown).
+    """
+
+    changed: list
+    removed: list
+    reused: int
+    exact: bool
+
+
+def _fragment(data: dict) -> str:
+    """
+    Serialize one record exactly as json.dumps(list, indent=2) would lay it
+    out as an array element (minus the leading two-space indent).
+    """
+    return json.dumps(data, indent=2).replace("\n", "\n  ")
+
+
+def _encode_fragments(pieces: List[bytes]) -> Tuple[bytes, List[List[int]]]:
+    """
+    Lay UTF-8 fragments out as an indented JSON array, returning the payload
+    and each fragment's [start, end) byte span within it.
+    """
+    if not pieces:
+        return b"[]", []
+    out = bytearray(b"[\n  ")
+    spans = []
+    for i, piece in enumerate(pieces):
+        if i:
+            out += b",\n  "
+        start = len(out)
+        out += piece
+        spans.append([start, len(out)])
+    out += b"\n]"
+    return bytes(out), spans
+
+
+def _iter_array_spans(text: str) -> Iterator[Tuple[Any, int, int]]:
+    """
+    Decode a top-level JSON array element by element, yielding
+    (value, start, end) so callers can keep each element's raw text.
+    Raises json.JSONDecodeError on malformed input.
+    """
+    idx = len(text) - len(text.lstrip(_WS))
+    if text[idx : idx + 1] != "[":
+        raise json.JSONDecodeError("Expected '['", text, idx)
+    idx += 1
+    expect_value = True
+    after_comma = False
+    while True:
+        while idx < len(text) and text[idx] in _WS:
+            idx += 1
+        ch = text[idx : idx + 1]
+        if ch == "]" and not (expect_value and after_comma):
+            return
+        if ch == "," and not expect_value:
+            idx += 1
+            expect_value = after_comma = True
+            continue
+        if not expect_value:
+            raise json.JSONDecodeError("Expected ',' or ']'", text, idx)
+        value, end = _DECODER.raw_decode(text, idx)
+        yield value, idx, end
+        idx = end
+        expect_value = False
+
+
+def iter_json_array(path: Path, chunk_chars: int = 1 << 16) -> Iterator[Any]:
+    """
+    Stream the elements of a top-level JSON array file one at a time,
+    reading `chunk_chars` at a time, so memory stays bounded by the largest
+    single element rather than the file. Raises json.JSONDecodeError on
+    malformed input.
+
+    An element that does not fit in the buffer is retried after reading as
+    much again as is pending, so a large element is decoded O(log n) times
+    over a doubling buffer (linear overall) rather than once per chunk.
+    """
+    with path.open("r", encoding="utf-8") as fh:
+        buf = ""
+        pos = 0
+        eof = False
+
+        def fill(size: int = chunk_chars) -> bool:
+            nonlocal buf, pos, eof
+            chunk = fh.read(size)
+            if not chunk:
+                eof = True
+                return False
+            buf = buf[pos:] + chunk
+            pos = 0
+            return True
+
+        def skip_ws() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in _WS:
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    return buf[pos : pos + 1]
+
+        if skip_ws() != "[":
+            raise json.JSONDecodeError("Expected '['", buf, pos)
+        pos += 1
+        expect_value = True
+        after_comma = False
+        while True:
+            ch = skip_ws()
+            if ch == "]" and not (expect_value and after_comma):
+                return
+            if ch == "" and eof:
+                raise json.JSONDecodeError("Unterminated array", buf, pos)
+            if ch == "," and not expect_value:
+                pos += 1
+                expect_value = after_comma = True
+                continue
+            if not expect_value:
+                raise json.JSONDecodeError("Expected ',' or ']'", buf, pos)
+            while True:
+                try:
+                    value, end = _DECODER.raw_decode(buf, pos)
+                    # A value ending flush with the buffer may be truncated
+                    if end < len(buf) or eof:
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill(max(chunk_chars, len(buf) - pos))
+            yield value
+            pos = end
+            expect_value = False
+
+
+def pending_changes(records) -> list:
+    """
+    Return the records a save would have to re-serialize: anything dirty or
+    never serialized by this process.
+    """
+    return [r for r in records if r.is_dirty or r not in _FRAGMENTS]
+
+
+def _load_records(path: Path, from_dict, offsets_name: str) -> list:
+    recover()
+    _ensure_file(path)
+    _check_schema(path)
+    table = _read_offsets_table(path, offsets_name)
+    trusted = bool(table and table.get("canonical"))
+    text = path.read_text(encoding="utf-8")
+    records = []
+    for i, (data, start, end) in enumerate(_iter_array_spans(text)):
+        raw = text[start:end]
+        if trusted:
+            record = from_dict(data, trusted=True)
+            _FRAGMENTS[record] = raw
+            records.append(record)
+            continue
+        canonical = True
+        if isinstance(data, dict) and not data.get("id"):
+            # A record without an id gets one derived from its place and text,
+            # so every load agrees on it until a save writes it out.
+            data["id"] = str(uuid.uuid5(_LEGACY_ID_NS, f"{path.name}:{i}:{raw}"))
+            canonical = False
+        record = from_dict(data)
+        if canonical and record.to_dict() == data:
+            _FRAGMENTS[record] = raw
+        records.append(record)
+    return records
+
+
+class _PendingWrite(NamedTuple):
+    """A data file rewrite that has been serialized but not yet put in place."""
+
+    path: Path
+    offsets_name: str
+    ids: List[str]
+    spans: List[List[int]]
+    payload: bytes
+    delta: dict
+    canonical: bool
+
+
+def _stage_write(
+    path: Path,
+    offsets_name: str,
+    ids: List[str],
+    pieces: List[bytes],
+    changed_ids: List[str],
+    previous: Optional[dict],
+    canonical: bool,
+) -> _PendingWrite:
+    """
+    Single write path for the data files: records the reverse delta for
+    history (before anything is replaced) and lays out the new array.
+    `canonical` says every piece is the to_dict() form of its record.
+    """
+    delta = history.capture(path, previous, ids, changed_ids)
+    payload, spans = _encode_fragments(pieces)
+    return _PendingWrite(path, offsets_name, ids, spans, payload, delta, canonical)
+
+
+def _stage_records(
+    path: Path, records, offsets_name: str
+) -> Tuple[_PendingWrite, ChangeSet]:
+    """
+    Serialize `records` for `path`, re-serializing only dirty ones, along
+    with a byte-offset table (id -> span) so single records can later be
+    read without parsing the whole file.
+    """
+    changed = []
+    fragments = []
+    for r in records:
+        frag = _FRAGMENTS.get(r)
+        if frag is None or r.is_dirty:
+            frag = _fragment(r.to_dict())
+            _FRAGMENTS[r] = frag
+            r.mark_clean()
+            changed.append(r)
+        fragments.append(frag.encode("utf-8"))
+
+    previous = _read_offsets(path, offsets_name)
+    ids = [r.id for r in records]
+    removed: list = []
+    if previous is not None:
+        current = set(ids)
+        removed = [pid for pid in previous if pid not in current]
+
+    write = _stage_write(
+        path, offsets_name, ids, fragments, [r.id for r in changed], previous, True
+    )
+    return write, ChangeSet(
+        changed=changed,
+        removed=removed,
+        reused=len(fragments) - len(changed),
+        exact=previous is not None,
+    )
+
+
+def _save_records(path: Path, records, offsets_name: str) -> ChangeSet:
+    write, changes = _stage_records(path, records, offsets_name)
+    _publish([write])
+    return changes
+
+
+# --- Multi-file commits ---
+# Several files are replaced together by fsyncing each new version to a temp
+# file, recording the (temp, target) pairs in a journal, then renaming. The
+# journal is removed once every rename is done; if the process dies between
+# renames, the next read finds the journal and finishes them (roll forward).
+JOURNAL_FILE = "journal.json"
+
+
+def _write_temp(path: Path, payload: bytes) -> str:
+    fd, tmp = indexes.mkstemp_beside(path)
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(payload)
+        fh.flush()
+        os.fsync(fh.fileno())
+    return tmp
+
+
+def _roll_forward(pairs: List[List[str]]) -> None:
+    for tmp, target in pairs:
+        if os.path.exists(tmp):
+            os.replace(tmp, target)
+
+
+def recover(data_dir: Optional[Path] = None) -> bool:
+    """
+    Finish a multi-file commit interrupted after its journal was written.
+    Returns True if one was replayed. Called before every read.
+    """
+    journal = (data_dir or DATA_DIR) / JOURNAL_FILE
+    try:
+        pairs = json.loads(journal.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return False
+    except json.JSONDecodeError:  # pragma: no cover - journal is written atomically
+        journal.unlink()
+        return False
+    _roll_forward(pairs)
+    journal.unlink()
+    return True
+
+
+def _replace_files(files: List[Tuple[Path, bytes]], data_dir: Path) -> None:
+    """
+    Replace every (path, payload) in `files`: all of them or (after a crash
+    and recovery) all of them, never some.
+    """
+    if len(files) == 1:
+        atomic_write_bytes(*files[0])
+    elif files:
+        pairs: List[List[str]] = []
+        try:
+            for path, payload in files:
+                pairs.append([_write_temp(path, payload), str(path)])
+        except BaseException:
+            for tmp, _target in pairs:
+                os.unlink(tmp)
+            raise
+        journal = data_dir / JOURNAL_FILE
+        atomic_write_bytes(journal, json.dumps(pairs).encode("utf-8"))
+        _roll_forward(pairs)
+        journal.unlink()
+
+
+def _publish(
+    writes: List[_PendingWrite], extra: List[Tuple[Path, bytes]] = ()  # type: ignore[assignment]
+) -> None:
+    """
+    Put staged files (plus `extra` files, e.g. an outbox segment) in place
+    atomically, then refresh their offsets, log history and ship the change
+    to replicas.
+    """
+    _replace_files([(w.path, w.payload) for w in writes] + list(extra), DATA_DIR)
+    for w in writes:
+        _write_offsets(w.path, w.offsets_name, w.ids, w.spans, w.canonical)
+        history.append(DATA_DIR, w.delta, w.payload)
+    if writes:
+        history.checkpoint(DATA_DIR)
+        replication.record(
+            DATA_DIR,
+            [(w.path.stem, w.ids, w.spans, w.payload, w.delta) for w in writes],
+        )
+
+
+def _read_offsets(path: Path, offsets_name: str) -> Optional[dict]:
+    """
+    Return the id -> [start, end) table for `path`, or None if missing or
+    out of date with the file on disk.
+    """
+    table = _read_offsets_table(path, offsets_name)
+    return None if table is None else table.get("offsets", {})
+
+
+def _read_offsets_table(path: Path, offsets_name: str) -> Optional[dict]:
+    recover()
+    table = indexes.read_json(indexes.index_path(DATA_DIR, offsets_name))
+    if not table or table.get("fingerprint") != indexes.fingerprint(path):
+        return None
+    return table
+
+
+def _write_offsets(
+    path: Path, offsets_name: str, ids: List[str], spans, canonical: bool = False
+) -> None:
+    indexes.write_json(
+        indexes.index_path(DATA_DIR, offsets_name),
+        {
+            "fingerprint": indexes.fingerprint(path),
+            "canonical": canonical,
+            "offsets": dict(zip(ids, spans)),
+        },
+    )
 
 
 # --- Load/Save ---
@@ -31,20 +499,17 @@ def load_users() -> List[User]:
     """
     Load all users from disk. On malformed JSON, returns an empty list.
     """
-    _ensure_file(USERS_PATH)
     try:
-        raw = json.loads(USERS_PATH.read_text(encoding="utf-8"))
-        return [User.from_dict(d) for d in raw]
+        return _load_records(USERS_PATH, User.from_dict, USERS_OFFSETS_INDEX)
     except json.JSONDecodeError:
         return []
 
 
-def save_users(users: List[User]) -> None:
+def save_users(users: List[User]) -> ChangeSet:
     """
-    Save all users to disk.
+    Save all users to disk, re-serializing only users changed since load.
     """
-    serializable = [u.to_dict() for u in users]
-    USERS_PATH.write_text(json.dumps(serializable, indent=2), encoding="utf-8")
+    return commit(users=users)[0]  # type: ignore[return-value]
 
 
 def load_projects() -> List[Project]:
@@ -52,20 +517,195 @@ def load_projects() -> List[Project]:
     Load all projects from disk.
     On incorrect JSON, returns an empty list.
     """
-    _ensure_file(PROJECTS_PATH)
     try:
-        raw = json.loads(PROJECTS_PATH.read_text(encoding="utf-8"))
-        return [Project.from_dict(d) for d in raw]
+        return _load_records(PROJECTS_PATH, Project.from_dict, OFFSETS_INDEX)
     except json.JSONDecodeError:
         return []
 
 
-def save_projects(projects: List[Project]) -> None:
+def save_projects(projects: List[Project]) -> ChangeSet:
     """
     Save all projects to disk.
+    Only projects marked dirty (directly or via one of their tasks) are
+    re-serialized; the cached text of unchanged projects is spliced in as-is.
+    """
+    return commit(projects=projects)[1]  # type: ignore[return-value]
+
+
+def load_projects_by_ids(ids: List[str]) -> List[Project]:
+    """
+    Load only the given projects (in the given order, unknown ids skipped),
+    seeking straight to each one via the offset table written on save.
+    Falls back to a full load when the table does not match the file.
+    Read-only helper: never pass the result to save_projects().
+    """
+    table = _read_offsets_table(PROJECTS_PATH, OFFSETS_INDEX)
+    if table is None:
+        wanted = set(ids)
+        by_id = {p.id: p for p in load_projects() if p.id in wanted}
+        return [by_id[pid] for pid in ids if pid in by_id]
+
+    offsets = table.get("offsets", {})
+    trusted = bool(table.get("canonical"))
+    out: List[Project] = []
+    with PROJECTS_PATH.open("rb") as fh:
+        for pid in ids:
+            span = offsets.get(pid)
+            if not span:
+                continue
+            fh.seek(span[0])
+            frag = fh.read(span[1] - span[0]).decode("utf-8")
+            data = json.loads(frag)
+            project = Project.from_dict(data, trusted=trusted)
+            if trusted or project.to_dict() == data:
+                _FRAGMENTS[project] = frag
+            out.append(project)
+    return out
+
+
+def patch_projects(
+    upserts: List[Project] = (), removed_ids: List[str] = ()  # type: ignore[assignment]
+) -> ChangeSet:
+    """
+    Write targeted changes to projects.json without parsing untouched
+    projects: `upserts` replace the project with the same id (or are appended),
+    `removed_ids` are dropped, and every other project's bytes are copied over
+    via the offset table. Pairs with load_projects_by_ids(). Falls back to a
+    full load + save when the offset table is out of date.
+    """
+    changes = commit(upserts=upserts, removed_ids=removed_ids)[1]
+    return changes or ChangeSet(changed=[], removed=[], reused=0, exact=True)
+
+
+def _stage_project_patch(
+    upserts: List[Project], removed_ids: List[str]
+) -> Tuple[_PendingWrite, ChangeSet, Callable[[], List[Project]]]:
+    table = _read_offsets_table(PROJECTS_PATH, OFFSETS_INDEX)
+    if table is None:
+        drop = set(removed_ids)
+        replace = {p.id: p for p in upserts}
+        projects = [replace.pop(p.id, p) for p in load_projects() if p.id not in drop]
+        projects.extend(replace.values())
+        write, changes = _stage_records(PROJECTS_PATH, projects, OFFSETS_INDEX)
+        return write, changes, lambda: projects
+
+    offsets = table.get("offsets", {})
+    raw = PROJECTS_PATH.read_bytes()
+    pending = {p.id: p for p in upserts}
+    drop = set(removed_ids)
+
+    def serialize(project: Project) -> bytes:
+        frag = _fragment(project.to_dict())
+        _FRAGMENTS[project] = frag
+        project.mark_clean()
+        return frag.encode("utf-8")
+
+    ids: List[str] = []
+    pieces: List[bytes] = []
+    removed: List[str] = []
+    for pid, (start, end) in offsets.items():
+        if pid in drop:
+            removed.append(pid)
+            continue
+        project = pending.pop(pid, None)
+        pieces.append(serialize(project) if project else raw[start:end])
+        ids.append(pid)
+    for project in pending.values():
+        pieces.append(serialize(project))
+        ids.append(project.id)
+
+    # Copied bytes are only canonical if the file they come from was
+    write = _stage_write(
+        PROJECTS_PATH,
+        OFFSETS_INDEX,
+        ids,
+        pieces,
+        [p.id for p in upserts],
+        offsets,
+        bool(table.get("canonical")),
+    )
+    changes = ChangeSet(
+        changed=list(upserts),
+        removed=removed,
+        reused=len(pieces) - len(upserts),
+        exact=True,
+    )
+    return write, changes, load_projects
+
+
+def commit(
+    users: Optional[List[User]] = None,
+    projects: Optional[List[Project]] = None,
+    upserts: List[Project] = (),  # type: ignore[assignment]
+    removed_ids: List[str] = (),  # type: ignore[assignment]
+    events: List[dict] = (),  # type: ignore[assignment]
+) -> Tuple[Optional[ChangeSet], Optional[ChangeSet]]:
+    """
+    Write users and/or projects as one atomic step (both files or neither,
+    see recover()). Projects are given either as the full list (`projects`)
+    or as a patch (`upserts` / `removed_ids`, as patch_projects()). `events`
+    go to the outbox in the same step.
+    Returns (users ChangeSet, projects ChangeSet), None for files not written.
+    Raises replication.ReadOnlyError on a replica.
+    """
+    replication.ensure_writable(DATA_DIR)
+    recover()
+    writes: List[_PendingWrite] = []
+    user_changes = project_changes = None
+    load_all: Callable[[], List[Project]] = load_projects
+    if users is not None:
+        write, user_changes = _stage_records(USERS_PATH, users, USERS_OFFSETS_INDEX)
+        writes.append(write)
+    if projects is not None:
+        write, project_changes = _stage_records(PROJECTS_PATH, projects, OFFSETS_INDEX)
+        load_all = lambda: projects  # noqa: E731
+        writes.append(write)
+    elif upserts or removed_ids:
+        write, project_changes, load_all = _stage_project_patch(
+            list(upserts), list(removed_ids)
+        )
+        writes.append(write)
+
+    extra = [outbox.stage(DATA_DIR, list(events))] if events and writes else []
+    before = indexes.fingerprint(PROJECTS_PATH)
+    _publish(writes, extra)
+    if project_changes is not None:
+        transitions.flush(DATA_DIR)
+    if users is not None:
+        indexes.write_names(DATA_DIR, "users", ((u.name, u.id) for u in users))
+    if project_changes is not None:
+        indexes.refresh(
+            DATA_DIR,
+            load_all,
+            project_changes.changed,
+            project_changes.removed,
+            project_changes.exact,
+            before,
+            indexes.fingerprint(PROJECTS_PATH),
+        )
+    return user_changes, project_changes
+
+
+def project_index(index: indexes.IndexT) -> indexes.IndexT:
+    """
+    Return `index` loaded from disk, rebuilding it from a full load if
+    projects.json changed behind its back (or it was never built).
+    """
+    index.load(DATA_DIR)
+    current = indexes.fingerprint(PROJECTS_PATH)
+    if current is None or index.fingerprint != current:
+        index.rebuild(load_projects())
+        index.save(DATA_DIR, indexes.fingerprint(PROJECTS_PATH))
+    return index
+
+
+def refresh_names() -> None:
+    """
+    Bring the completion name lists in step with files rewritten outside
+    commit() (undo, migrate, replication).
     """
-    serializable = [p.to_dict() for p in projects]
-    PROJECTS_PATH.write_text(json.dumps(serializable, indent=2), encoding="utf-8")
+    project_index(indexes.NAMES)
+    indexes.write_names(DATA_DIR, "users", ((u.name, u.id) for u in load_users()))
 
 
 # --- Helpers lookup / indexing ---
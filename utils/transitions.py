@@ -0,0 +1,220 @@
+# utils/transitions.py
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import threading
+import time
+import uuid
+import weakref
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from models.task import STATUS_LISTENERS, Task
+from utils import replication
+
+# Append-only log of task status transitions, for cycle-time analytics.
+#
+# Each transition is one fixed-width record (26 bytes): a 16-byte task key
+# (the UUID's bytes, or a digest for any other id), from- and to-status
+# codes, and the time in microseconds since the epoch. Recording one is a struct.pack and a list
+# append; the buffer is appended to data/transitions/events.bin by
+# storage.commit(), once per save, and only for tasks whose current state
+# has just been written (a task still dirty waits for its own save, one
+# discarded unsaved stays out of the log). projects.json is never touched.
+#
+# The log is analytics, not state: it is not journaled or undone, and a
+# crash right after a save can lose that save's records. A torn final
+# record is cut off before the next append. Appends are shipped to
+# replicas like archive segments.
+
+TRANSITIONS_DIR = "transitions"
+LOG_NAME = "events.bin"
+RECORD = struct.Struct("<16sBBq")
+STATUS_CODES = {"todo": 1, "in_progress": 2, "done": 3}
+STATUSES = {code: name for name, code in STATUS_CODES.items()}
+READ_CHUNK = 4096  # records per read while streaming
+
+_lock = threading.Lock()
+_pending: List[Tuple[weakref.ref, bytes]] = []
+
+
+class Transition(NamedTuple):
+    key: bytes  # task_key() of the task id
+    old: str
+    new: str
+    at_us: int  # microseconds since the epoch (UTC)
+
+
+def log_path(data_dir: Path) -> Path:
+    return data_dir / TRANSITIONS_DIR / LOG_NAME
+
+
+def task_key(task_id: str) -> bytes:
+    """Fixed-width log key for `task_id`: its UUID bytes, else a digest."""
+    try:
+        if str(uuid.UUID(task_id)) == task_id:
+            return uuid.UUID(task_id).bytes
+    except (TypeError, ValueError, AttributeError):
+        pass
+    raw = str(task_id).encode("utf-8", "surrogatepass")
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+def record(task: Task, old: str, new: str) -> None:
+    """
+    Status listener: buffer one transition until the task is saved. Never
+    raises (unknown statuses log as code 0).
+    """
+    packed = RECORD.pack(
+        task_key(task.id),
+        STATUS_CODES.get(old, 0),
+        STATUS_CODES.get(new, 0),
+        time.time_ns() // 1000,
+    )
+    with _lock:
+        _pending.append((weakref.ref(task), packed))
+
+
+if record not in STATUS_LISTENERS:
+    STATUS_LISTENERS.append(record)
+
+
+def flush(data_dir: Path) -> int:
+    """
+    Append buffered transitions of tasks that are now saved (clean).
+    Returns the number of records written.
+    """
+    global _pending
+    with _lock:
+        ready: List[bytes] = []
+        keep: List[Tuple[weakref.ref, bytes]] = []
+        for ref, packed in _pending:
+            task = ref()
+            if task is None:
+                continue  # never saved and gone
+            if task.is_dirty:
+                keep.append((ref, packed))
+            else:
+                ready.append(packed)
+        _pending = keep
+        if ready:
+            at = _append(log_path(data_dir), b"".join(ready))
+            rel = f"{TRANSITIONS_DIR}/{LOG_NAME}"
+            replication.record_side(data_dir, rel, at)
+    return len(ready)
+
+
+def discard() -> None:
+    """Drop every buffered transition (e.g. when switching data dirs)."""
+    with _lock:
+        _pending.clear()
+
+
+def _append(path: Path, payload: bytes) -> int:
+    """Append `payload` and return the offset it was written at."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    try:
+        size = os.fstat(fd).st_size
+        torn = size % RECORD.size
+        if torn:  # a crash mid-append: realign before writing
+            size -= torn
+            os.ftruncate(fd, size)
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
+    return size
+
+
+def iter_transitions(data_dir: Path) -> Iterator[Transition]:
+    """Stream every logged transition, oldest first."""
+    path = log_path(data_dir)
+    if not path.exists():
+        return
+    block = RECORD.size * READ_CHUNK
+    with path.open("rb") as fh:
+        while True:
+            chunk = fh.read(block)
+            whole = len(chunk) - len(chunk) % RECORD.size
+            for key, old, new, at_us in RECORD.iter_unpack(chunk[:whole]):
+                yield Transition(
+                    key,
+                    STATUSES.get(old, "?"),
+                    STATUSES.get(new, "?"),
+                    at_us,
+                )
+            if len(chunk) < block:
+                return
+
+
+# --- Cycle-time report ---
+
+
+def _us(iso: Optional[str]) -> Optional[int]:
+    if not iso:
+        return None
+    try:
+        dt = datetime.fromisoformat(iso.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return int(dt.timestamp() * 1_000_000)
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of already sorted `values`."""
+    rank = max(1, -(-len(values) * p // 100))  # ceil(n * p / 100)
+    return values[min(len(values), int(rank)) - 1]
+
+
+def cycle_times(
+    data_dir: Path,
+    tasks: Iterable[Tuple[Task, str]],
+    percentiles: Iterable[float] = (50, 85, 95),
+) -> List[dict]:
+    """
+    Lead and cycle time percentiles per project, from one pass over the log.
+
+    Lead time runs from a task's created_at to its last move to "done";
+    cycle time from its first move to "in_progress" to that same point.
+    Tasks reopened and not finished again are skipped. `tasks` supplies
+    (task, project_id) pairs (live and archived) to map ids to projects.
+    Returns one dict per project with a finished task: {"project_id",
+    "done", "lead": {p: seconds}, "cycle": {p: seconds}}, by project id.
+    """
+    started: Dict[bytes, int] = {}
+    finished: Dict[bytes, int] = {}
+    for t in iter_transitions(data_dir):
+        if t.new == "in_progress":
+            started.setdefault(t.key, t.at_us)
+        if t.new == "done":
+            finished[t.key] = t.at_us
+        elif t.old == "done":
+            finished.pop(t.key, None)
+
+    lead: Dict[str, List[float]] = {}
+    cycle: Dict[str, List[float]] = {}
+    for task, pid in tasks:
+        key = task_key(task.id)
+        done_at = finished.get(key)
+        if done_at is None or task.status != "done":
+            continue
+        created = _us(task.created_at)
+        if created is not None:
+            lead.setdefault(pid, []).append((done_at - created) / 1e6)
+        if key in started:
+            cycle.setdefault(pid, []).append((done_at - started[key]) / 1e6)
+
+    ps = list(percentiles)
+    out = []
+    for pid in sorted(set(lead) | set(cycle)):
+        row = {"project_id": pid, "done": 0, "lead": {}, "cycle": {}}
+        for key, series in (("lead", lead), ("cycle", cycle)):
+            values = sorted(series.get(pid, []))
+            row["done"] = max(row["done"], len(values))
+            if values:
+                row[key] = {p: percentile(values, p) for p in ps}
+        out.append(row)
+    return out
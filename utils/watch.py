@@ -0,0 +1,212 @@
+# utils/watch.py
+from __future__ import annotations
+
+import json
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from models.project import Project
+from utils import formatting, indexes, storage
+
+# Watch mode: wait for the data files to change (inotify when the optional
+# `inotify_simple` package is installed, stat polling otherwise), re-parse
+# only the projects whose bytes changed, diff the resulting rows against the
+# previous render and redraw only when something actually differs.
+
+try:
+    from inotify_simple import INotify, flags  # type: ignore
+
+    HAS_INOTIFY = True
+except Exception:  # pragma: no cover
+    HAS_INOTIFY = False
+
+try:
+    from rich.live import Live
+except Exception:  # pragma: no cover
+    Live = None  # type: ignore
+
+Row = tuple
+
+
+class FileWatcher:
+    """
+    Block until one of `paths` may have changed, or a timeout passes.
+    Watches parent directories (atomic saves replace the file, which would
+    orphan a watch on the file itself).
+    """
+
+    def __init__(self, paths: Sequence[Path], use_inotify: Optional[bool] = None):
+        self.paths = list(paths)
+        self._names = {p.name for p in self.paths}
+        use = HAS_INOTIFY if use_inotify is None else use_inotify and HAS_INOTIFY
+        self._inotify = None
+        if use:
+            self._inotify = INotify()
+            mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.DELETE
+            for parent in {p.parent for p in self.paths}:
+                self._inotify.add_watch(str(parent), mask)
+        self._last = self._fingerprints()
+
+    def _fingerprints(self) -> List[Optional[list]]:
+        return [indexes.fingerprint(p) for p in self.paths]
+
+    def wait(self, timeout: float, poll_interval: float = 0.25) -> bool:
+        """
+        Return True as soon as a watched file changes, False on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        if self._inotify is not None:
+            remaining = max(0.0, deadline - time.monotonic())
+            events = self._inotify.read(timeout=int(remaining * 1000))
+            return any(e.name in self._names for e in events)
+        while True:
+            current = self._fingerprints()
+            if current != self._last:
+                self._last = current
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(poll_interval, remaining))
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+
+
+class ProjectSnapshot:
+    """
+    In-memory copy of projects.json that reloads incrementally: each refresh
+    compares every project's raw bytes with the previous read and only
+    re-parses the ones that differ.
+    """
+
+    def __init__(self) -> None:
+        self.raw: Dict[str, bytes] = {}
+        self.projects: Dict[str, Project] = {}
+        self._fp: Optional[list] = None
+
+    def _read_pieces(self) -> Optional[Dict[str, bytes]]:
+        before = indexes.fingerprint(storage.PROJECTS_PATH)
+        if before is None:
+            return {}
+        data = storage.PROJECTS_PATH.read_bytes()
+        if indexes.fingerprint(storage.PROJECTS_PATH) != before:
+            return None  # replaced mid-read; try again next tick
+        self._fp = before
+        offsets = storage._read_offsets(storage.PROJECTS_PATH, storage.OFFSETS_INDEX)
+        if offsets is not None:
+            return {pid: data[s:e] for pid, (s, e) in offsets.items()}
+        text = data.decode("utf-8")
+        return {
+            v["id"]: text[s:e].encode("utf-8")
+            for v, s, e in storage._iter_array_spans(text)
+        }
+
+    def refresh(self) -> Tuple[Set[str], Set[str]]:
+        """
+        Reload changed projects. Returns (changed_or_added_ids, removed_ids).
+        """
+        if (
+            self._fp is not None
+            and indexes.fingerprint(storage.PROJECTS_PATH) == self._fp
+        ):
+            return set(), set()
+        try:
+            pieces = self._read_pieces()
+        except (OSError, ValueError):
+            return set(), set()
+        if pieces is None:
+            return set(), set()
+        changed = {pid for pid, raw in pieces.items() if self.raw.get(pid) != raw}
+        removed = set(self.raw) - set(pieces)
+        for pid in changed:
+            self.projects[pid] = Project.from_dict(json.loads(pieces[pid]))
+        self.projects = {pid: self.projects[pid] for pid in pieces}
+        self.raw = pieces
+        return changed, removed
+
+
+def diff_rows(
+    old: Dict[str, Row], new: List[Row]
+) -> Tuple[List[Row], List[Row], List[str]]:
+    """
+    Compare rows keyed by their first column (the record id).
+    Returns (added, changed, removed_ids).
+    """
+    new_by_id = {str(r[0]): r for r in new}
+    added = [r for k, r in new_by_id.items() if k not in old]
+    changed = [r for k, r in new_by_id.items() if k in old and old[k] != r]
+    removed = [k for k in old if k not in new_by_id]
+    return added, changed, removed
+
+
+def _print_plain_diff(added, changed, removed) -> None:
+    for mark, style, rows in (("+", "green", added), ("~", "yellow", changed)):
+        for r in rows:
+            formatting.echo(f"{mark} " + " | ".join(str(x) for x in r), style)
+    for rid in removed:
+        formatting.echo(f"- {rid}", "red")
+
+
+def watch(
+    title: str,
+    headers: List[str],
+    build_rows: Callable[[ProjectSnapshot], List[Row]],
+    extra_paths: Sequence[Path] = (),
+    interval: float = 1.0,
+    max_cycles: Optional[int] = None,
+    use_inotify: Optional[bool] = None,
+) -> int:
+    """
+    Render `build_rows(snapshot)` and keep it current until interrupted (or
+    `max_cycles` wake-ups). Rows are rebuilt only when a watched file changed
+    and redrawn only when they differ. Returns the number of redraws.
+    """
+    snapshot = ProjectSnapshot()
+    snapshot.refresh()
+    watcher = FileWatcher([storage.PROJECTS_PATH, *extra_paths], use_inotify)
+    rows: Dict[str, Row] = {}
+    redraws = 0
+    use_live = formatting.HAS_RICH and Live is not None and formatting.console
+    live_cm = (
+        Live(console=formatting.console, auto_refresh=False)
+        if use_live
+        else nullcontext()
+    )
+
+    def redraw(new_rows: List[Row], first: bool) -> None:
+        nonlocal rows, redraws
+        added, changed, removed = diff_rows(rows, new_rows)
+        if not first and not (added or changed or removed):
+            return
+        rows = {str(r[0]): r for r in new_rows}
+        redraws += 1
+        if use_live:
+            live.update(
+                formatting.render_table(title, headers, rows.values()), refresh=True
+            )
+        elif first:
+            formatting._plain_table(headers, new_rows)
+        else:
+            _print_plain_diff(added, changed, removed)
+
+    cycles = 0
+    try:
+        with live_cm as live:
+            redraw(build_rows(snapshot), first=True)
+            while max_cycles is None or cycles < max_cycles:
+                cycles += 1
+                if not watcher.wait(interval):
+                    continue
+                # Only changed projects are re-parsed; rows are cheap to
+                # rebuild and the diff decides whether anything is redrawn
+                snapshot.refresh()
+                redraw(build_rows(snapshot), first=False)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return redraws